@@ -1,9 +1,9 @@
 # TransiScope/analysis_processor.py
 import numpy as np
 from scipy.signal import find_peaks, peak_widths
-from scipy.ndimage import gaussian_filter1d
+from scipy.ndimage import gaussian_filter1d, minimum_filter1d, maximum_filter1d, percentile_filter
 from skimage.filters import threshold_otsu
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -174,7 +174,7 @@ def detect_events_dog(
 
         event_props = {
             'dog_peak_value': dog_signal[peak_idx],
-            'dog_prominence': properties.get('prominences', [None])[i]
+            'dog_prominence': properties['prominences'][i] if 'prominences' in properties else None
         }
 
         evt = Event(start_time=event_start_time, end_time=event_end_time,
@@ -185,6 +185,301 @@ def detect_events_dog(
     return events
 
 
+BASELINE_METHODS = ('percentile', 'minimum', 'maximin')
+
+
+def compute_baseline(
+    traces: np.ndarray,
+    window_frames: int,
+    method: str = 'percentile',
+    percentile: float = 8.0,
+    smooth_sigma: float = 0.0
+) -> np.ndarray:
+    """
+    Estimates the slowly varying baseline F0 of one or many intensity traces with a sliding window.
+
+    All rows are filtered at once: the minimum and maximin baselines use O(T) running min/max
+    filters along the time axis; for the percentile baseline each row is padded by half a window
+    (mirrored at its ends) and the rows are joined into one 1D signal, so a single O(T log W)
+    running-percentile pass serves every trace without windows straddling two traces.
+
+    Args:
+        traces (np.ndarray): (T,) trace or (R, T) traces, one per row.
+        window_frames (int): Sliding window length in frames; should span several events.
+        method (str): 'percentile' (running `percentile`), 'minimum' (running minimum) or
+                      'maximin' (running maximum of the running minimum, which follows slow
+                      drift without sagging below it between sparse minima).
+        percentile (float): Percentile for the 'percentile' method, in [0, 100].
+        smooth_sigma (float): Gaussian smoothing (in frames) applied before the window filter,
+                              so noise dips do not pull a minimum baseline down (0 disables it).
+
+    Returns:
+        np.ndarray: float64 baseline of the same shape as `traces`.
+    """
+    if method not in BASELINE_METHODS:
+        logger.error(f"Unknown baseline method '{method}'. Use one of {BASELINE_METHODS}.")
+        raise ValueError(f"Unknown baseline method '{method}'")
+    if window_frames < 1:
+        logger.error(f"Baseline window must be at least 1 frame. Got {window_frames}.")
+        raise ValueError("Baseline window must be at least 1 frame.")
+    if not 0 <= percentile <= 100:
+        logger.error(f"Baseline percentile must be within [0, 100]. Got {percentile}.")
+        raise ValueError("Baseline percentile must be within [0, 100].")
+
+    values = np.atleast_2d(np.asarray(traces, dtype=np.float64))
+    window_frames = int(window_frames)
+    if smooth_sigma > 0:
+        values = gaussian_filter1d(values, smooth_sigma, axis=1)
+    if method == 'minimum':
+        baseline = minimum_filter1d(values, window_frames, axis=1)
+    elif method == 'maximin':
+        baseline = maximum_filter1d(minimum_filter1d(values, window_frames, axis=1), window_frames, axis=1)
+    else:
+        num_rows, num_frames = values.shape
+        before = window_frames // 2
+        after = window_frames - 1 - before
+        # 'symmetric' padding is the 'reflect' boundary of scipy.ndimage
+        padded = np.pad(values, ((0, 0), (before, after)), mode='symmetric')
+        filtered = percentile_filter(padded.ravel(), percentile, size=window_frames)
+        baseline = filtered.reshape(padded.shape)[:, before:before + num_frames]
+    return baseline.reshape(np.shape(traces))
+
+
+def compute_dff(
+    traces: np.ndarray,
+    window_frames: int,
+    method: str = 'percentile',
+    percentile: float = 8.0,
+    smooth_sigma: float = 0.0
+) -> np.ndarray:
+    """
+    Normalises traces to ΔF/F = (F - F0) / F0 with a sliding-window baseline F0.
+
+    Removing the baseline before detection keeps slow drift and photobleaching from producing
+    threshold events. See `compute_baseline` for the parameters.
+
+    Returns:
+        np.ndarray: float64 ΔF/F of the same shape as `traces`; 0 where the baseline is not positive.
+    """
+    values = np.asarray(traces, dtype=np.float64)
+    baseline = compute_baseline(values, window_frames, method, percentile, smooth_sigma)
+    valid = baseline > 0
+    if not valid.all():
+        logger.warning(f"Baseline is zero or negative at {int(np.count_nonzero(~valid))} samples; "
+                       f"ΔF/F set to 0 there.")
+    return np.divide(values - baseline, baseline, out=np.zeros_like(values), where=valid)
+
+
+_PIXELWISE_WORK_ARRAYS = 4 # float64 (pixels, T) arrays alive at once in pixel-wise detection
+
+
+def _pixel_blocks(height: int, width: int, max_pixels: int):
+    """Yields (y0, y1, x0, x1) blocks of at most `max_pixels` pixels: row bands, or row segments for wide frames."""
+    if max_pixels >= width:
+        rows = max_pixels // width
+        for y0 in range(0, height, rows):
+            yield y0, min(y0 + rows, height), 0, width
+    else:
+        for y0 in range(height):
+            for x0 in range(0, width, max_pixels):
+                yield y0, y0 + 1, x0, min(x0 + max_pixels, width)
+
+
+def _band_rows(image_stack: Any, num_frames: int, height: int, width: int, max_bytes: int) -> int:
+    """
+    Rows of a lazy stack read at once by pixel-wise detection.
+
+    Every row-band read touches all T frames, and a page-based TIFF decodes whole frames for it, so
+    bands are as tall as `max_bytes` of source pixels allows (rounded down to whole storage chunks
+    for chunked stacks) and are split into processing blocks in memory.
+    """
+    rows = max(1, max_bytes // (num_frames * width * np.dtype(image_stack.dtype).itemsize))
+    chunks = getattr(image_stack, 'chunks', None)
+    if chunks is not None and rows > chunks[1]:
+        rows -= rows % chunks[1]
+    return min(rows, height)
+
+
+def _otsu_thresholds(traces: np.ndarray) -> np.ndarray:
+    """
+    Otsu threshold of every row of a (pixels, T) float array, as `threshold_otsu` computes it per trace.
+
+    Rows with a single intensity value get that value as threshold, so nothing lies above it.
+    """
+    nbins = 256
+    low, high = traces.min(axis=1), traces.max(axis=1)
+    thresholds = low.copy()
+    varying = np.flatnonzero(high > low)
+    if varying.size == 0:
+        return thresholds
+    x, low, high = traces[varying], low[varying], high[varying]
+
+    # 256-bin histogram over each row's own range, binned exactly like np.histogram
+    edges = np.linspace(low, high, nbins + 1, axis=1)
+    indices = ((x - low[:, None]) / (high - low)[:, None] * nbins).astype(np.intp)
+    indices[indices == nbins] -= 1
+    indices -= x < np.take_along_axis(edges, indices, axis=1)
+    indices += (x >= np.take_along_axis(edges, indices + 1, axis=1)) & (indices != nbins - 1)
+    row_offsets = np.arange(len(x))[:, None] * nbins
+    counts = np.bincount((indices + row_offsets).ravel(), minlength=len(x) * nbins).reshape(len(x), nbins)
+    bin_centers = (edges[:, :-1] + edges[:, 1:]) / 2
+
+    weight1 = np.cumsum(counts, axis=1)
+    weight2 = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean1 = np.cumsum(counts * bin_centers, axis=1) / weight1
+        mean2 = (np.cumsum((counts * bin_centers)[:, ::-1], axis=1) / weight2[:, ::-1])[:, ::-1]
+    variance12 = weight1[:, :-1] * weight2[:, 1:] * (mean1[:, :-1] - mean2[:, 1:]) ** 2
+    best = np.argmax(variance12, axis=1)
+    thresholds[varying] = bin_centers[np.arange(len(x)), best]
+    return thresholds
+
+
+def _count_threshold_events(traces: np.ndarray, thresholds: np.ndarray, min_duration_frames: int) -> np.ndarray:
+    """Per-row number of runs above threshold lasting at least `min_duration_frames` frames."""
+    above = traces > thresholds[:, None]
+    run_starts = above.copy()
+    run_starts[:, 1:] &= ~above[:, :-1]
+    if min_duration_frames <= 1:
+        return np.count_nonzero(run_starts, axis=1)
+    num_frames = traces.shape[1]
+    if min_duration_frames > num_frames:
+        return np.zeros(len(traces), dtype=np.intp)
+    # A run is long enough if the window of min_duration_frames frames from its start is all above
+    frames_above = np.zeros((len(traces), num_frames + 1), dtype=np.int32)
+    np.cumsum(above, axis=1, out=frames_above[:, 1:])
+    window_full = (frames_above[:, min_duration_frames:] - frames_above[:, :-min_duration_frames]) == min_duration_frames
+    return np.count_nonzero(run_starts[:, :num_frames - min_duration_frames + 1] & window_full, axis=1)
+
+
+def _count_dog_events(traces: np.ndarray, sigma1: float, sigma2: float,
+                      peak_threshold_factor: float, min_prominence: Optional[float]) -> np.ndarray:
+    """Per-row number of DoG peaks, as `detect_events_dog` finds them in each trace."""
+    num_pixels, num_frames = traces.shape
+    # The DoG signals are laid out back to back, each followed by a NaN. NaN compares false, so
+    # one find_peaks call over the flat array treats every row like a separate trace: no peak at
+    # a row's first or last frame, and prominence searches stop at the row boundary.
+    padded = np.empty((num_pixels, num_frames + 1))
+    padded[:, num_frames] = np.nan
+    dog_signal = padded[:, :num_frames]
+    gaussian_filter1d(traces, sigma=sigma1, axis=1, output=dog_signal)
+    dog_signal -= gaussian_filter1d(traces, sigma=sigma2, axis=1)
+
+    if min_prominence is None:
+        dynamic_threshold = peak_threshold_factor * np.std(dog_signal, axis=1)
+        dynamic_threshold[dynamic_threshold == 0] = np.inf # Constant DoG signal: no peaks
+        heights = np.repeat(dynamic_threshold, num_frames + 1)
+        peaks, _ = find_peaks(padded.ravel(), height=heights)
+    else:
+        peaks, _ = find_peaks(padded.ravel(), prominence=min_prominence)
+    return np.bincount(peaks // (num_frames + 1), minlength=num_pixels)
+
+
+def detect_events_pixelwise(
+    image_stack: Any,
+    fps: float,
+    method: str = 'threshold',
+    threshold_value: Optional[float] = None,
+    use_otsu: bool = False,
+    min_duration_frames: int = 1,
+    sigma1: float = 1.0,
+    sigma2: float = 2.0,
+    peak_threshold_factor: float = 0.5,
+    min_prominence: Optional[float] = None,
+    dff_params: Optional[Dict[str, Any]] = None,
+    max_chunk_bytes: int = 512 * 2 ** 20,
+    progress_callback: Optional[Callable[[int, int, Any], bool]] = None
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Runs threshold or DoG detection on every pixel's trace and maps the event counts.
+
+    Each pixel is analysed exactly as `detect_events_threshold` / `detect_events_dog` analyse an ROI
+    trace (same parameters, same events), but the stack is processed in blocks of pixels, each
+    treated as one (pixels, T) matrix: all traces of a block are thresholded, filtered and
+    peak-searched together. Blocks are sized so the working set stays within `max_chunk_bytes`,
+    whatever the stack size; only the (H, W) maps are kept.
+
+    Lazy stacks (not ndarray/memmap) are read in row bands holding up to half the budget in the
+    source dtype, each read once and split into blocks in memory: the source is read
+    ceil(H / band rows) times, once if the whole stack fits.
+
+    Args:
+        image_stack (Any): (T, H, W) greyscale stack (ndarray, memmap or lazy stack).
+        fps (float): Frames per second.
+        method (str): 'threshold' or 'dog'.
+        threshold_value, use_otsu, min_duration_frames: Threshold detection parameters; Otsu
+            thresholds are computed per pixel.
+        sigma1, sigma2, peak_threshold_factor, min_prominence: DoG detection parameters.
+        dff_params (Optional[Dict[str, Any]]): If given, keyword arguments for `compute_dff`: each
+            pixel trace is normalised to ΔF/F before detection, so thresholds and prominences are
+            in ΔF/F units as for normalised ROI traces.
+        max_chunk_bytes (int): Approximate working memory budget.
+        progress_callback (Optional[Callable[[int, int, Any], bool]]): Called after each block with
+            (pixels_done, total_pixels, None); return False to cancel.
+
+    Returns:
+        Optional[Dict[str, np.ndarray]]: 'event_count' (int32) and 'event_rate' (float32, events/s)
+            maps of shape (H, W), or None if the stack or fps is invalid or the run was cancelled.
+    """
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3:
+        logger.error("Pixel-wise detection needs a 3D (T, H, W) stack.")
+        return None
+    if fps <= 0:
+        logger.error(f"Invalid fps ({fps}) for pixel-wise detection.")
+        return None
+    if method == 'threshold':
+        if not use_otsu and threshold_value is None:
+            logger.error("Threshold detection requires either a 'threshold_value' or 'use_otsu=True'.")
+            raise ValueError("Invalid threshold parameters")
+    elif method == 'dog':
+        if sigma1 >= sigma2:
+            logger.error("Sigma1 must be smaller than Sigma2 for DoG.")
+            raise ValueError("Sigma1 must be smaller than Sigma2.")
+    else:
+        logger.error(f"Unknown pixel-wise detection method '{method}'. Use 'threshold' or 'dog'.")
+        raise ValueError(f"Unknown method '{method}'")
+
+    num_frames, height, width = image_stack.shape
+    event_count = np.zeros((height, width), dtype=np.int32)
+    if num_frames == 0 or (method == 'dog' and num_frames < max(sigma1, sigma2) * 3):
+        logger.warning(f"Stack too short ({num_frames} frames) for pixel-wise {method} detection.")
+        return {'event_count': event_count, 'event_rate': np.zeros((height, width), dtype=np.float32)}
+
+    work_arrays = _PIXELWISE_WORK_ARRAYS + (2 if dff_params is not None else 0) # Baseline and ΔF/F
+    in_memory = isinstance(image_stack, np.ndarray)
+    block_bytes = int(max_chunk_bytes) if in_memory else int(max_chunk_bytes) // 2
+    max_pixels = max(1, block_bytes // (num_frames * 8 * work_arrays))
+    band_rows = height if in_memory else _band_rows(image_stack, num_frames, height, width,
+                                                     int(max_chunk_bytes) - block_bytes)
+    pixels_done = 0
+    for b0 in range(0, height, band_rows):
+        b1 = min(b0 + band_rows, height)
+        band = image_stack[:, b0:b1] if in_memory else np.asarray(image_stack[:, b0:b1]) # A view for ndarrays
+        for y0, y1, x0, x1 in _pixel_blocks(b1 - b0, width, max_pixels):
+            block = band[:, y0:y1, x0:x1]
+            traces = np.ascontiguousarray(block.reshape(num_frames, -1).T, dtype=np.float64) # (pixels, T)
+            del block
+            if dff_params is not None:
+                traces = compute_dff(traces, **dff_params)
+            if method == 'threshold':
+                thresholds = (_otsu_thresholds(traces) if use_otsu
+                              else np.full(len(traces), threshold_value, dtype=np.float64))
+                counts = _count_threshold_events(traces, thresholds, min_duration_frames)
+            else:
+                counts = _count_dog_events(traces, sigma1, sigma2, peak_threshold_factor, min_prominence)
+            event_count[b0 + y0:b0 + y1, x0:x1] = counts.reshape(y1 - y0, x1 - x0)
+            pixels_done += counts.size
+            if progress_callback is not None and not progress_callback(pixels_done, height * width, None):
+                logger.info(f"Pixel-wise {method} detection cancelled.")
+                return None
+        del band
+
+    event_rate = (event_count / (num_frames / fps)).astype(np.float32)
+    logger.info(f"Pixel-wise {method} detection: {int(event_count.sum())} events over {height}x{width} pixels "
+                f"(max {int(event_count.max())} per pixel).")
+    return {'event_count': event_count, 'event_rate': event_rate}
+
+
 def estimate_dog_params_from_trace(
     intensity_trace: np.ndarray,
 ) -> Optional[Tuple[float, float, float]]:
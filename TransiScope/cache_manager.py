@@ -0,0 +1,423 @@
+# TransiScope/cache_manager.py
+import numpy as np
+from typing import Tuple, List, Optional, Dict, Any
+import logging
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# (T, H, W) chunk shape. A single frame touches one row of tiles, and an ROI trace touches only
+# the few tiles under the ROI across time, so both access patterns stay cheap.
+DEFAULT_CHUNKS: Tuple[int, int, int] = (32, 128, 128)
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3 # Decode cache budget (20 GiB)
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+# Every ChunkedStack alive in this process. Eviction skips their directories, so a stack handed out
+# earlier (e.g. shown in the viewer or prefetched) keeps its chunks while it is still referenced.
+_open_stacks: "weakref.WeakSet[ChunkedStack]" = weakref.WeakSet()
+_open_stacks_lock = threading.Lock()
+
+
+def _open_stack_directories() -> set:
+    """Absolute directories of the chunked stacks currently open in this process."""
+    with _open_stacks_lock:
+        return {os.path.abspath(stack.directory) for stack in list(_open_stacks)}
+
+
+def _chunk_file_name(ti: int, yi: int, xi: int) -> str:
+    """Zarr-style chunk key: chunk indices joined by dots."""
+    return f"{ti}.{yi}.{xi}"
+
+
+def _json_default(value: Any) -> Any:
+    """Serialises the NumPy scalars and tuples that appear in load metadata."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def write_chunked_stack(stack: Any, directory: str, chunks: Tuple[int, int, int] = DEFAULT_CHUNKS,
+                        compression_level: int = 1, metadata: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Writes a (T, H, W) stack to a directory of zlib-compressed chunks.
+
+    The stack is read one time-slab of `chunks[0]` frames at a time, so lazy or memory-mapped
+    stacks are never fully loaded. The manifest is written last; a directory without one is
+    treated as incomplete by `ChunkedStack`.
+
+    Args:
+        stack: (T, H, W) NumPy array or array-like.
+        directory (str): Output directory (created if missing).
+        chunks (Tuple[int, int, int]): Chunk shape along (T, H, W).
+        compression_level (int): zlib level (1 = fastest).
+        metadata (Optional[Dict[str, Any]]): JSON-serialisable metadata stored in the manifest.
+
+    Returns:
+        bool: True if successful, False otherwise.
+    """
+    if stack is None or getattr(stack, 'ndim', None) != 3:
+        logger.error("Invalid stack for chunked storage. Must be 3D (T, H, W).")
+        return False
+    try:
+        os.makedirs(directory, exist_ok=True)
+        num_frames, height, width = stack.shape
+        chunk_t, chunk_y, chunk_x = (max(1, int(c)) for c in chunks)
+        for ti, t0 in enumerate(range(0, num_frames, chunk_t)):
+            slab = np.asarray(stack[t0:t0 + chunk_t])
+            for yi, y0 in enumerate(range(0, height, chunk_y)):
+                for xi, x0 in enumerate(range(0, width, chunk_x)):
+                    block = np.ascontiguousarray(slab[:, y0:y0 + chunk_y, x0:x0 + chunk_x])
+                    with open(os.path.join(directory, _chunk_file_name(ti, yi, xi)), 'wb') as f:
+                        f.write(zlib.compress(block.tobytes(), compression_level))
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "shape": [num_frames, height, width],
+            "dtype": np.dtype(stack.dtype).str,
+            "chunks": [chunk_t, chunk_y, chunk_x],
+            "compression": "zlib",
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(directory, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, default=_json_default)
+        logger.info(f"Wrote chunked stack {tuple(stack.shape)} to {directory}")
+        return True
+    except Exception as e:
+        logger.error(f"Error writing chunked stack to {directory}: {e}")
+        return False
+
+
+class ChunkedStack:
+    """
+    Read-only, lazily decompressed (T, H, W) view of a directory written by `write_chunked_stack`.
+
+    Indexing decompresses only the chunks that intersect the request; the most recently used
+    chunks are kept decoded so scrolling through frames in napari does not re-inflate them.
+    Supports an int, slice or integer array per axis.
+    """
+    def __init__(self, directory: str, max_cached_chunks: int = 64):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported chunked stack format in {directory}: {manifest.get('format_version')}")
+        self.shape: Tuple[int, ...] = tuple(manifest["shape"])
+        self.dtype = np.dtype(manifest["dtype"])
+        self.ndim = len(self.shape)
+        self.chunks: Tuple[int, ...] = tuple(manifest["chunks"])
+        self.metadata: Dict[str, Any] = manifest.get("metadata", {})
+        self._max_cached_chunks = max_cached_chunks
+        self._chunk_cache: "OrderedDict[Tuple[int, int, int], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        with _open_stacks_lock:
+            _open_stacks.add(self)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _read_chunk(self, chunk_index: Tuple[int, int, int]) -> np.ndarray:
+        with self._lock:
+            cached = self._chunk_cache.get(chunk_index)
+            if cached is not None:
+                self._chunk_cache.move_to_end(chunk_index)
+                return cached
+        chunk_shape = tuple(min(c, s - i * c) for i, c, s in zip(chunk_index, self.chunks, self.shape))
+        try:
+            with open(os.path.join(self.directory, _chunk_file_name(*chunk_index)), 'rb') as f:
+                chunk = np.frombuffer(zlib.decompress(f.read()), dtype=self.dtype).reshape(chunk_shape)
+        except FileNotFoundError as e:
+            # Only another process (or a manual clean-up) can remove an entry that is open here
+            raise FileNotFoundError(f"Chunked stack {self.directory} was removed while in use; "
+                                    f"reload the source file.") from e
+        with self._lock:
+            self._chunk_cache[chunk_index] = chunk
+            while len(self._chunk_cache) > self._max_cached_chunks:
+                self._chunk_cache.popitem(last=False)
+        return chunk
+
+    def _read_block(self, lo: Tuple[int, ...], hi: Tuple[int, ...]) -> np.ndarray:
+        """Assembles the dense block [lo, hi) from the chunks that cover it."""
+        block = np.empty(tuple(h - l for l, h in zip(lo, hi)), dtype=self.dtype)
+        ranges = [range(l // c, (h - 1) // c + 1) for l, h, c in zip(lo, hi, self.chunks)]
+        for ti in ranges[0]:
+            for yi in ranges[1]:
+                for xi in ranges[2]:
+                    chunk = self._read_chunk((ti, yi, xi))
+                    src, dst = [], []
+                    for axis, ci in enumerate((ti, yi, xi)):
+                        c0 = ci * self.chunks[axis]
+                        a = max(lo[axis], c0)
+                        b = min(hi[axis], c0 + chunk.shape[axis])
+                        src.append(slice(a - c0, b - c0))
+                        dst.append(slice(a - lo[axis], b - lo[axis]))
+                    block[tuple(dst)] = chunk[tuple(src)]
+        return block
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        lo, hi, local_key = [], [], []
+        for k, size in zip(key, self.shape):
+            if isinstance(k, (int, np.integer)):
+                index = range(size)[k]
+                lo.append(index)
+                hi.append(index + 1)
+                local_key.append(0)
+            elif isinstance(k, slice):
+                # Slices (reversed ones too) stay slices on the block, so several of them and any
+                # integer arrays combine exactly as they would on the source ndarray
+                selected = range(size)[k]
+                first = min(selected[0], selected[-1]) if len(selected) else 0
+                lo.append(first)
+                hi.append(max(selected[0], selected[-1]) + 1 if len(selected) else 0)
+                local_key.append(slice(selected[0] - first, None, selected.step) if len(selected) else slice(0, 0))
+            else: # Integer arrays
+                indices = np.arange(size)[np.asarray(k)]
+                first = int(indices.min()) if indices.size else 0
+                lo.append(first)
+                hi.append(int(indices.max()) + 1 if indices.size else 0)
+                local_key.append(indices - first)
+
+        if any(h <= l for l, h in zip(lo, hi)):
+            # Empty selection: index a zero-stride stand-in to get the right result shape
+            stand_in = np.lib.stride_tricks.as_strided(np.zeros(1, dtype=self.dtype), shape=self.shape,
+                                                       strides=(0,) * self.ndim)
+            return np.array(stand_in[key])
+        return self._read_block(tuple(lo), tuple(hi))[tuple(local_key)]
+
+    def __array__(self, dtype=None, copy=None):
+        stack = self[:]
+        return stack.astype(dtype, copy=False) if dtype is not None else stack
+
+
+def cache_key(file_path: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds the cache key for a decoded file: its absolute path, size and modification time plus
+    the load options that affect the decoded pixels. Any change to the file invalidates the key.
+    """
+    stat = os.stat(file_path)
+    identity = {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "options": options or {},
+        "format_version": FORMAT_VERSION,
+    }
+    return hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _restore_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON turns tuples into lists; restore the tuple-valued metadata keys."""
+    for key in ("frame_range", "crop"):
+        if isinstance(metadata.get(key), list):
+            metadata[key] = tuple(metadata[key])
+    return metadata
+
+
+def default_cache_dir() -> str:
+    """Per-user decode cache location ($XDG_CACHE_HOME/TransiScope/stacks or ~/.cache/...)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "TransiScope", "stacks")
+
+
+def _directory_size(directory: str) -> int:
+    total = 0
+    with os.scandir(directory) as it:
+        for item in it:
+            if item.is_file(follow_symlinks=False):
+                total += item.stat(follow_symlinks=False).st_size
+    return total
+
+
+class StackCache:
+    """
+    A size-bounded directory of decoded-stack cache entries (one `write_chunked_stack` directory
+    per key).
+
+    * Entries are written to a private temporary directory and renamed into place, so a reader
+      never sees a half-written entry and concurrent TransiScope processes storing the same key
+      cannot corrupt each other (the first rename wins, the loser's copy is discarded).
+    * Opening an entry touches its manifest; when the total size exceeds `max_bytes` the least
+      recently accessed entries are evicted first. Entries with a ChunkedStack still open in this
+      process are never evicted; the cache may exceed its budget until they are released.
+    * Hit/miss counters are kept per instance and reported in the log.
+    """
+    TEMP_PREFIX = ".tmp-"
+    STALE_TEMP_SECONDS = 3600.0 # Temp dirs older than this are leftovers from crashed writers
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def open(self, key: str) -> Tuple[Optional[ChunkedStack], Optional[Dict[str, Any]]]:
+        """
+        Opens the entry `key` lazily and marks it as recently used.
+
+        Returns:
+            Tuple[Optional[ChunkedStack], Optional[Dict[str, Any]]]: The stack and its stored load
+                metadata, or (None, None) on a miss (including unreadable entries).
+        """
+        manifest_path = os.path.join(self._entry_dir(key), MANIFEST_NAME)
+        stack = None
+        if os.path.isfile(manifest_path):
+            try:
+                stack = ChunkedStack(self._entry_dir(key))
+                os.utime(manifest_path) # Last-access time drives LRU eviction
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cache entry {self._entry_dir(key)}: {e}")
+                stack = None
+        with self._lock:
+            if stack is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            hits, misses = self.hits, self.misses
+        logger.info(f"Decode cache {'hit' if stack is not None else 'miss'} for {key[:12]} (hits={hits}, misses={misses}).")
+        if stack is None:
+            return None, None
+        return stack, _restore_metadata(dict(stack.metadata))
+
+    def store(self, key: str, stack: Any, metadata: Dict[str, Any],
+              chunks: Tuple[int, int, int] = DEFAULT_CHUNKS) -> bool:
+        """Atomically writes a decoded (T, H, W) stack as entry `key`, then evicts down to budget."""
+        temp_dir = tempfile.mkdtemp(prefix=f"{self.TEMP_PREFIX}{key[:12]}-", dir=self.cache_dir)
+        if not write_chunked_stack(stack, temp_dir, chunks=chunks, metadata=metadata):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return False
+        try:
+            os.rename(temp_dir, self._entry_dir(key))
+        except OSError:
+            # Another process stored the same key first; its entry is equivalent.
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.info(f"Decode cache entry {key[:12]} was already stored by another process.")
+        self.prune(keep=key)
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Lists complete entries, least recently used first.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per entry with `key`, `path`, `nbytes`, `last_access`
+                (epoch seconds) and the stored `source` file path.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if item.name.startswith('.') or not item.is_dir(follow_symlinks=False):
+                    continue
+                manifest_path = os.path.join(item.path, MANIFEST_NAME)
+                try:
+                    last_access = os.stat(manifest_path).st_mtime
+                    with open(manifest_path, 'r', encoding='utf-8') as f:
+                        source = json.load(f).get("metadata", {}).get("file_path")
+                    nbytes = _directory_size(item.path)
+                except (OSError, ValueError):
+                    continue # Incomplete, or removed while scanning
+                entries.append({"key": item.name, "path": item.path, "nbytes": nbytes,
+                                "last_access": last_access, "source": source})
+        entries.sort(key=lambda entry: entry["last_access"])
+        return entries
+
+    def total_bytes(self) -> int:
+        return sum(entry["nbytes"] for entry in self.entries())
+
+    def _remove_entry(self, path: str):
+        # Rename first so a concurrent reader never opens a half-deleted entry.
+        doomed = tempfile.mkdtemp(prefix=self.TEMP_PREFIX, dir=self.cache_dir)
+        try:
+            os.rename(path, os.path.join(doomed, "entry"))
+        except OSError:
+            pass # Already removed by another process
+        shutil.rmtree(doomed, ignore_errors=True)
+
+    def prune(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Evicts least recently accessed entries until the cache fits in `max_bytes`
+        (default: the cache's budget), and removes stale temporary directories.
+
+        Args:
+            max_bytes (Optional[int]): Budget to prune down to.
+            keep (Optional[str]): Key that must not be evicted (e.g. the entry just stored). Entries
+                                  open in this process are always kept.
+
+        Returns:
+            int: Number of bytes freed.
+        """
+        budget = self.max_bytes if max_bytes is None else int(max_bytes)
+        now = time.time()
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if item.name.startswith(self.TEMP_PREFIX) and now - item.stat().st_mtime > self.STALE_TEMP_SECONDS:
+                    shutil.rmtree(item.path, ignore_errors=True)
+
+        entries = self.entries()
+        total = sum(entry["nbytes"] for entry in entries)
+        in_use = _open_stack_directories()
+        freed = 0
+        for entry in entries:
+            if total <= budget:
+                break
+            if entry["key"] == keep or os.path.abspath(entry["path"]) in in_use:
+                continue
+            self._remove_entry(entry["path"])
+            total -= entry["nbytes"]
+            freed += entry["nbytes"]
+            logger.info(f"Evicted decode cache entry {entry['key'][:12]} ({entry['nbytes'] / 1e6:.1f} MB, source: {entry['source']}).")
+        if total > budget:
+            logger.info(f"Decode cache is {total / 1e6:.1f} MB, over its {budget / 1e6:.1f} MB budget, "
+                        f"because the remaining entries are in use.")
+        return freed
+
+    def clear(self) -> int:
+        """Removes every entry. Returns the number of bytes freed."""
+        return self.prune(max_bytes=0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, total size, budget and hit/miss counters."""
+        entries = self.entries()
+        return {"entries": len(entries), "nbytes": sum(entry["nbytes"] for entry in entries),
+                "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+_caches: Dict[str, StackCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_stack_cache(cache_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> StackCache:
+    """
+    Returns the process-wide StackCache for `cache_dir` (default: `default_cache_dir()`), so hit/miss
+    counters accumulate across loads. `max_bytes`, if given, updates its budget.
+    """
+    directory = os.path.abspath(cache_dir or default_cache_dir())
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = StackCache(directory, max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+            _caches[directory] = cache
+        elif max_bytes is not None:
+            cache.max_bytes = int(max_bytes)
+    return cache
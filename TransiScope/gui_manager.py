@@ -1,16 +1,17 @@
 import napari
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from napari.layers import Image as NapariImageLayer, Shapes as NapariShapesLayer
 from napari.utils.notifications import show_info, show_error, show_warning
 from qtpy.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel,
                             QSpinBox, QDoubleSpinBox, QGroupBox, QFormLayout,
                             QCheckBox, QLineEdit, QScrollArea, QTableWidget, QTableWidgetItem,
                             QHeaderView, QSplitter, QTextEdit, QDialog, QHBoxLayout, QComboBox,
-                            QApplication)
-from qtpy.QtCore import Qt
+                            QApplication, QProgressBar)
+from qtpy.QtCore import Qt, QObject, QThread, Signal
 import numpy as np
 from napari.layers.shapes.shapes import Mode as NapariShapesMode
 import logging
+import time
 from datetime import datetime
 
 # Matplotlib imports for plotting
@@ -22,6 +23,7 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from . import io_operations
 from . import roi_handler
 from . import analysis_processor
+from . import motion_correction
 from . import utilities
 
 # Setup logging for the GUI
@@ -33,8 +35,8 @@ class TransiScopeGUI:
         self.viewer.title = "TransiScope v1.0"
         
         # --- Internal State ---
-        self.raw_frames: Optional[List[np.ndarray]] = None
-        self.greyscale_stack: Optional[np.ndarray] = None # T, H, W
+        self.greyscale_stack: Optional[np.ndarray] = None # T, H, W (colour frames are not kept)
+        self.uncorrected_stack: Optional[np.ndarray] = None # Loaded stack while motion correction is applied
         self.current_image_layer: Optional[NapariImageLayer] = None
         self.shapes_layer: Optional[NapariShapesLayer] = None
         self.roi_manager: Optional[roi_handler.ROIManager] = None
@@ -42,7 +44,14 @@ class TransiScopeGUI:
         self.pixel_size_um: float = 1.0 # Default, user should set this
         self.all_detected_events: List[analysis_processor.Event] = []
         self.roi_summary_stats: Dict[Any, Dict[str, float]] = {} # For storing rate and SE per ROI
+        self.roi_traces: Dict[int, np.ndarray] = {} # Mean intensity trace per ROI from the last analysis
+        self.roi_trace_statistics: Dict[int, np.ndarray] = {} # Per-ROI structured statistics, if recorded
         self.analysis_timestamp: Optional[datetime] = None
+        self._load_thread: Optional[QThread] = None
+        self._load_worker: Optional[FileLoadWorker] = None
+        self._task_thread: Optional[QThread] = None # Long whole-stack computations (one at a time)
+        self._task_worker: Optional[TaskWorker] = None
+        self._task_done: Optional[Callable[[Any, bool], None]] = None
 
 
         # --- Main Widget ---
@@ -70,13 +79,30 @@ class TransiScopeGUI:
         self.btn_load_avi.clicked.connect(self._load_avi_action)
         self.lbl_file_info = QLabel("No file loaded.")
         self.lbl_file_info.setWordWrap(True)
-        self.btn_export_rois = QPushButton("Export ROIs to CSV")
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setToolTip("Frames decoded so far. The first frames are shown while the rest load.")
+        self.load_progress_bar.setVisible(False)
+        self.btn_cancel_load = QPushButton("Cancel Loading")
+        self.btn_cancel_load.setToolTip("Stop loading the current file.")
+        self.btn_cancel_load.setStatusTip("Stop loading the current file.")
+        self.btn_cancel_load.clicked.connect(self._cancel_load_action)
+        self.btn_cancel_load.setVisible(False)
+        self.btn_import_rois = QPushButton("Import ROIs")
+        self.btn_import_rois.setToolTip("Add ROIs saved from another recording (CSV or binary .npz ROI file).")
+        self.btn_import_rois.setStatusTip("Add ROIs saved from another recording (CSV or binary .npz ROI file).")
+        self.btn_import_rois.clicked.connect(self._import_rois_action)
+        self.btn_import_rois.setEnabled(False)
+
+        self.btn_export_rois = QPushButton("Export ROIs")
         self.btn_export_rois.setToolTip("Export the definitions of all drawn ROIs to a CSV file.")
         self.btn_export_rois.setStatusTip("Export the definitions of all drawn ROIs to a CSV file.")
         self.btn_export_rois.clicked.connect(self._export_rois_action)
         self.btn_export_rois.setEnabled(False)
         file_layout.addRow(self.btn_load_avi)
         file_layout.addRow(self.lbl_file_info)
+        file_layout.addRow(self.load_progress_bar)
+        file_layout.addRow(self.btn_cancel_load)
+        file_layout.addRow(self.btn_import_rois)
         file_layout.addRow(self.btn_export_rois)
         controls_layout.addWidget(file_group)
 
@@ -94,6 +120,14 @@ class TransiScopeGUI:
         self.pixel_size_input.setStatusTip("Define the physical size of a pixel (microns per pixel). This is critical for normalized measurements.")
         self.pixel_size_input.valueChanged.connect(self._update_pixel_size)
         preproc_layout.addRow("Pixel Size:", self.pixel_size_input)
+
+        self.btn_motion_correct = QPushButton("Correct Motion")
+        self.btn_motion_correct.setToolTip("Register every frame rigidly to the mean of the first frames (FFT phase correlation). Frames are shifted on the fly; toggle off to restore the loaded stack.")
+        self.btn_motion_correct.setStatusTip("Register every frame rigidly to the mean of the first frames (FFT phase correlation). Frames are shifted on the fly; toggle off to restore the loaded stack.")
+        self.btn_motion_correct.setCheckable(True)
+        self.btn_motion_correct.clicked.connect(self._toggle_motion_correction)
+        self.btn_motion_correct.setEnabled(False)
+        preproc_layout.addRow(self.btn_motion_correct)
         
         # ROI Drawing Mode Selection
         self.roi_mode_combo = QComboBox()
@@ -118,6 +152,29 @@ class TransiScopeGUI:
         self.btn_clear_rois.setEnabled(False)
         preproc_layout.addRow(self.btn_clear_rois)
 
+        # Automatic ROI generation
+        self.auto_roi_method_combo = QComboBox()
+        self.auto_roi_method_combo.addItems(["Grid", "Blobs (Std Projection)", "Blobs (Max Projection)",
+                                             "Blobs (Correlation Projection)"])
+        self.auto_roi_method_combo.setToolTip("Tile the frame with square ROIs, or segment bright blobs in a projection of the stack.")
+        self.auto_roi_method_combo.setStatusTip("Tile the frame with square ROIs, or segment bright blobs in a projection of the stack.")
+        preproc_layout.addRow("Auto ROI Method:", self.auto_roi_method_combo)
+
+        self.auto_roi_size_input = QSpinBox()
+        self.auto_roi_size_input.setRange(1, 10000)
+        self.auto_roi_size_input.setValue(16)
+        self.auto_roi_size_input.setSuffix(" px")
+        self.auto_roi_size_input.setToolTip("Grid: tile side length. Blobs: minimum blob area.")
+        self.auto_roi_size_input.setStatusTip("Grid: tile side length. Blobs: minimum blob area.")
+        preproc_layout.addRow("Tile Size / Min Area:", self.auto_roi_size_input)
+
+        self.btn_generate_rois = QPushButton("Generate ROIs")
+        self.btn_generate_rois.setToolTip("Automatically create ROIs with the selected method, in addition to any existing ones.")
+        self.btn_generate_rois.setStatusTip("Automatically create ROIs with the selected method, in addition to any existing ones.")
+        self.btn_generate_rois.clicked.connect(self._generate_rois_action)
+        self.btn_generate_rois.setEnabled(False)
+        preproc_layout.addRow(self.btn_generate_rois)
+
         self.btn_auto_dog_params = QPushButton("Auto-set Params from ROI")
         self.btn_auto_dog_params.setToolTip("Automatically estimate optimal DoG filter parameters based on the intensity signal of the selected ROI.")
         self.btn_auto_dog_params.setStatusTip("Automatically estimate optimal DoG filter parameters based on the intensity signal of the selected ROI.")
@@ -131,6 +188,44 @@ class TransiScopeGUI:
         analysis_group.setToolTip("Configure the algorithms for detecting events within the ROIs.")
         analysis_form_layout = QFormLayout(analysis_group)
 
+        # Trace statistic
+        self.trace_statistic_combo = QComboBox()
+        for label, statistic in (("Mean", 'mean'), ("Median", 'median'), ("Max", 'max'), ("Min", 'min'),
+                                 ("Std Dev", 'std'), ("Integrated (Sum)", 'sum')):
+            self.trace_statistic_combo.addItem(label, statistic)
+        self.trace_statistic_combo.setToolTip("The per-frame ROI statistic the detectors run on. The mean trace is always used for export and plots.")
+        self.trace_statistic_combo.setStatusTip("The per-frame ROI statistic the detectors run on. The mean trace is always used for export and plots.")
+        self.cb_record_all_statistics = QCheckBox("Record All Trace Statistics")
+        self.cb_record_all_statistics.setToolTip("Also compute mean, std, min, max, sum and median traces (in the same pass over the stack) for the binary results export.")
+        self.cb_record_all_statistics.setStatusTip("Also compute mean, std, min, max, sum and median traces (in the same pass over the stack) for the binary results export.")
+        analysis_form_layout.addRow("Detection Trace:", self.trace_statistic_combo)
+        analysis_form_layout.addRow(self.cb_record_all_statistics)
+
+        # ΔF/F normalisation
+        self.cb_enable_dff = QCheckBox("Normalise to ΔF/F")
+        self.cb_enable_dff.setToolTip("Divide out a sliding-window baseline before detection, so drift and photobleaching do not produce events. Thresholds and prominences are then in ΔF/F units.")
+        self.cb_enable_dff.setStatusTip("Divide out a sliding-window baseline before detection, so drift and photobleaching do not produce events. Thresholds and prominences are then in ΔF/F units.")
+        self.dff_method_combo = QComboBox()
+        for label, method in (("Rolling Percentile", 'percentile'), ("Rolling Minimum", 'minimum'), ("Maximin", 'maximin')):
+            self.dff_method_combo.addItem(label, method)
+        self.dff_method_combo.setToolTip("How the baseline F0 is estimated within the sliding window.")
+        self.dff_method_combo.setStatusTip("How the baseline F0 is estimated within the sliding window.")
+        self.dff_window_input = QDoubleSpinBox()
+        self.dff_window_input.setSuffix(" s")
+        self.dff_window_input.setRange(0.1, 3600.0)
+        self.dff_window_input.setValue(30.0)
+        self.dff_window_input.setToolTip("Length of the sliding baseline window. It should span several events.")
+        self.dff_window_input.setStatusTip("Length of the sliding baseline window. It should span several events.")
+        self.dff_percentile_input = QDoubleSpinBox()
+        self.dff_percentile_input.setRange(0.0, 100.0)
+        self.dff_percentile_input.setValue(8.0)
+        self.dff_percentile_input.setToolTip("Percentile used by the Rolling Percentile baseline.")
+        self.dff_percentile_input.setStatusTip("Percentile used by the Rolling Percentile baseline.")
+        analysis_form_layout.addRow(self.cb_enable_dff)
+        analysis_form_layout.addRow("Baseline Method:", self.dff_method_combo)
+        analysis_form_layout.addRow("Baseline Window:", self.dff_window_input)
+        analysis_form_layout.addRow("Baseline Percentile:", self.dff_percentile_input)
+
         # Thresholding
         self.cb_enable_threshold = QCheckBox("Enable Threshold Detection")
         self.cb_enable_threshold.setToolTip("Detect events where the signal intensity exceeds a defined value.")
@@ -174,6 +269,11 @@ class TransiScopeGUI:
         analysis_form_layout.addRow("DoG Sigma 2:", self.dog_sigma2_input)
         analysis_form_layout.addRow("DoG Min Prominence:", self.dog_prominence_input)
 
+        # Threshold and prominence are in intensity units, or ΔF/F units once normalisation is on;
+        # each mode keeps its own values.
+        self._detection_values = {False: (100.0, 5.0), True: (0.2, 0.05)}
+        self.cb_enable_dff.toggled.connect(self._update_detection_units)
+
         # Scisson-like (Stub)
         self.cb_enable_scisson = QCheckBox("Enable Scisson-like (Stub)")
         self.cb_enable_scisson.setToolTip("Detect events using a change-point detection algorithm like Pelt. (Currently a placeholder).")
@@ -205,9 +305,9 @@ class TransiScopeGUI:
         self.btn_run_analysis.clicked.connect(self._run_full_analysis)
         self.btn_run_analysis.setEnabled(False)
 
-        self.btn_export_results = QPushButton("Export Results to CSV")
-        self.btn_export_results.setToolTip("Save the detailed analysis results from the table below to a CSV file.")
-        self.btn_export_results.setStatusTip("Save the detailed analysis results from the table below to a CSV file.")
+        self.btn_export_results = QPushButton("Export Results")
+        self.btn_export_results.setToolTip("Save the detected events to a CSV file, or events, ROI statistics, traces and parameters to a binary .npz file.")
+        self.btn_export_results.setStatusTip("Save the detected events to a CSV file, or events, ROI statistics, traces and parameters to a binary .npz file.")
         self.btn_export_results.clicked.connect(self._export_results_action)
         self.btn_export_results.setEnabled(False)
 
@@ -223,6 +323,26 @@ class TransiScopeGUI:
         self.btn_show_summary_plot.setEnabled(False) # Disabled until analysis results are available
         controls_layout.addWidget(self.btn_show_summary_plot)
 
+        self.btn_event_maps = QPushButton("Compute Pixel-wise Event Maps")
+        self.btn_event_maps.setToolTip("Run the enabled threshold/DoG detectors on every pixel's trace and show event count and rate maps.")
+        self.btn_event_maps.setStatusTip("Run the enabled threshold/DoG detectors on every pixel's trace and show event count and rate maps.")
+        self.btn_event_maps.clicked.connect(self._compute_event_maps_action)
+        self.btn_event_maps.setEnabled(False) # Enabled once a file is loaded
+        controls_layout.addWidget(self.btn_event_maps)
+
+        # Progress of background computations (event maps, motion estimation)
+        self.task_progress_bar = QProgressBar()
+        self.task_progress_bar.setVisible(False)
+        self.btn_cancel_task = QPushButton("Cancel")
+        self.btn_cancel_task.setToolTip("Stop the running computation.")
+        self.btn_cancel_task.setStatusTip("Stop the running computation.")
+        self.btn_cancel_task.clicked.connect(self._cancel_task_action)
+        self.btn_cancel_task.setVisible(False)
+        task_layout = QHBoxLayout()
+        task_layout.addWidget(self.task_progress_bar)
+        task_layout.addWidget(self.btn_cancel_task)
+        controls_layout.addLayout(task_layout)
+
         controls_layout.addStretch() # Pushes buttons to bottom of its section
         # If you wanted the run analysis button at the very bottom, move addStretch above it
         # and then add the summary plot button. For now, placing both before stretch.
@@ -298,24 +418,21 @@ class TransiScopeGUI:
             show_warning("Please select one or more ROIs in the Shapes layer to auto-set parameters.")
             return
 
-        all_traces = []
-        roi_ids_for_log = []
-
+        selected_rois = []
         for roi_index in selected_roi_indices:
             roi_obj = self.roi_manager.get_roi_by_shape_index(roi_index)
             if not roi_obj:
                 show_error(f"Could not find ROI data for selected shape index {roi_index}.")
                 continue
-            
-            try:
-                intensity_trace = roi_obj.get_mean_intensity_trace(self.greyscale_stack)
-                if intensity_trace is not None:
-                    all_traces.append(intensity_trace)
-                    roi_ids_for_log.append(str(roi_obj.id))
-            except Exception as e:
-                show_error(f"Failed to calculate intensity for ROI {roi_obj.id}: {e}")
-                logger.error(f"Failed to calculate intensity for ROI {roi_obj.id}: {e}")
-        
+            selected_rois.append(roi_obj)
+
+        all_traces = []
+        roi_ids_for_log = [str(roi_obj.id) for roi_obj in selected_rois]
+        if selected_rois:
+            traces = roi_handler.extract_mean_intensity_traces(selected_rois, self.greyscale_stack)
+            if traces is not None:
+                all_traces = list(self._normalise_traces(traces)) # Estimate in the units detection will use
+
         if not all_traces:
             show_warning("Could not calculate intensity traces for any of the selected ROIs.")
             return
@@ -343,7 +460,8 @@ class TransiScopeGUI:
             sigma1, sigma2, prominence = estimated_params
             self.dog_sigma1_input.setValue(sigma1)
             self.dog_sigma2_input.setValue(sigma2)
-            self.dog_prominence_input.setValue(prominence)
+            # A prominence rounded to 0 by the spin box would switch to the dynamic threshold
+            self.dog_prominence_input.setValue(max(prominence, 10.0 ** -self.dog_prominence_input.decimals()))
             show_info(f"Successfully updated DoG parameters based on selection.")
         else:
             show_warning(f"Could not estimate DoG parameters for the selection. "
@@ -359,79 +477,249 @@ class TransiScopeGUI:
         if not file_path:
             return
 
-        self.raw_frames, self.metadata = io_operations.load_file(file_path)
+        # Drop the previous file's state; ROIs and the preview are rebuilt as the new file decodes.
+        if self.current_image_layer and self.current_image_layer in self.viewer.layers:
+            self.viewer.layers.remove(self.current_image_layer)
+        if self.shapes_layer and self.shapes_layer in self.viewer.layers:
+            self.viewer.layers.remove(self.shapes_layer)
+        self.current_image_layer = None
+        self.shapes_layer = None
+        self.greyscale_stack = None
+        self.uncorrected_stack = None
+        self.roi_manager = None
+        self.metadata = {}
+        self.btn_motion_correct.setChecked(False)
+        self.btn_motion_correct.setEnabled(False)
+        self.btn_add_roi_mode.setEnabled(False)
+        self.btn_clear_rois.setEnabled(False)
+        self.btn_import_rois.setEnabled(False)
+        self.btn_run_analysis.setEnabled(False)
+        self.btn_generate_rois.setEnabled(False)
+        self.btn_event_maps.setEnabled(False)
+        self.btn_export_rois.setEnabled(False)
+
+        self.lbl_file_info.setText(f"Loading: {file_path.split('/')[-1]}")
+        self.load_progress_bar.setRange(0, 0) # Busy indicator until the first progress report
+        self.load_progress_bar.setVisible(True)
+        self.btn_cancel_load.setEnabled(True)
+        self.btn_cancel_load.setVisible(True)
+        self.btn_load_avi.setEnabled(False)
+
+        # Decode on a worker thread so the viewer stays responsive. Only the greyscale stack is
+        # needed for display and analysis; colour frames can be re-read on demand with
+        # io_operations.iter_colour_frames.
+        self._load_thread = QThread()
+        self._load_worker = FileLoadWorker(file_path)
+        self._load_worker.moveToThread(self._load_thread)
+        self._load_thread.started.connect(self._load_worker.run)
+        # The receivers are plain methods rather than slots of a GUI-thread QObject, so Qt cannot use
+        # their thread affinity: queue explicitly so they always run on the GUI thread.
+        self._load_worker.progress.connect(self._on_load_progress, Qt.QueuedConnection)
+        self._load_worker.finished.connect(self._on_load_finished, Qt.QueuedConnection)
+        self._load_worker.finished.connect(self._load_thread.quit)
+        self._load_thread.finished.connect(self._release_load_thread)
+        self._load_thread.start()
+
+    def _release_load_thread(self):
+        # Only drop the references once the thread has stopped; a running QThread must not be deleted.
+        self._load_worker = None
+        self._load_thread = None
+        self.btn_load_avi.setEnabled(True)
+
+    def _cancel_load_action(self):
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+            self.btn_cancel_load.setEnabled(False)
+            self.lbl_file_info.setText("Cancelling...")
+
+    def _show_stack(self, stack: Any, name: str):
+        """Adds the stack as the image layer, or swaps the data of the existing one."""
+        if self.current_image_layer is not None and self.current_image_layer in self.viewer.layers:
+            self.current_image_layer.data = stack
+            return
+        self.current_image_layer = self.viewer.add_image(stack, name=name, metadata=self.metadata)
+        # Keep the image below the ROIs if the shapes layer was created first
+        self.viewer.layers.move(self.viewer.layers.index(self.current_image_layer), 0)
+        self.viewer.dims.current_step = (0,0,0) # Show first frame
+        self.viewer.reset_view()
+
+    def _on_load_progress(self, frames_done: int, total_frames: int, partial_stack: Any):
+        """Runs on the GUI thread for each (throttled) progress report from the load worker."""
+        if self._load_worker is None:
+            return
+        self.load_progress_bar.setRange(0, total_frames)
+        self.load_progress_bar.setValue(frames_done)
+        if partial_stack is None or len(partial_stack) == 0:
+            return
 
-        if self.raw_frames and self.metadata:
+        # The frame geometry is known from the first decoded frames: ROIs can be drawn right away.
+        if self.roi_manager is None:
+            height, width = partial_stack.shape[1:3]
+            self.roi_manager = roi_handler.ROIManager((total_frames, height, width))
+            self._setup_shapes_layer()
+            self.btn_add_roi_mode.setEnabled(True)
+            self.btn_clear_rois.setEnabled(True)
+            self.btn_import_rois.setEnabled(True)
+        # Preview the decoded greyscale frames (a colour TIFF shows once it has been converted)
+        if partial_stack.ndim == 3:
+            self._show_stack(partial_stack, f"Greyscale_{self._load_worker.file_path.split('/')[-1]}")
+
+    def _on_load_finished(self, greyscale_stack: Any, metadata: Optional[Dict[str, Any]]):
+        worker = self._load_worker
+        self.load_progress_bar.setVisible(False)
+        self.btn_cancel_load.setVisible(False)
+        file_path = worker.file_path
+
+        if greyscale_stack is not None and metadata:
+            self.greyscale_stack = greyscale_stack
+            self.metadata = metadata
             self.lbl_file_info.setText(
                 f"Loaded: {file_path.split('/')[-1]}\n"
                 f"Frames: {self.metadata['frame_count']}, "
                 f"FPS: {self.metadata['fps']:.2f}, "
                 f"Size: {self.metadata['height']}x{self.metadata['width']}"
             )
-            
-            # Convert to greyscale immediately for display and analysis
-            self.greyscale_stack = io_operations.convert_to_greyscale_stack(self.raw_frames)
-            if self.greyscale_stack is None:
-                show_error("Failed to convert video to greyscale stack.")
-                self.btn_add_roi_mode.setEnabled(False)
-                self.btn_run_analysis.setEnabled(False)
-                self.btn_export_rois.setEnabled(False)
-                return
-
-            # Clear previous layers
-            if self.current_image_layer and self.current_image_layer in self.viewer.layers:
-                self.viewer.layers.remove(self.current_image_layer)
-            if self.shapes_layer and self.shapes_layer in self.viewer.layers:
-                self.viewer.layers.remove(self.shapes_layer)
-            
-            self.current_image_layer = self.viewer.add_image(
-                self.greyscale_stack,
-                name=f"Greyscale_{file_path.split('/')[-1]}",
-                metadata=self.metadata
-            )
-            self.viewer.dims.current_step = (0,0,0) # Show first frame
-            self.viewer.reset_view()
-
-            # Initialize ROI Manager with correct image shape (T, H, W)
-            self.roi_manager = roi_handler.ROIManager(self.greyscale_stack.shape)
-            self._setup_shapes_layer()
+            self._show_stack(self.greyscale_stack, f"Greyscale_{file_path.split('/')[-1]}")
+            self.current_image_layer.metadata = self.metadata
+            self.current_image_layer.reset_contrast_limits()
+
+            # ROIs drawn during loading stay valid: only the frame count can differ from the estimate
+            if self.roi_manager is None:
+                self.roi_manager = roi_handler.ROIManager(self.greyscale_stack.shape)
+                self._setup_shapes_layer()
+            else:
+                self.roi_manager.update_image_shape(self.greyscale_stack.shape)
 
             self.btn_add_roi_mode.setEnabled(True)
             self.btn_clear_rois.setEnabled(True)
+            self.btn_import_rois.setEnabled(True)
             self.btn_run_analysis.setEnabled(True)
-            self.btn_export_rois.setEnabled(False)
+            self.btn_generate_rois.setEnabled(True)
+            self.btn_event_maps.setEnabled(True)
+            self.btn_motion_correct.setEnabled(True)
+            self.btn_export_rois.setEnabled(bool(self.roi_manager.get_all_rois()))
             show_info("File loaded and converted to greyscale.")
+            return
+
+        # Failed or cancelled: discard the preview and any ROIs drawn on it
+        for layer in (self.current_image_layer, self.shapes_layer):
+            if layer is not None and layer in self.viewer.layers:
+                self.viewer.layers.remove(layer)
+        self.current_image_layer = None
+        self.shapes_layer = None
+        self.roi_manager = None
+        if worker.cancelled:
+            show_info(f"Loading of {file_path} was cancelled.")
+            self.lbl_file_info.setText("Loading cancelled.")
         else:
             show_error(f"Failed to load file: {file_path}")
             self.lbl_file_info.setText("Failed to load file.")
-            self.btn_add_roi_mode.setEnabled(False)
-            self.btn_run_analysis.setEnabled(False)
-            self.btn_export_rois.setEnabled(False)
+        self.btn_add_roi_mode.setEnabled(False)
+        self.btn_clear_rois.setEnabled(False)
+        self.btn_import_rois.setEnabled(False)
+        self.btn_run_analysis.setEnabled(False)
+        self.btn_generate_rois.setEnabled(False)
+        self.btn_event_maps.setEnabled(False)
+        self.btn_motion_correct.setEnabled(False)
+        self.btn_export_rois.setEnabled(False)
 
+    def _toggle_motion_correction(self, checked: bool):
+        """Swaps the analysed stack for a lazily motion-corrected view of it, or back."""
+        if self.greyscale_stack is None:
+            self.btn_motion_correct.setChecked(False)
+            return
+        if not checked:
+            if self.uncorrected_stack is not None:
+                self.greyscale_stack = self.uncorrected_stack
+                self.uncorrected_stack = None
+                self.current_image_layer.data = self.greyscale_stack
+                logger.info("Motion correction removed.")
+            return
 
+        logger.info("--- Estimating motion (rigid phase correlation) ---")
+        stack = self.greyscale_stack
+        if not self._start_task("Motion estimation",
+                                lambda progress_callback: motion_correction.correct_motion(
+                                    stack, progress_callback=progress_callback),
+                                self._apply_motion_correction):
+            self.btn_motion_correct.setChecked(False)
+
+    def _apply_motion_correction(self, corrected: Optional[motion_correction.MotionCorrectedStack], cancelled: bool):
+        """Swaps in the motion-corrected view once the background shift estimation has finished."""
+        if corrected is None:
+            self.btn_motion_correct.setChecked(False)
+            if cancelled:
+                show_info("Motion correction cancelled.")
+            else:
+                show_error("Motion correction failed. See the log for details.")
+            return
+        # Traces cached for the loaded stack do not match the new object, so they are re-extracted
+        self.uncorrected_stack = self.greyscale_stack
+        self.greyscale_stack = corrected
+        self.current_image_layer.data = self.greyscale_stack
+        largest = np.abs(corrected.shifts).max()
+        show_info(f"Motion corrected (largest shift: {largest:.1f} px).")
 
     def _export_rois_action(self):
         if self.roi_manager is None or not self.roi_manager.get_all_rois():
             show_warning("No ROIs available to export.")
             return
 
-        output_path, _ = QFileDialog.getSaveFileName(self.main_widget, "Export ROIs to CSV", "", "CSV Files (*.csv)")
+        output_path, selected_filter = QFileDialog.getSaveFileName(
+            self.main_widget, "Export ROIs", "", "CSV Files (*.csv);;TransiScope Binary ROIs (*.npz)")
         if not output_path:
             return
 
-        success = self.roi_manager.export_rois_to_csv(output_path)
+        if output_path.lower().endswith(".npz") or "*.npz" in selected_filter:
+            success = self.roi_manager.export_rois_to_npz(output_path)
+        else:
+            success = self.roi_manager.export_rois_to_csv(output_path)
         if success:
             show_info(f"ROI data exported successfully to {output_path}")
         else:
             show_error(f"Failed to export ROI data to {output_path}")
 
+    def _import_rois_action(self):
+        if self.roi_manager is None or self.shapes_layer is None:
+            show_warning("Please load an image first.")
+            return
+
+        input_path, _ = QFileDialog.getOpenFileName(self.main_widget, "Import ROIs", "",
+                                                    "ROI Files (*.csv *.npz);;All Files (*)")
+        if not input_path:
+            return
+
+        first_index = len(self.shapes_layer.data)
+        if input_path.lower().endswith(".npz"):
+            new_rois = self.roi_manager.import_rois_from_npz(input_path, first_shape_index=first_index)
+        else:
+            new_rois = self.roi_manager.import_rois_from_csv(input_path, first_shape_index=first_index)
+        if new_rois is None:
+            show_error(f"Failed to import ROIs from {input_path}")
+            return
+        self._add_roi_shapes(new_rois, 'polygon')
+        show_info(f"Imported {len(new_rois)} ROIs from {input_path}")
+
+    def _add_roi_shapes(self, new_rois: List[roi_handler.ROI], shape_type: str):
+        """
+        Appends shapes for ROIs already registered in the ROIManager, in one bulk Shapes update.
+        The per-edit sync callback is blocked meanwhile, as there is nothing left to sync.
+        """
+        if new_rois:
+            with self.shapes_layer.events.data.blocker():
+                self.shapes_layer.add([roi_obj.vertices for roi_obj in new_rois], shape_type=shape_type)
+        for roi_obj in new_rois:
+            roi_obj.set_area_physical(self.pixel_size_um)
+        self._update_roi_labels()
+        self.btn_export_rois.setEnabled(bool(self.roi_manager.get_all_rois()))
+
     def _setup_shapes_layer(self):
         if self.shapes_layer and self.shapes_layer in self.viewer.layers:
             self.viewer.layers.remove(self.shapes_layer)
         
         self.shapes_layer = self.viewer.add_shapes(
             name='ROIs',
-            ndim=self.greyscale_stack.ndim -1, # ROIs are 2D on each T-slice
+            ndim=2, # ROIs are 2D on each T-slice
             face_color='transparent',
             edge_color='red',
             edge_width=2,
@@ -471,66 +759,75 @@ class TransiScopeGUI:
     def _on_roi_added_or_changed(self, event):
         """
         Callback for when data is added or changed in the Shapes layer.
-        This is where we create or update our internal ROI representations.
+        This is where we create, update or remove our internal ROI representations.
         """
         if not self.roi_manager or not self.shapes_layer:
             return
+        # napari announces edits before and after they happen; sync once they are done.
+        if getattr(event, 'action', None) in ('adding', 'changing', 'removing'):
+            return
 
-        # Enable the export button if there are ROIs
-        if self.roi_manager.get_all_rois():
-            self.btn_export_rois.setEnabled(True)
+        added, changed, removed = self.roi_manager.sync_shapes(self.shapes_layer.data)
+        self.btn_export_rois.setEnabled(len(self.shapes_layer.data) > 0)
+        if not (added or changed or removed):
+            return
 
-        # This event fires for any change, so we need to sync our state.
-        # Check if there are any shapes in the layer.
-        has_rois = len(self.shapes_layer.data) > 0
-        self.btn_export_rois.setEnabled(has_rois)
+        for roi_obj in added + changed:
+            # Update physical area right away if pixel size is set
+            roi_obj.set_area_physical(self.pixel_size_um)
+        for roi_obj in added:
+            show_info(f"ROI {roi_obj.id} added (Area: {roi_obj.area_pixels:.1f} px, {roi_obj.area_sq_um:.2f} µm²).")
+        for roi_obj in changed:
+            logger.info(f"ROI {roi_obj.id} updated (Area: {roi_obj.area_pixels:.1f} px, {roi_obj.area_sq_um:.2f} µm²).")
+        for roi_obj in removed:
+            logger.info(f"ROI {roi_obj.id} removed.")
+
+        self._update_roi_labels()
+
+        if added:
+            last_new_index = added[-1].shape_index
+            self.shapes_layer.selected_data = {last_new_index}
+            logger.info(f"Automatically selected new ROI (Shape index: {last_new_index}).")
+
+    def _update_roi_labels(self):
+        """Updates the Shapes layer text properties to show the ROI IDs."""
+        roi_ids = []
+        for i in range(len(self.shapes_layer.data)):
+            roi_obj = self.roi_manager.get_roi_by_shape_index(i)
+            roi_ids.append(str(roi_obj.id) if roi_obj else '')
+        self.shapes_layer.properties = {'roi_id': roi_ids}
+
+    def _generate_rois_action(self):
+        """Creates ROIs automatically (grid tiling or blob segmentation) and adds them in one bulk update."""
+        if self.greyscale_stack is None or self.roi_manager is None or self.shapes_layer is None:
+            show_warning("Please load an image first.")
+            return
 
-        all_shape_indices = set(range(len(self.shapes_layer.data)))
-        known_roi_indices = {roi.shape_index for roi in self.roi_manager.get_all_rois()}
-        
-        new_shape_indices = all_shape_indices - known_roi_indices
-
-        if new_shape_indices:
-            last_new_index = -1
-            for shape_index in new_shape_indices:
-                new_vertices = self.shapes_layer.data[shape_index]
-                # Napari vertices for a polygon are (N, D), D=2 for us.
-                # The coordinates are typically (row, column)
-                roi_obj = self.roi_manager.add_roi(new_vertices, shape_index)
-                if roi_obj:
-                    # Update physical area right away if pixel size is set
-                    roi_obj.set_area_physical(self.pixel_size_um)
-                    area_px = roi_obj.area_pixels
-                    area_um = roi_obj.area_sq_um
-                    show_info(f"ROI {roi_obj.id} added (Area: {area_px:.1f} px, {area_um:.2f} µm²).")
-                    last_new_index = shape_index
-                else:
-                    show_error(f"Failed to create internal ROI for shape index {shape_index}.")
-            
-            # Update text properties to show ROI IDs
-            text_properties = []
-            for i in range(len(self.shapes_layer.data)):
-                roi_obj = self.roi_manager.get_roi_by_shape_index(i)
-                if roi_obj:
-                    text_properties.append({'roi_id': str(roi_obj.id)})
-                else:
-                    text_properties.append({'roi_id': ''})
-            self.shapes_layer.properties = {'roi_id': [tp['roi_id'] for tp in text_properties]}
-            
-            if last_new_index != -1:
-                self.shapes_layer.selected_data = {last_new_index}
-                logger.info(f"Automatically selected new ROI (Shape index: {last_new_index}).")
-        
-        # Here you could also handle ROI modification or deletion by comparing
-        # the current shapes_layer.data with your ROIManager's state.
-        # For this example, we focus on adding new ROIs.
-        # For instance, to detect deletions:
-        deleted_indices = known_roi_indices - all_shape_indices
-        if deleted_indices:
-            # This logic needs to be more robust, as indices can change upon deletion
-            # A better approach is to map ROI IDs to shape indices and manage them carefully
-            # For now, this part is left as a comment. A full sync is more complex.
-            logger.warning(f"Deletion detected, but not handled yet. Indices: {deleted_indices}")
+        method = self.auto_roi_method_combo.currentText()
+        size = self.auto_roi_size_input.value()
+        masks = None
+        if method == "Grid":
+            vertices_list = roi_handler.grid_roi_vertices(self.greyscale_stack.shape[1:3], size)
+            shape_type = 'rectangle'
+        else:
+            projection_method = {"Blobs (Std Projection)": 'std', "Blobs (Max Projection)": 'max',
+                                 "Blobs (Correlation Projection)": 'correlation'}[method]
+            projection = roi_handler.compute_projection(self.greyscale_stack, method=projection_method)
+            if projection is None:
+                show_error("Could not compute the projection image. See the log for details.")
+                return
+            vertices_list, masks = roi_handler.segment_blob_rois(projection, min_area=size)
+            shape_type = 'polygon'
+        if not vertices_list:
+            show_warning("No ROIs were generated with these settings.")
+            return
+
+        first_index = len(self.shapes_layer.data)
+        new_rois = self.roi_manager.add_rois(vertices_list,
+                                             shape_indices=list(range(first_index, first_index + len(vertices_list))),
+                                             masks=masks)
+        self._add_roi_shapes(new_rois, shape_type)
+        show_info(f"Generated {len(new_rois)} ROIs ({method}).")
 
     def _toggle_roi_drawing_mode(self):
         if self.btn_add_roi_mode.isChecked():
@@ -565,8 +862,7 @@ class TransiScopeGUI:
             self.shapes_layer.data = [] # Clear from napari
             self.shapes_layer.refresh()
         if self.roi_manager:
-            self.roi_manager.rois = {} # Clear from our manager
-            self.roi_manager.next_roi_id = 1
+            self.roi_manager.clear() # Clear from our manager
         show_info("All ROIs cleared.")
         self.btn_export_rois.setEnabled(False) # Also disable export if no ROIs
         if self.btn_add_roi_mode.isChecked(): # If it was in drawing mode
@@ -590,6 +886,8 @@ class TransiScopeGUI:
         self.results_table.setRowCount(0) # Clear previous results
         self.all_detected_events = []
         self.roi_summary_stats.clear() # Clear previous summary stats
+        self.roi_traces.clear()
+        self.roi_trace_statistics.clear()
         self.btn_show_summary_plot.setEnabled(False) # Disable during analysis
         self.btn_export_results.setEnabled(False) # Disable during analysis
         
@@ -598,17 +896,32 @@ class TransiScopeGUI:
         observation_duration_seconds = total_frames / fps
 
         rois_to_analyze = self.roi_manager.get_all_rois()
+        # All traces in one pass over the stack
+        detection_statistic = self.trace_statistic_combo.currentData()
+        statistics = ['mean', detection_statistic]
+        if self.cb_record_all_statistics.isChecked():
+            statistics += list(roi_handler.TRACE_STATISTICS)
+        if set(statistics) == {'mean'}:
+            all_traces = roi_handler.extract_mean_intensity_traces(rois_to_analyze, self.greyscale_stack)
+            detection_traces = all_traces
+        else:
+            trace_statistics = roi_handler.extract_intensity_statistics(rois_to_analyze, self.greyscale_stack, statistics)
+            all_traces = trace_statistics['mean'] if trace_statistics is not None else None
+            detection_traces = trace_statistics[detection_statistic] if trace_statistics is not None else None
+            if trace_statistics is not None and self.cb_record_all_statistics.isChecked():
+                self.roi_trace_statistics = {roi_obj.id: stats for roi_obj, stats in zip(rois_to_analyze, trace_statistics)}
+        if all_traces is None:
+            show_error("Could not calculate ROI intensity traces. See the log for details.")
+            logger.info("--- Full Analysis Aborted ---")
+            return
+        detection_traces = self._normalise_traces(detection_traces) # All ROIs at once
 
-        for roi_obj in rois_to_analyze:
+        for roi_obj, mean_trace, intensity_trace in zip(rois_to_analyze, all_traces, detection_traces):
             logger.info(f"Analyzing ROI ID: {roi_obj.id}, Area: {roi_obj.area_pixels:.1f} px, {roi_obj.area_sq_um or 0:.2f} µm²")
             if roi_obj.area_sq_um is None or roi_obj.area_sq_um <= 0:
                 logger.warning(f"ROI {roi_obj.id} has zero or uncalculated physical area. Skipping normalization for this ROI.")
                 # Continue to detection, but normalization will be 0 or NaN
-            
-            intensity_trace = roi_obj.get_mean_intensity_trace(self.greyscale_stack)
-            if intensity_trace is None:
-                logger.error(f"Could not get intensity trace for ROI {roi_obj.id}. Skipping analysis for this ROI.")
-                continue
+            self.roi_traces[roi_obj.id] = mean_trace
 
             roi_events: List[analysis_processor.Event] = []
             # 1. Threshold Detection
@@ -701,26 +1014,221 @@ class TransiScopeGUI:
             self.btn_export_results.setEnabled(True) # Enable if events were found
         logger.info("--- Full Analysis Finished ---")
 
+    def _start_task(self, description: str, function: Callable[..., Any],
+                    on_done: Callable[[Any, bool], None]) -> bool:
+        """
+        Runs `function(progress_callback=...)` on a background thread with a progress bar and cancel button.
+
+        `on_done(result, cancelled)` runs on the GUI thread afterwards. Controls that read or replace
+        the stack are disabled meanwhile. Returns False if another computation is still running.
+        """
+        if self._task_thread is not None:
+            show_warning("Another computation is still running.")
+            return False
+        self._task_done = on_done
+        for button in (self.btn_load_avi, self.btn_run_analysis, self.btn_event_maps, self.btn_motion_correct):
+            button.setEnabled(False)
+        self.task_progress_bar.setFormat(f"{description}: %p%")
+        self.task_progress_bar.setRange(0, 0) # Busy indicator until the first progress report
+        self.task_progress_bar.setVisible(True)
+        self.btn_cancel_task.setEnabled(True)
+        self.btn_cancel_task.setVisible(True)
+
+        self._task_thread = QThread()
+        self._task_worker = TaskWorker(function)
+        self._task_worker.moveToThread(self._task_thread)
+        self._task_thread.started.connect(self._task_worker.run)
+        # Queued explicitly: the receivers are not slots of a GUI-thread QObject (see _load_avi_action)
+        self._task_worker.progress.connect(self._on_task_progress, Qt.QueuedConnection)
+        self._task_worker.finished.connect(self._on_task_finished, Qt.QueuedConnection)
+        self._task_worker.finished.connect(self._task_thread.quit)
+        self._task_thread.finished.connect(self._release_task_thread)
+        self._task_thread.start()
+        return True
+
+    def _on_task_progress(self, done: int, total: int):
+        self.task_progress_bar.setRange(0, total)
+        self.task_progress_bar.setValue(done)
+
+    def _on_task_finished(self, result: Any):
+        self.task_progress_bar.setVisible(False)
+        self.btn_cancel_task.setVisible(False)
+        has_stack = self.greyscale_stack is not None
+        for button in (self.btn_run_analysis, self.btn_event_maps, self.btn_motion_correct):
+            button.setEnabled(has_stack)
+        on_done, self._task_done = self._task_done, None
+        on_done(result, self._task_worker.cancelled)
+
+    def _release_task_thread(self):
+        # As for the load thread: drop the references only once the thread has stopped.
+        self._task_worker = None
+        self._task_thread = None
+        self.btn_load_avi.setEnabled(True)
+
+    def _cancel_task_action(self):
+        if self._task_worker is not None:
+            self._task_worker.cancel()
+            self.btn_cancel_task.setEnabled(False)
+
+    def _compute_event_maps_action(self):
+        """Runs the enabled detectors pixel by pixel in the background and shows the event count and rate maps."""
+        if self.greyscale_stack is None or self.metadata.get('fps', 0) <= 0:
+            show_warning("Please load data with a valid FPS first.")
+            return
+
+        runs = []
+        if self.cb_enable_threshold.isChecked():
+            runs.append(('threshold', {
+                'threshold_value': self.threshold_value_input.value() if not self.cb_use_otsu.isChecked() else None,
+                'use_otsu': self.cb_use_otsu.isChecked()}))
+        if self.cb_enable_dog.isChecked():
+            prom = self.dog_prominence_input.value()
+            runs.append(('dog', {
+                'sigma1': self.dog_sigma1_input.value(), 'sigma2': self.dog_sigma2_input.value(),
+                'min_prominence': prom if prom > 0 else None}))
+        if not runs:
+            show_warning("Enable threshold and/or DoG detection to compute event maps.")
+            return
+
+        # Everything the worker needs is captured here; it must not read widgets off the GUI thread
+        stack, fps, dff_params = self.greyscale_stack, self.metadata['fps'], self._dff_parameters()
+
+        def compute(progress_callback):
+            results, cancelled = [], []
+            for i, (method, params) in enumerate(runs):
+                logger.info(f"--- Pixel-wise {method} detection ---")
+                # Each enabled detector is one equal share of the progress bar
+                def run_progress(done, total, partial, i=i):
+                    keep_going = progress_callback(i * total + done, len(runs) * total, partial)
+                    if not keep_going:
+                        cancelled.append(method)
+                    return keep_going
+                try:
+                    maps = analysis_processor.detect_events_pixelwise(
+                        stack, fps, method=method, dff_params=dff_params,
+                        progress_callback=run_progress, **params)
+                except ValueError as e:
+                    results.append((method, None, str(e)))
+                    continue
+                if cancelled:
+                    break
+                results.append((method, maps, None))
+            return results
+
+        self._start_task("Event maps", compute, self._show_event_maps)
+
+    def _show_event_maps(self, results: Optional[List[Any]], cancelled: bool):
+        """Adds (or refreshes) the event count and rate image layers from a finished event-map run."""
+        for method, maps, error in results or []:
+            if error is not None:
+                show_error(f"Pixel-wise {method} detection failed: {error}")
+                continue
+            if maps is None:
+                show_error(f"Pixel-wise {method} detection failed. See the log for details.")
+                continue
+            for name, data in ((f"Event Count ({method})", maps['event_count']),
+                               (f"Event Rate ({method}, events/s)", maps['event_rate'])):
+                if name in self.viewer.layers:
+                    self.viewer.layers[name].data = data
+                    self.viewer.layers[name].reset_contrast_limits()
+                else:
+                    self.viewer.add_image(data, name=name, colormap='inferno', blending='additive', visible=False)
+            self.viewer.layers[f"Event Rate ({method}, events/s)"].visible = True
+        if cancelled:
+            show_info("Pixel-wise event maps cancelled.")
+        elif results is not None:
+            show_info("Pixel-wise event maps computed.")
+        else:
+            show_error("Pixel-wise event maps failed. See the log for details.")
+
+    def _update_detection_units(self, dff_enabled: bool):
+        """Switches the threshold and prominence inputs between intensity and ΔF/F scales."""
+        self._detection_values[not dff_enabled] = (self.threshold_value_input.value(),
+                                                   self.dog_prominence_input.value())
+        threshold, prominence = self._detection_values[dff_enabled]
+        if dff_enabled:
+            decimals, step, threshold_max, prominence_max = 4, 0.01, 100.0, 100.0
+            threshold_tip = "Set the minimum ΔF/F (e.g. 0.2 = 20% above baseline) to be considered an event."
+            prominence_tip = "Min prominence for DoG peaks, in ΔF/F units. Set to 0 to use dynamic threshold."
+        else:
+            decimals, step, threshold_max, prominence_max = 2, 1.0, 65535.0, 1000.0 # Assuming up to 16-bit
+            threshold_tip = "Set the minimum intensity value to be considered an event."
+            prominence_tip = "Min prominence for DoG peaks. Set to 0 to use dynamic threshold."
+        for spin_box, maximum, value, tip in ((self.threshold_value_input, threshold_max, threshold, threshold_tip),
+                                              (self.dog_prominence_input, prominence_max, prominence, prominence_tip)):
+            spin_box.setDecimals(decimals) # Before setValue, which rounds to the current decimals
+            spin_box.setSingleStep(step)
+            spin_box.setRange(0.0, maximum)
+            spin_box.setValue(value)
+            spin_box.setToolTip(tip)
+            spin_box.setStatusTip(tip)
+
+    def _dff_parameters(self) -> Optional[Dict[str, Any]]:
+        """`compute_dff` keyword arguments for the current settings, or None if ΔF/F is disabled."""
+        if not self.cb_enable_dff.isChecked():
+            return None
+        method = self.dff_method_combo.currentData()
+        return {
+            'window_frames': max(1, int(round(self.dff_window_input.value() * self.metadata['fps']))),
+            'method': method,
+            'percentile': self.dff_percentile_input.value(),
+            # Light smoothing keeps noise dips from dragging a minimum-type baseline down
+            'smooth_sigma': 1.0 if method != 'percentile' else 0.0,
+        }
+
+    def _normalise_traces(self, traces: np.ndarray) -> np.ndarray:
+        """Applies the ΔF/F normalisation to (R, T) traces if it is enabled; otherwise returns them unchanged."""
+        dff_params = self._dff_parameters()
+        if dff_params is None:
+            return traces
+        logger.info(f"Normalising traces to ΔF/F ({dff_params['method']} baseline, "
+                    f"{dff_params['window_frames']}-frame window).")
+        return analysis_processor.compute_dff(traces, **dff_params)
+
+    def _analysis_parameters(self) -> Dict[str, Any]:
+        """The detection settings and file metadata of the current analysis, for result provenance."""
+        return {
+            "file_metadata": self.metadata,
+            "pixel_size_um": self.pixel_size_um,
+            "detection_statistic": self.trace_statistic_combo.currentData(),
+            "dff": {"enabled": self.cb_enable_dff.isChecked(),
+                    "method": self.dff_method_combo.currentData(),
+                    "window_s": self.dff_window_input.value(),
+                    "percentile": self.dff_percentile_input.value()},
+            "threshold": {"enabled": self.cb_enable_threshold.isChecked(),
+                          "value": self.threshold_value_input.value(),
+                          "use_otsu": self.cb_use_otsu.isChecked()},
+            "dog": {"enabled": self.cb_enable_dog.isChecked(),
+                    "sigma1": self.dog_sigma1_input.value(),
+                    "sigma2": self.dog_sigma2_input.value(),
+                    "min_prominence": self.dog_prominence_input.value()},
+            "scisson": {"enabled": self.cb_enable_scisson.isChecked(),
+                        "penalty": self.scisson_penalty_input.value()},
+            "min_event_separation_s": self.min_event_separation_input.value(),
+        }
+
     def _export_results_action(self):
-        """Exports the data from the results table to a CSV file."""
-        if self.results_table.rowCount() == 0 or self.analysis_timestamp is None:
+        """Exports the detected events (not the rounded table text) to CSV or binary .npz."""
+        if not self.all_detected_events or self.analysis_timestamp is None:
             show_warning("No analysis results available to export. Please run analysis first.")
             return
 
-        output_path, _ = QFileDialog.getSaveFileName(self.main_widget, "Export Analysis Results", "", "CSV Files (*.csv)")
+        output_path, selected_filter = QFileDialog.getSaveFileName(
+            self.main_widget, "Export Analysis Results", "",
+            "CSV Files (*.csv);;TransiScope Binary Results (*.npz)")
         if not output_path:
             return
 
-        # Prepare headers and data from the QTableWidget
-        headers = [self.results_table.horizontalHeaderItem(i).text() for i in range(self.results_table.columnCount())]
-        table_data = []
-        for row in range(self.results_table.rowCount()):
-            row_data = [self.results_table.item(row, col).text() for col in range(self.results_table.columnCount())]
-            table_data.append(row_data)
-        
         timestamp_str = self.analysis_timestamp.strftime("%Y-%m-%d %H:%M:%S")
 
-        success = io_operations.export_results_to_csv(output_path, headers, table_data, timestamp_str)
+        if output_path.lower().endswith(".npz") or "*.npz" in selected_filter:
+            success = io_operations.export_results_to_npz(output_path, self.all_detected_events,
+                                                          self.roi_summary_stats, self.roi_traces,
+                                                          self._analysis_parameters(), timestamp_str,
+                                                          trace_statistics=self.roi_trace_statistics)
+        else:
+            success = io_operations.export_events_to_csv(output_path, self.all_detected_events,
+                                                         self.roi_summary_stats, timestamp_str)
 
         if success:
             show_info(f"Results successfully exported to {output_path}")
@@ -786,15 +1294,90 @@ class TransiScopeGUI:
         logger.info("Summary plot with standard errors displayed.")
 
 
+class FileLoadWorker(QObject):
+    """Runs io_operations.load_file on a background QThread, reporting progress through signals."""
+    progress = Signal(int, int, object) # frames_done, total_frames, stack decoded so far
+    finished = Signal(object, object) # greyscale stack, metadata ((None, None) on failure or cancel)
+    PROGRESS_INTERVAL_S = 0.25 # Minimum time between preview refreshes
+
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+        self.cancelled = False
+        self._last_report = 0.0
+
+    def cancel(self):
+        """Requests cancellation; the loader stops at its next progress report."""
+        self.cancelled = True
+
+    def _on_progress(self, frames_done: int, total_frames: int, partial_stack: Any) -> bool:
+        now = time.monotonic()
+        if frames_done >= total_frames or now - self._last_report >= self.PROGRESS_INTERVAL_S:
+            self._last_report = now
+            self.progress.emit(frames_done, total_frames, partial_stack)
+        return not self.cancelled
+
+    def run(self):
+        try:
+            greyscale_stack, metadata = io_operations.load_file(
+                self.file_path, greyscale=True, progress_callback=self._on_progress)
+        except Exception as e:
+            logger.error(f"Unexpected error loading {self.file_path}: {e}")
+            greyscale_stack, metadata = None, None
+        self.finished.emit(greyscale_stack, metadata)
+
+
+class TaskWorker(QObject):
+    """Runs a whole-stack computation on a background QThread, reporting progress through signals."""
+    progress = Signal(int, int) # done, total
+    finished = Signal(object) # the function's result (None on error)
+    PROGRESS_INTERVAL_S = 0.1 # Minimum time between progress bar updates
+
+    def __init__(self, function: Callable[..., Any]):
+        super().__init__()
+        self.function = function # Called as function(progress_callback=...)
+        self.cancelled = False
+        self._last_report = 0.0
+
+    def cancel(self):
+        """Requests cancellation; the computation stops at its next progress report."""
+        self.cancelled = True
+
+    def _on_progress(self, done: int, total: int, partial: Any = None) -> bool:
+        now = time.monotonic()
+        if done >= total or now - self._last_report >= self.PROGRESS_INTERVAL_S:
+            self._last_report = now
+            self.progress.emit(done, total)
+        return not self.cancelled
+
+    def run(self):
+        try:
+            result = self.function(progress_callback=self._on_progress)
+        except Exception as e:
+            logger.error(f"Unexpected error in background computation: {e}")
+            result = None
+        self.finished.emit(result)
+
+
+class _LogEmitter(QObject):
+    message = Signal(str)
+
+
 # For piping logs to QTextEdit
 class QtLogHandler(logging.Handler):
     def __init__(self, text_widget):
         super().__init__()
         self.widget = text_widget
         self.widget.setReadOnly(True)
+        # Records also arrive from worker threads; the queued signal delivers them on the GUI thread
+        # (the handler is not a QObject, so the connection type must be explicit).
+        self._emitter = _LogEmitter()
+        self._emitter.message.connect(self._append, Qt.QueuedConnection)
 
     def emit(self, record):
-        msg = self.format(record)        
+        self._emitter.message.emit(self.format(record))
+
+    def _append(self, msg: str):
         self.widget.append(msg)
         self.widget.verticalScrollBar().setValue(self.widget.verticalScrollBar().maximum()) # Auto-scroll
 
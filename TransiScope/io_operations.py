@@ -1,44 +1,243 @@
 import cv2
 import numpy as np
 import tifffile
-from typing import Tuple, List, Optional, Dict, Any
+from typing import Tuple, List, Optional, Dict, Any, Iterator, Union, Callable
 import logging
 import csv
+import itertools
+import json
+import os
+import struct
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from . import cache_manager
 
 logger = logging.getLogger(__name__)
 
-def load_avi(file_path: str) -> Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
+CropBox = Tuple[int, int, int, int] # (y0, y1, x0, x1), half-open pixel bounds
+
+# progress_callback(frames_done, total_frames, partial_stack) -> keep_going. `partial_stack` holds the
+# frames decoded so far (a view of the output buffer); returning False cancels the load.
+ProgressCallback = Callable[[int, int, Any], bool]
+_PROGRESS_INTERVAL_FRAMES = 32 # Frames decoded between progress reports
+
+
+class LoadCancelled(Exception):
+    """Raised internally when a progress callback cancels a load."""
+
+
+def _report_progress(progress_callback: Optional[ProgressCallback], done: int, total: int, partial: Any):
+    if progress_callback is not None and progress_callback(done, max(total, done), partial) is False:
+        raise LoadCancelled()
+
+
+def _phase_progress(progress_callback: Optional[ProgressCallback], phase: int,
+                    num_phases: int) -> Optional[ProgressCallback]:
+    """Maps a loader's own 0..total progress onto one of `num_phases` equal parts of the overall load."""
+    if progress_callback is None or num_phases == 1:
+        return progress_callback
+    return lambda done, total, partial: progress_callback(phase * total + done, num_phases * total, partial)
+
+
+def _normalise_frame_bounds(start: int, stop: Optional[int], num_frames: int) -> Tuple[int, Optional[int]]:
+    """
+    Resolves negative `start`/`stop` as Python slices do (-1 is the last frame, clipped at 0).
+
+    Non-negative values are returned unchanged, so a stop past an under-reported frame count still
+    reads to the end of the file. Negative values need the frame count and raise ValueError if it
+    is unknown (0).
+    """
+    if start < 0 or (stop is not None and stop < 0):
+        if num_frames <= 0:
+            raise ValueError(f"Negative start/stop need a known frame count. Got start={start}, stop={stop}.")
+        start = max(0, start + num_frames) if start < 0 else start
+        stop = max(0, stop + num_frames) if stop is not None and stop < 0 else stop
+    return start, stop
+
+
+def _resolve_frame_range(start: int, stop: Optional[int], step: int, num_frames: int) -> range:
+    """
+    Validates a start/stop/step frame selection against the number of frames available.
+
+    `start` and `stop` follow Python slice semantics: negative values count from the end and
+    `stop` is clipped to the frame count (e.g. stop=-1 selects every frame but the last).
+    """
+    if step < 1:
+        raise ValueError(f"step must be a positive integer. Got {step}.")
+    start, stop = _normalise_frame_bounds(start, stop, num_frames)
+    stop = num_frames if stop is None else min(stop, num_frames)
+    return range(start, stop, step)
+
+
+def _resolve_crop(crop: Optional[CropBox], height: int, width: int) -> CropBox:
+    """Clips a (y0, y1, x0, x1) crop box to the frame; `None` selects the full frame."""
+    if crop is None:
+        return (0, height, 0, width)
+    y0, y1, x0, x1 = (int(v) for v in crop)
+    y0, y1 = max(0, y0), min(height, y1)
+    x0, x1 = max(0, x0), min(width, x1)
+    if y0 >= y1 or x0 >= x1:
+        raise ValueError(f"Crop {tuple(crop)} does not overlap the {height}x{width} frame.")
+    return (y0, y1, x0, x1)
+
+
+def _add_subset_metadata(metadata: Dict[str, Any], source_fps: float, source_frame_count: int,
+                         source_height: int, source_width: int, start: int, step: int,
+                         crop_box: CropBox) -> Dict[str, Any]:
+    """
+    Records how a loaded stack relates to the source file.
+
+    `fps`, `frame_count`, `height` and `width` describe the returned stack; the `source_*` keys
+    describe the file, `frame_range` is the (start, stop, step) of the frames read and `crop` is
+    the (y0, y1, x0, x1) box that was kept.
+    """
+    metadata.update({
+        "fps": source_fps / step if source_fps else source_fps,
+        "source_fps": source_fps,
+        "source_frame_count": source_frame_count,
+        "source_height": source_height,
+        "source_width": source_width,
+        "frame_range": (start, start + metadata["frame_count"] * step, step),
+        "crop": crop_box,
+    })
+    return metadata
+
+
+def _iter_avi_frames(cap: "cv2.VideoCapture", start: int = 0, stop: Optional[int] = None, step: int = 1,
+                     reuse_buffer: bool = False) -> Iterator[np.ndarray]:
+    """
+    Yields frames start, start + step, ... (before `stop`, if given) from an opened capture.
+
+    Seeks to `start` with CAP_PROP_POS_FRAMES when the backend supports it. Frames skipped by
+    `step` are only grabbed, never retrieved, so they are not converted to BGR. With
+    `reuse_buffer` every frame is decoded into the same array, which the caller must consume
+    before advancing.
+    """
+    position = 0
+    if start > 0 and cap.set(cv2.CAP_PROP_POS_FRAMES, start) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        position = start # Otherwise fall back to grabbing up to `start` below
+
+    frame = None
+    while stop is None or position < stop:
+        if position < start or (position - start) % step:
+            if not cap.grab():
+                return
+        else:
+            ret, frame = cap.read(frame if reuse_buffer else None)
+            if not ret:
+                return
+            yield frame
+        position += 1
+
+
+def _grow_stack_buffer(buffer: np.ndarray, min_frames: int) -> np.ndarray:
+    """Returns a copy of `buffer` with capacity for at least `min_frames` frames, doubling geometrically."""
+    new_capacity = max(min_frames, 2 * buffer.shape[0])
+    grown = np.empty((new_capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:buffer.shape[0]] = buffer
+    return grown
+
+
+def _decode_avi_to_greyscale(cap: "cv2.VideoCapture", expected_frames: int, start: int = 0,
+                             stop: Optional[int] = None, step: int = 1,
+                             crop_box: Optional[CropBox] = None,
+                             progress_callback: Optional[ProgressCallback] = None) -> Optional[np.ndarray]:
+    """
+    Decodes the selected frames of an opened capture straight into a (T, H, W) greyscale buffer.
+
+    The buffer is preallocated from `expected_frames` (derived from CAP_PROP_FRAME_COUNT) and grown
+    geometrically if the container under-reports its length. Only one colour frame is alive at a
+    time, and only the `crop_box` region of it is converted.
+
+    Returns:
+        Optional[np.ndarray]: The greyscale stack, or None if no frame could be read.
+    """
+    buffer: Optional[np.ndarray] = None
+    num_frames = 0
+    for frame in _iter_avi_frames(cap, start, stop, step, reuse_buffer=True):
+        if crop_box is not None:
+            y0, y1, x0, x1 = crop_box
+            frame = frame[y0:y1, x0:x1]
+        if buffer is None:
+            buffer = np.empty((max(expected_frames, 1),) + frame.shape[:2], dtype=frame.dtype)
+        elif num_frames == buffer.shape[0]:
+            logger.debug(f"Frame count hint ({expected_frames}) exceeded; growing greyscale buffer.")
+            buffer = _grow_stack_buffer(buffer, num_frames + 1)
+
+        if frame.ndim == 3 and frame.shape[2] == 3:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffer[num_frames])
+        elif frame.ndim == 3 and frame.shape[2] == 4:
+            cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY, dst=buffer[num_frames])
+        else:
+            buffer[num_frames] = frame
+        num_frames += 1
+        if num_frames % _PROGRESS_INTERVAL_FRAMES == 0:
+            _report_progress(progress_callback, num_frames, expected_frames, buffer[:num_frames])
+
+    if buffer is None:
+        return None
+    _report_progress(progress_callback, num_frames, num_frames, buffer[:num_frames])
+    # Trailing capacity (over-reported frame count) is dropped by slicing, not copying.
+    return buffer[:num_frames]
+
+
+def load_avi(file_path: str, greyscale: bool = False, start: int = 0, stop: Optional[int] = None,
+             step: int = 1, crop: Optional[CropBox] = None,
+             progress_callback: Optional[ProgressCallback] = None) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
     """
     Loads an .avi file and extracts frames and metadata.
 
     Args:
         file_path (str): Path to the .avi file.
+        greyscale (bool): If True, decode straight into a single (T, H, W) greyscale array
+                          without keeping the colour frames. Peak memory is then about the size
+                          of the greyscale stack instead of several times it.
+        start (int): First frame to read. The capture seeks there instead of decoding from 0.
+        stop (Optional[int]): Frame index to stop before (default: end of file). Negative start
+                              and stop count from the end, as in a slice.
+        step (int): Read every `step`-th frame; skipped frames are grabbed but not decoded to BGR.
+        crop (Optional[Tuple[int, int, int, int]]): (y0, y1, x0, x1) region to keep from each frame.
+        progress_callback (Optional[ProgressCallback]): Called every few frames with
+            (frames_done, total_frames, frames_so_far); return False to cancel the load.
 
     Returns:
-        Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
-            A list of frames (each as a NumPy array) and a dictionary of metadata.
+        Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+            A list of frames (each as a NumPy array), or a (T, H, W) greyscale array if
+            `greyscale` is True, and a dictionary of metadata. The metadata's `fps`,
+            `frame_count`, `height` and `width` describe the returned frames (fps is divided by
+            `step`); the original values are kept under the `source_*` keys.
             Returns (None, None) if loading fails.
     """
+    if greyscale:
+        return _load_avi_greyscale(file_path, start, stop, step, crop, progress_callback)
     try:
         cap = cv2.VideoCapture(file_path)
         if not cap.isOpened():
             logger.error(f"Error: Could not open AVI file: {file_path}")
             return None, None
 
-        frames: List[np.ndarray] = []
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frames.append(frame)
-
         fps = cap.get(cv2.CAP_PROP_FPS)
         # Default values from cap.get initially
         frame_count_meta = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         height_meta = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         width_meta = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        crop_box = _resolve_crop(crop, height_meta, width_meta)
+        start, stop = _normalise_frame_bounds(start, stop, frame_count_meta)
+        _resolve_frame_range(start, stop, step, frame_count_meta) # Validates start/step
 
-        cap.release()
+        frames: List[np.ndarray] = []
+        y0, y1, x0, x1 = crop_box
+        expected_frames = len(_resolve_frame_range(start, stop, step, frame_count_meta))
+        try:
+            for frame in _iter_avi_frames(cap, start, stop, step):
+                # Copy the crop so the full decoded frame can be freed
+                frames.append(frame[y0:y1, x0:x1].copy() if crop is not None else frame)
+                if len(frames) % _PROGRESS_INTERVAL_FRAMES == 0:
+                    _report_progress(progress_callback, len(frames), expected_frames, frames)
+        finally:
+            cap.release()
 
         if not frames:
             logger.warning(f"No frames extracted from {file_path}. File might be empty or corrupted after attempting to read all frames.")
@@ -81,53 +280,296 @@ def load_avi(file_path: str) -> Tuple[Optional[List[np.ndarray]], Optional[Dict[
             "width": actual_width,             # Use actual width
             "original_format": "AVI"
         }
+        _add_subset_metadata(metadata, fps, frame_count_meta, height_meta, width_meta, start, step, crop_box)
         # Update log message to reflect actual read count if different from cap.get()
         if actual_frame_count != frame_count_meta:
             logger.info(f"Successfully loaded {file_path}. Actual Frames: {actual_frame_count} (cap.get reported: {frame_count_meta}), FPS: {fps}, Dimensions: {actual_height}x{actual_width}")
         else:
             logger.info(f"Successfully loaded {file_path}. Frames: {actual_frame_count}, FPS: {fps}, Dimensions: {actual_height}x{actual_width}")
         return frames, metadata
+    except LoadCancelled:
+        logger.info(f"Loading of {file_path} was cancelled.")
+        return None, None
     except Exception as e:
         logger.error(f"An unexpected error occurred while loading AVI {file_path}: {e}")
         return None, None
 
 
-def load_multitiff(file_path: str, fps: float = 30.0) -> Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
+def _load_avi_greyscale(file_path: str, start: int = 0, stop: Optional[int] = None, step: int = 1,
+                        crop: Optional[CropBox] = None,
+                        progress_callback: Optional[ProgressCallback] = None) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+    """Streaming greyscale variant of `load_avi`; see `_decode_avi_to_greyscale`."""
+    try:
+        cap = cv2.VideoCapture(file_path)
+        if not cap.isOpened():
+            logger.error(f"Error: Could not open AVI file: {file_path}")
+            return None, None
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count_meta = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        height_meta = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        width_meta = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        try:
+            crop_box = _resolve_crop(crop, height_meta, width_meta)
+            start, stop = _normalise_frame_bounds(start, stop, frame_count_meta)
+            expected_frames = len(_resolve_frame_range(start, stop, step, frame_count_meta))
+            stack = _decode_avi_to_greyscale(cap, expected_frames, start, stop, step,
+                                             crop_box if crop is not None else None, progress_callback)
+        finally:
+            cap.release()
+
+        if stack is None:
+            logger.warning(f"No frames extracted from {file_path}. File might be empty or corrupted.")
+            return None, None
+
+        actual_frame_count, actual_height, actual_width = stack.shape
+        metadata = {
+            "file_path": file_path,
+            "fps": fps,
+            "frame_count": actual_frame_count,
+            "height": actual_height,
+            "width": actual_width,
+            "original_format": "AVI"
+        }
+        _add_subset_metadata(metadata, fps, frame_count_meta, height_meta, width_meta, start, step, crop_box)
+        if actual_frame_count != expected_frames:
+            logger.info(f"Successfully loaded {file_path} as greyscale. Actual Frames: {actual_frame_count} (expected from cap.get: {expected_frames}), FPS: {metadata['fps']}, Dimensions: {actual_height}x{actual_width}")
+        else:
+            logger.info(f"Successfully loaded {file_path} as greyscale. Frames: {actual_frame_count}, FPS: {metadata['fps']}, Dimensions: {actual_height}x{actual_width}")
+        return stack, metadata
+    except LoadCancelled:
+        logger.info(f"Loading of {file_path} was cancelled.")
+        return None, None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while loading AVI {file_path}: {e}")
+        return None, None
+
+
+class LazyTiffStack:
+    """
+    Read-only (T, H, W) or (T, H, W, C) view of a multi-page TIFF that decodes pages on access.
+
+    Used for files that cannot be memory-mapped (e.g. compressed pages). Only the pages touched by
+    an index expression are decoded, so napari and the ROI trace code can work on recordings that
+    do not fit in RAM. Supports the subset of NumPy indexing those consumers need: an int, slice or
+    integer array on the time axis, followed by any index valid for a single frame.
+
+    `frame_range` (a range of page indices) and `crop` (y0, y1, x0, x1) restrict the stack to a
+    subset of the file; they are applied as each page is read.
+    """
+    def __init__(self, file_path: str, frame_range: Optional[range] = None, crop: Optional[CropBox] = None):
+        self.file_path = file_path
+        self._tif = tifffile.TiffFile(file_path)
+        self._tif.pages.cache = False  # Never keep decoded pages around
+        self._tif.pages.useframes = True
+        self._lock = threading.Lock()
+        self._page_indices = range(len(self._tif.pages)) if frame_range is None else frame_range
+        if len(self._page_indices) == 0:
+            self._tif.close()
+            raise ValueError(f"No pages found in TIFF file: {file_path}")
+        first_page = self._tif.pages[0]
+        frame_shape = tuple(first_page.shape)
+        self._crop: Optional[Tuple[slice, slice]] = None
+        if crop is not None:
+            y0, y1, x0, x1 = crop
+            self._crop = (slice(y0, y1), slice(x0, x1))
+            frame_shape = (y1 - y0, x1 - x0) + frame_shape[2:]
+        self.dtype = np.dtype(first_page.dtype)
+        self.shape: Tuple[int, ...] = (len(self._page_indices),) + frame_shape
+        self.ndim = len(self.shape)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _read_frame(self, index: int) -> np.ndarray:
+        with self._lock:
+            frame = self._tif.pages[self._page_indices[index]].asarray()
+        return frame[self._crop] if self._crop is not None else frame
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if key and key[0] is Ellipsis:
+            key = (slice(None),) * (self.ndim - len(key) + 1) + key[1:]
+        t_key, frame_key = (key[0], key[1:]) if key else (slice(None), ())
+
+        if isinstance(t_key, (int, np.integer)):
+            frame = self._read_frame(range(len(self))[t_key])
+            return frame[frame_key] if frame_key else frame
+
+        indices = range(len(self))[t_key] if isinstance(t_key, slice) else np.arange(len(self))[t_key]
+        frames = [self._read_frame(int(i))[frame_key] for i in indices]
+        if not frames:
+            return np.empty((0,) + np.empty(self.shape[1:], dtype=self.dtype)[frame_key].shape, dtype=self.dtype)
+        return np.stack(frames)
+
+    def __array__(self, dtype=None, copy=None):
+        stack = self[:]
+        return stack.astype(dtype, copy=False) if dtype is not None else stack
+
+    def close(self):
+        self._tif.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _tiff_fps(tif: tifffile.TiffFile, default_fps: float) -> float:
+    """Returns the frame rate stored in ImageJ metadata, or `default_fps` if none is present."""
+    if hasattr(tif, 'imagej_metadata') and tif.imagej_metadata:
+        if 'finterval' in tif.imagej_metadata and tif.imagej_metadata['finterval']:
+            return 1.0 / tif.imagej_metadata['finterval']
+        elif 'fps' in tif.imagej_metadata:
+            return tif.imagej_metadata['fps']
+    if getattr(tif, 'shaped_metadata', None) and tif.shaped_metadata[0].get('fps'):
+        return tif.shaped_metadata[0]['fps'] # Written by save_to_multitiff for non-ImageJ dtypes
+    return default_fps
+
+
+def _open_lazy_tiff(file_path: str, start: int = 0, stop: Optional[int] = None, step: int = 1,
+                    crop: Optional[CropBox] = None) -> Tuple[Any, int, int, int]:
+    """
+    Opens a TIFF as a lazily-read (T, H, W[, C]) stack restricted to the given frames and crop.
+
+    Uncompressed, contiguously stored files are memory-mapped (the selection is a view of the
+    map); everything else falls back to a LazyTiffStack that decodes pages on demand.
+
+    Returns:
+        Tuple[Any, int, int, int]: The stack and the source frame count, height and width.
+    """
+    with tifffile.TiffFile(file_path) as tif:
+        num_pages = len(tif.pages)
+        first_page = tif.pages[0]
+        page_shape = tuple(first_page.shape)
+        series = tif.series[0]
+        # Map only if the first series holds every page in one uncompressed block: files storing
+        # pages as separate series would otherwise be truncated to the first one.
+        mappable = (first_page.compression == 1 and first_page.is_contiguous
+                    and series.dataoffset is not None
+                    and int(np.prod(series.shape)) == num_pages * int(np.prod(page_shape)))
+        if mappable:
+            mapped_dtype = np.dtype(tif.byteorder + series.dtype.char)
+            data_offset = series.dataoffset
+
+    y0, y1, x0, x1 = _resolve_crop(crop, *page_shape[:2])
+    frame_range = _resolve_frame_range(start, stop, step, num_pages)
+    if mappable:
+        source = np.memmap(file_path, dtype=mapped_dtype, mode='r', offset=data_offset,
+                           shape=(num_pages,) + page_shape) # Hyperstack axes flattened onto time
+        stack = source[frame_range.start:frame_range.stop:frame_range.step, y0:y1, x0:x1]
+        logger.info(f"Memory-mapped TIFF {file_path} (uncompressed, contiguous).")
+        return stack, num_pages, page_shape[0], page_shape[1]
+
+    logger.info(f"TIFF {file_path} is not memory-mappable; decoding pages on demand.")
+    crop_box = (y0, y1, x0, x1) if crop is not None else None
+    return LazyTiffStack(file_path, frame_range, crop_box), num_pages, page_shape[0], page_shape[1]
+
+
+# Pages decoded per tifffile call when cropping (bounding the full-frame scratch memory) or
+# reporting progress.
+_TIFF_CROP_BATCH_PAGES = 64
+
+
+def load_multitiff(file_path: str, fps: float = 30.0, lazy: bool = False,
+                   max_workers: Optional[int] = None, start: int = 0, stop: Optional[int] = None,
+                   step: int = 1, crop: Optional[CropBox] = None,
+                   progress_callback: Optional[ProgressCallback] = None) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
     """
     Loads a multi-page TIFF file and extracts frames and metadata.
 
     Args:
         file_path (str): Path to the TIFF file.
         fps (float): Frame rate to use if not found in metadata (default: 30.0).
+        lazy (bool): If True, return a (T, H, W) array-like that reads frames from disk only when
+                     they are indexed (a read-only np.memmap for uncompressed files, otherwise a
+                     LazyTiffStack) instead of decoding every page up front.
+        max_workers (Optional[int]): Number of threads used to decode compressed pages
+                                     (default: chosen by tifffile; 1 decodes serially).
+        start (int): First page (frame) to read.
+        stop (Optional[int]): Page index to stop before (default: last page). Negative start and
+                              stop count from the end, as in a slice.
+        step (int): Read every `step`-th page; other pages are never decoded.
+        crop (Optional[Tuple[int, int, int, int]]): (y0, y1, x0, x1) region to keep from each frame.
+        progress_callback (Optional[ProgressCallback]): Called after each batch of decoded pages
+            with (frames_done, total_frames, frames_so_far); return False to cancel the load.
+            Not called for lazy loads, which decode nothing up front.
 
     Returns:
-        Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
-            A list of frames (each as a NumPy array) and a dictionary of metadata.
-            Returns (None, None) if loading fails.
+        Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+            A contiguous (T, H, W[, C]) NumPy array of frames, or a lazy (T, H, W) stack if `lazy`
+            is True, and a dictionary of metadata. The metadata's `fps`, `frame_count`, `height`
+            and `width` describe the returned frames (fps is divided by `step`); the original
+            values are kept under the `source_*` keys. Returns (None, None) if loading fails.
     """
     try:
+        if lazy:
+            with tifffile.TiffFile(file_path) as tif:
+                actual_fps = _tiff_fps(tif, fps)
+            stack, source_frames, source_height, source_width = _open_lazy_tiff(file_path, start, stop, step, crop)
+            frame_count = stack.shape[0]
+            if frame_count == 0:
+                logger.error(f"No frames found in TIFF file: {file_path}")
+                return None, None
+            height, width = stack.shape[1:3]
+            metadata = {
+                "file_path": file_path,
+                "fps": actual_fps,
+                "frame_count": frame_count,
+                "height": height,
+                "width": width,
+                "original_format": "TIFF",
+                "lazy": True
+            }
+            _add_subset_metadata(metadata, actual_fps, source_frames, source_height, source_width,
+                                 _resolve_frame_range(start, stop, step, source_frames).start, step,
+                                 _resolve_crop(crop, source_height, source_width))
+            logger.info(f"Opened {file_path} lazily. Frames: {frame_count}, FPS: {metadata['fps']}, Dimensions: {height}x{width}")
+            return stack, metadata
+
         # Read the TIFF file
         with tifffile.TiffFile(file_path) as tif:
-            # Extract frames
-            frames = []
-            for page in tif.pages:
-                frames.append(page.asarray())
-            
-            # Try to extract FPS from ImageJ metadata
-            actual_fps = fps
-            if hasattr(tif, 'imagej_metadata') and tif.imagej_metadata:
-                if 'finterval' in tif.imagej_metadata:
-                    actual_fps = 1.0 / tif.imagej_metadata['finterval']
-                elif 'fps' in tif.imagej_metadata:
-                    actual_fps = tif.imagej_metadata['fps']
-            
-            if not frames:
+            num_pages = len(tif.pages)
+            if num_pages == 0:
                 logger.error(f"No frames found in TIFF file: {file_path}")
                 return None, None
+            first_page = tif.pages[0]
+            page_shape = tuple(first_page.shape)
+            start, stop = _normalise_frame_bounds(start, stop, num_pages)
+            frame_range = _resolve_frame_range(start, stop, step, num_pages)
+            if len(frame_range) == 0:
+                logger.error(f"No frames selected from TIFF file {file_path} (start={start}, stop={stop}, step={step}).")
+                return None, None
+            crop_box = _resolve_crop(crop, *page_shape[:2])
+
+            # Decode the selected pages straight into one contiguous (T, H, W[, C]) array. For
+            # compressed (LZW/zlib/zstd) pages tifffile spreads the decoding over `max_workers` threads.
+            if crop is None and progress_callback is None:
+                frames = tif.asarray(key=frame_range, maxworkers=max_workers)
+                if frames.ndim == len(page_shape):
+                    frames = frames[np.newaxis]
+            else:
+                y0, y1, x0, x1 = crop_box
+                frames = np.empty((len(frame_range), y1 - y0, x1 - x0) + page_shape[2:], dtype=first_page.dtype)
+                for batch_start in range(0, len(frame_range), _TIFF_CROP_BATCH_PAGES):
+                    batch = frame_range[batch_start:batch_start + _TIFF_CROP_BATCH_PAGES]
+                    batch_end = batch_start + len(batch)
+                    if crop is None:
+                        tif.asarray(key=batch, maxworkers=max_workers, out=frames[batch_start:batch_end])
+                    else:
+                        decoded = tif.asarray(key=batch, maxworkers=max_workers)
+                        if decoded.ndim == len(page_shape):
+                            decoded = decoded[np.newaxis]
+                        frames[batch_start:batch_end] = decoded[:, y0:y1, x0:x1]
+                    _report_progress(progress_callback, batch_end, len(frame_range), frames[:batch_end])
+            
+            # Try to extract FPS from ImageJ metadata
+            actual_fps = _tiff_fps(tif, fps)
             
             # Get dimensions from first frame
-            first_frame = frames[0]
-            height, width = first_frame.shape[:2]
+            height, width = frames.shape[1:3]
             
             metadata = {
                 "file_path": file_path,
@@ -137,87 +579,521 @@ def load_multitiff(file_path: str, fps: float = 30.0) -> Tuple[Optional[List[np.
                 "width": width,
                 "original_format": "TIFF"
             }
+            _add_subset_metadata(metadata, actual_fps, num_pages, page_shape[0], page_shape[1], start, step, crop_box)
             
-            logger.info(f"Successfully loaded {file_path}. Frames: {len(frames)}, FPS: {actual_fps}, Dimensions: {height}x{width}")
+            logger.info(f"Successfully loaded {file_path}. Frames: {len(frames)}, FPS: {metadata['fps']}, Dimensions: {height}x{width}")
             return frames, metadata
-            
+
+    except LoadCancelled:
+        logger.info(f"Loading of {file_path} was cancelled.")
+        return None, None
     except Exception as e:
         logger.error(f"An unexpected error occurred while loading TIFF {file_path}: {e}")
         return None, None
 
 
-def load_file(file_path: str, fps: float = 30.0) -> Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
+def load_file(file_path: str, fps: float = 30.0, lazy: bool = False,
+              greyscale: bool = False, max_workers: Optional[int] = None,
+              start: int = 0, stop: Optional[int] = None, step: int = 1,
+              crop: Optional[CropBox] = None,
+              cache_dir: Optional[Union[str, "cache_manager.StackCache"]] = None,
+              progress_callback: Optional[ProgressCallback] = None) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
     """
     Loads a video file (AVI or multi-page TIFF) and extracts frames and metadata.
 
     Args:
         file_path (str): Path to the file.
         fps (float): Frame rate to use for TIFF files if not found in metadata (default: 30.0).
+        lazy (bool): If True, TIFF files are opened as a lazily-read (T, H, W) stack
+                     (see `load_multitiff`). AVI files are always decoded eagerly.
+        greyscale (bool): If True, return only the (T, H, W) greyscale stack the analysis needs.
+                          Colour frames are never kept; use `iter_colour_frames` to re-read
+                          them from the file if they are needed later.
+        max_workers (Optional[int]): Threads used to decode compressed TIFF pages (see `load_multitiff`).
+        start (int): First frame to read.
+        stop (Optional[int]): Frame index to stop before (default: end of file). Negative start
+                              and stop count from the end, as in a slice.
+        step (int): Read every `step`-th frame.
+        crop (Optional[Tuple[int, int, int, int]]): (y0, y1, x0, x1) region to keep from each frame.
+        cache_dir (Optional[Union[str, StackCache]]): Decode cache directory, or a configured
+                                   `cache_manager.StackCache` (greyscale loads only). On a hit the
+                                   stack is opened lazily from its compressed chunks (see
+                                   `cache_manager.ChunkedStack`) instead of being decoded; on a
+                                   miss the decoded stack is stored there for next time and the
+                                   cache is pruned to its byte budget. Entries are keyed by path,
+                                   size, mtime and the load options.
+        progress_callback (Optional[ProgressCallback]): Called from the loading thread as frames
+            are decoded, with (frames_done, total_frames, frames_so_far). `frames_so_far` is a view
+            of the stack being filled (colour frames while a colour TIFF is still being decoded),
+            so a GUI can preview it before loading finishes. Return False to cancel; the load
+            then returns (None, None).
 
     Returns:
-        Tuple[Optional[List[np.ndarray]], Optional[Dict[str, Any]]]:
-            A list of frames (each as a NumPy array) and a dictionary of metadata.
+        Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+            A list of frames (each as a NumPy array) or a (T, H, W) stack, and a dictionary of
+            metadata describing the returned frames (see `load_avi` / `load_multitiff`).
             Returns (None, None) if loading fails.
     """
+    key = None
+    if cache_dir is not None and greyscale and os.path.isfile(file_path):
+        key = cache_manager.cache_key(file_path, {
+            "fps": fps, "start": start, "stop": stop, "step": step,
+            "crop": list(crop) if crop is not None else None,
+        })
+        cache = cache_dir if isinstance(cache_dir, cache_manager.StackCache) else cache_manager.get_stack_cache(cache_dir)
+        cached_stack, cached_metadata = cache.open(key)
+        if cached_stack is not None:
+            logger.info(f"Opened {file_path} from decode cache ({cached_stack.directory}).")
+            return cached_stack, cached_metadata
+
+    frames, metadata = _load_uncached(file_path, fps, lazy, greyscale, max_workers, start, stop, step, crop,
+                                      progress_callback)
+    if key is not None and frames is not None:
+        cache.store(key, frames, metadata)
+    return frames, metadata
+
+
+def _load_uncached(file_path: str, fps: float, lazy: bool, greyscale: bool, max_workers: Optional[int],
+                   start: int, stop: Optional[int], step: int,
+                   crop: Optional[CropBox],
+                   progress_callback: Optional[ProgressCallback] = None) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+    """Format dispatch for `load_file`."""
     file_lower = file_path.lower()
-    
     if file_lower.endswith('.avi'):
-        return load_avi(file_path)
+        return load_avi(file_path, greyscale=greyscale, start=start, stop=stop, step=step, crop=crop,
+                        progress_callback=progress_callback)
     elif file_lower.endswith(('.tif', '.tiff')):
-        return load_multitiff(file_path, fps)
+        # Colour TIFFs loaded as greyscale report decoding and conversion as two halves of the load
+        num_phases = 1
+        if progress_callback is not None and greyscale and not lazy:
+            try:
+                with tifffile.TiffFile(file_path) as tif:
+                    num_phases = 2 if tif.pages[0].ndim == 3 else 1
+            except Exception:
+                pass # load_multitiff reports unreadable files
+        frames, metadata = load_multitiff(file_path, fps, lazy=lazy, max_workers=max_workers,
+                                          start=start, stop=stop, step=step, crop=crop,
+                                          progress_callback=_phase_progress(progress_callback, 0, num_phases))
+        if greyscale and frames is not None:
+            frames = convert_to_greyscale_stack(frames, progress_callback=_phase_progress(progress_callback, 1, num_phases))
+            if frames is None:
+                return None, None
+        return frames, metadata
     else:
         logger.error(f"Unsupported file format: {file_path}. Only .avi and .tif/.tiff files are supported.")
         return None, None
 
 
-def convert_to_greyscale_stack(frames: List[np.ndarray]) -> Optional[np.ndarray]:
+SUPPORTED_EXTENSIONS = ('.avi', '.tif', '.tiff')
+
+
+def _probe_avi(file_path: str) -> Optional[Dict[str, Any]]:
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            logger.error(f"Error: Could not open AVI file: {file_path}")
+            return None
+        return {
+            "file_path": file_path,
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), # Container header; may be approximate
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "original_format": "AVI",
+            "dtype": "uint8", # OpenCV decodes to 8-bit BGR
+            "channels": 3
+        }
+    finally:
+        cap.release()
+
+
+def _probe_tiff(file_path: str, fps: float) -> Optional[Dict[str, Any]]:
+    with tifffile.TiffFile(file_path) as tif:
+        first_page = tif.pages.first
+        # ImageJ and shaped descriptions state the frame count, which avoids walking every IFD.
+        frame_count = None
+        if tif.is_imagej and tif.imagej_metadata:
+            frame_count = tif.imagej_metadata.get('images')
+        elif tif.is_shaped and tif.shaped_metadata:
+            shape = tif.shaped_metadata[0].get('shape')
+            frame_count = shape[0] if shape and len(shape) > first_page.ndim else None
+        if frame_count is None:
+            frame_count = len(tif.pages)
+        return {
+            "file_path": file_path,
+            "fps": _tiff_fps(tif, fps),
+            "frame_count": int(frame_count),
+            "height": int(first_page.shape[0]),
+            "width": int(first_page.shape[1]),
+            "original_format": "TIFF",
+            "dtype": str(first_page.dtype),
+            "channels": int(first_page.shape[2]) if first_page.ndim == 3 else 1
+        }
+
+
+def probe_file(file_path: str, fps: float = 30.0) -> Optional[Dict[str, Any]]:
     """
-    Converts a list of BGR frames to a greyscale stack (T, H, W).
+    Reads a video file's metadata from its headers only, without decoding any frames.
 
     Args:
-        frames (List[np.ndarray]): List of BGR frames.
+        file_path (str): Path to the AVI or TIFF file.
+        fps (float): Frame rate to use for TIFF files if not found in metadata (default: 30.0).
 
     Returns:
-        Optional[np.ndarray]: A 3D NumPy array (T, H, W) of greyscale frames.
+        Optional[Dict[str, Any]]: The metadata `load_file` would return for the whole file
+            (`file_path`, `fps`, `frame_count`, `height`, `width`, `original_format`), plus the
+            decoded `dtype` and number of `channels`. AVI frame counts come from the container
+            header and can differ slightly from the number of decodable frames.
+            Returns None if the file cannot be read.
+    """
+    file_lower = file_path.lower()
+    try:
+        if file_lower.endswith('.avi'):
+            return _probe_avi(file_path)
+        elif file_lower.endswith(('.tif', '.tiff')):
+            return _probe_tiff(file_path, fps)
+        logger.error(f"Unsupported file format: {file_path}. Only .avi and .tif/.tiff files are supported.")
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while probing {file_path}: {e}")
+        return None
+
+
+def probe_directory(directory: str, fps: float = 30.0, recursive: bool = False,
+                    max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Probes every AVI/TIFF file in a directory in parallel (see `probe_file`).
+
+    Args:
+        directory (str): Directory to scan.
+        fps (float): Frame rate to use for TIFF files without one in their metadata.
+        recursive (bool): Also scan subdirectories.
+        max_workers (Optional[int]): Number of probing threads (default: ThreadPoolExecutor's default).
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Metadata per file path, in sorted path order. Files that cannot
+            be read are logged and left out.
+    """
+    file_paths = []
+    for root, dirs, files in os.walk(directory):
+        file_paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(SUPPORTED_EXTENSIONS))
+        if not recursive:
+            break
+    file_paths.sort()
+    if not file_paths:
+        logger.warning(f"No AVI or TIFF files found in {directory}.")
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda path: probe_file(path, fps), file_paths))
+    catalogue = {path: metadata for path, metadata in zip(file_paths, results) if metadata is not None}
+    logger.info(f"Probed {len(catalogue)} of {len(file_paths)} files in {directory}.")
+    return catalogue
+
+
+def _estimate_load_bytes(file_path: str, load_kwargs: Dict[str, Any]) -> int:
+    """Decoded size of `load_file(file_path, **load_kwargs)` estimated from the file headers (0 if unknown)."""
+    metadata = probe_file(file_path, load_kwargs.get('fps', 30.0))
+    if metadata is None:
+        return 0
+    try:
+        num_frames = len(_resolve_frame_range(load_kwargs.get('start', 0), load_kwargs.get('stop'),
+                                              load_kwargs.get('step', 1), metadata['frame_count']))
+        y0, y1, x0, x1 = _resolve_crop(load_kwargs.get('crop'), metadata['height'], metadata['width'])
+    except ValueError:
+        return 0 # load_file will report the invalid selection
+    channels = 1 if load_kwargs.get('greyscale') else metadata['channels']
+    return num_frames * (y1 - y0) * (x1 - x0) * channels * np.dtype(metadata['dtype']).itemsize
+
+
+def iter_load_files(file_paths: List[str], prefetch: int = 1, max_prefetch_bytes: Optional[int] = None,
+                    **load_kwargs) -> Iterator[Tuple[str, Optional[Any], Optional[Dict[str, Any]]]]:
+    """
+    Loads files one after another with `load_file`, decoding ahead on a background thread.
+
+    While the caller analyses file N, files N+1 .. N+`prefetch` are decoded (OpenCV and tifffile
+    release the GIL while decoding, so a thread overlaps with analysis without the cost of copying
+    stacks between processes). Prefetching is also bounded by `max_prefetch_bytes`: a file is only
+    decoded ahead if its estimated size (from `probe_file`) fits next to the stacks already waiting,
+    though one file is always allowed so the batch keeps moving. Closing the iterator early
+    cancels a decode in progress.
+
+    Args:
+        file_paths (List[str]): Files to load, in order.
+        prefetch (int): Number of files decoded ahead of the one being consumed. 0 loads each file
+                        on the calling thread when it is requested.
+        max_prefetch_bytes (Optional[int]): Cap on the decoded bytes waiting to be consumed
+                                            (default: no cap).
+        **load_kwargs: Passed to `load_file` (e.g. greyscale=True, lazy=True, crop=...).
+
+    Yields:
+        Tuple[str, Optional[Any], Optional[Dict[str, Any]]]: The file path, and the frames and
+            metadata from `load_file` ((None, None) if that file failed to load).
+    """
+    if prefetch <= 0:
+        for file_path in file_paths:
+            yield (file_path,) + tuple(load_file(file_path, **load_kwargs))
+        return
+
+    user_progress = load_kwargs.pop('progress_callback', None)
+    condition = threading.Condition()
+    ready: List[Tuple[str, Optional[Any], Optional[Dict[str, Any]], int]] = []
+    state = {"ready_bytes": 0, "finished": False, "stopped": False}
+
+    def keep_going(done: int, total: int, partial: Any) -> bool:
+        if user_progress is not None and user_progress(done, total, partial) is False:
+            return False
+        return not state["stopped"]
+
+    def producer():
+        try:
+            for file_path in file_paths:
+                estimate = _estimate_load_bytes(file_path, load_kwargs) if max_prefetch_bytes is not None else 0
+                with condition:
+                    condition.wait_for(lambda: state["stopped"] or (
+                        len(ready) < prefetch and
+                        (not ready or max_prefetch_bytes is None or state["ready_bytes"] + estimate <= max_prefetch_bytes)))
+                    if state["stopped"]:
+                        return
+                try:
+                    frames, metadata = load_file(file_path, progress_callback=keep_going, **load_kwargs)
+                except Exception as e:
+                    logger.error(f"Unexpected error prefetching {file_path}: {e}")
+                    frames, metadata = None, None
+                with condition:
+                    ready.append((file_path, frames, metadata, estimate))
+                    state["ready_bytes"] += estimate
+                    condition.notify_all()
+        finally:
+            with condition:
+                state["finished"] = True
+                condition.notify_all()
+
+    thread = threading.Thread(target=producer, name="TransiScope-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            with condition:
+                condition.wait_for(lambda: ready or state["finished"])
+                if not ready:
+                    break
+                file_path, frames, metadata, estimate = ready.pop(0)
+                state["ready_bytes"] -= estimate
+                condition.notify_all()
+            yield file_path, frames, metadata
+    finally:
+        with condition:
+            state["stopped"] = True
+            condition.notify_all()
+        thread.join()
+
+
+def iter_colour_frames(file_path: str) -> Iterator[np.ndarray]:
+    """
+    Re-reads the original (colour) frames of a file one at a time.
+
+    This is the opt-in counterpart to `load_file(..., greyscale=True)`: nothing is held in memory
+    beyond the frame currently being yielded.
+
+    Args:
+        file_path (str): Path to the AVI or TIFF file.
+
+    Yields:
+        np.ndarray: Each frame as stored in the file (BGR for AVI).
+    """
+    file_lower = file_path.lower()
+    if file_lower.endswith('.avi'):
+        cap = cv2.VideoCapture(file_path)
+        if not cap.isOpened():
+            logger.error(f"Error: Could not open AVI file: {file_path}")
+            return
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+        finally:
+            cap.release()
+    elif file_lower.endswith(('.tif', '.tiff')):
+        with tifffile.TiffFile(file_path) as tif:
+            tif.pages.cache = False
+            for page in tif.pages:
+                yield page.asarray()
+    else:
+        logger.error(f"Unsupported file format: {file_path}. Only .avi and .tif/.tiff files are supported.")
+
+
+_GREYSCALE_CODES = {3: cv2.COLOR_BGR2GRAY, 4: cv2.COLOR_BGRA2GRAY}
+
+
+def _convert_frames_chunk(source: Any, out: np.ndarray, start: int, stop: int):
+    """
+    Converts frames [start, stop) of `source` into `out[start:stop]`.
+
+    Stacked colour chunks are converted with a single cvtColor call by viewing the
+    (n, H, W, C) chunk as one tall (n*H, W, C) image, writing directly into `out`.
+    """
+    dst = out[start:stop]
+    if isinstance(source, list):
+        for i, frame in enumerate(source[start:stop]):
+            if frame.ndim == 3:
+                dst[i] = cv2.cvtColor(frame, _GREYSCALE_CODES[frame.shape[2]])
+            else:
+                dst[i] = frame
+        return
+
+    chunk = np.ascontiguousarray(source[start:stop]) # Reads only this chunk from a memmap/lazy stack
+    if chunk.ndim == 3: # Already greyscale, plain copy
+        dst[...] = chunk
+        return
+    n_frames, height, width, channels = chunk.shape
+    tall_image = chunk.reshape(n_frames * height, width, channels)
+    if dst.flags.c_contiguous and dst.dtype == chunk.dtype:
+        cv2.cvtColor(tall_image, _GREYSCALE_CODES[channels], dst=dst.reshape(n_frames * height, width))
+    else:
+        dst[...] = cv2.cvtColor(tall_image, _GREYSCALE_CODES[channels]).reshape(n_frames, height, width)
+
+
+def convert_to_greyscale_stack(frames: Any, out: Optional[np.ndarray] = None, chunk_size: int = 256,
+                               max_workers: Optional[int] = None,
+                               progress_callback: Optional[ProgressCallback] = None) -> Optional[np.ndarray]:
+    """
+    Converts BGR frames to a greyscale stack (T, H, W).
+
+    Stacked input is converted in chunks of `chunk_size` frames, spread over a thread pool
+    (OpenCV releases the GIL), and written into a single output buffer.
+
+    Args:
+        frames: List of BGR frames, or a stacked (T, H, W, 3) array. Memory-mapped or lazy stacks
+                are read one chunk at a time, so conversion can run out-of-core into a memmapped
+                `out`. A stack that is already greyscale (T, H, W), including a lazy one from
+                `load_multitiff`, is returned unchanged (or copied into `out` if given).
+        out (Optional[np.ndarray]): Preallocated (T, H, W) buffer to write into.
+        chunk_size (int): Number of frames converted per cvtColor call.
+        max_workers (Optional[int]): Thread pool size (default: ThreadPoolExecutor's default).
+        progress_callback (Optional[ProgressCallback]): Called on the calling thread as chunks
+            complete, with (frames_done, total_frames, out); return False to cancel (returns None).
+
+    Returns:
+        Optional[np.ndarray]: A 3D NumPy array (T, H, W) of greyscale frames (`out` if given).
                                Returns None if input is invalid.
     """
-    if not frames:
+    if frames is None or len(frames) == 0:
         logger.warning("Cannot convert to greyscale: No frames provided.")
         return None
+    if out is None and not isinstance(frames, list) and getattr(frames, 'ndim', None) == 3:
+        return frames
     try:
-        grey_frames: List[np.ndarray] = []
-        for frame in frames:
-            if frame.ndim == 3 and frame.shape[2] == 3: # Check if it's a color image
-                grey_frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
-            elif frame.ndim == 2: # Already greyscale
-                grey_frames.append(frame)
-            else:
-                logger.warning(f"Skipping frame with unexpected shape: {frame.shape}")
-                continue
-        
-        if not grey_frames:
-            logger.error("No valid frames found for greyscale conversion.")
+        if isinstance(frames, list):
+            valid_frames: List[np.ndarray] = []
+            for frame in frames:
+                if (frame.ndim == 3 and frame.shape[2] in _GREYSCALE_CODES) or frame.ndim == 2:
+                    valid_frames.append(frame)
+                else:
+                    logger.warning(f"Skipping frame with unexpected shape: {frame.shape}")
+            if not valid_frames:
+                logger.error("No valid frames found for greyscale conversion.")
+                return None
+            source: Any = valid_frames
+            out_shape = (len(valid_frames),) + valid_frames[0].shape[:2]
+            out_dtype = valid_frames[0].dtype
+        else:
+            if not (frames.ndim == 3 or (frames.ndim == 4 and frames.shape[3] in _GREYSCALE_CODES)):
+                logger.error(f"Cannot convert stack with shape {frames.shape} to greyscale.")
+                return None
+            source = frames
+            out_shape = tuple(frames.shape[:3])
+            out_dtype = frames.dtype
+
+        if out is None:
+            out = np.empty(out_shape, dtype=out_dtype)
+        elif tuple(out.shape) != out_shape:
+            logger.error(f"Output buffer shape {out.shape} does not match greyscale stack shape {out_shape}.")
             return None
 
-        return np.array(grey_frames)
+        chunk_size = max(1, int(chunk_size))
+        bounds = [(start, min(start + chunk_size, out_shape[0])) for start in range(0, out_shape[0], chunk_size)]
+        if len(bounds) == 1:
+            _convert_frames_chunk(source, out, *bounds[0])
+            _report_progress(progress_callback, out_shape[0], out_shape[0], out)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_convert_frames_chunk, source, out, *b) for b in bounds]
+                try:
+                    done = 0
+                    for future, (start, stop) in zip(futures, bounds):
+                        future.result() # Re-raises any worker exception here
+                        done += stop - start
+                        _report_progress(progress_callback, done, out_shape[0], out[:done])
+                except LoadCancelled:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        return out
+    except LoadCancelled:
+        logger.info("Greyscale conversion was cancelled.")
+        return None
     except Exception as e:
         logger.error(f"Error during greyscale conversion: {e}")
         return None
 
 
-def save_to_multitiff(frames_stack: np.ndarray, output_path: str, metadata: Optional[Dict] = None) -> bool:
+_BIGTIFF_THRESHOLD = 2 ** 32 - 2 ** 25 # Classic TIFF offsets are 32-bit; leave room for the IFDs
+_IMAGEJ_DTYPES = (np.uint8, np.uint16, np.float32)
+_DESCRIPTION_PLACEHOLDER = " " * 512 # Reserved on the first page, rewritten once the frame count is known
+
+
+def _iter_frame_chunks(frames: Any, chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Yields (n, H, W[, C]) chunks from a stack, a list of frames, or an iterator of frames or chunks.
+
+    Iterator items with one more dimension than the first frame are treated as chunks; a first
+    item that is 3D with 3 or 4 trailing channels is a single colour frame, otherwise a chunk of
+    greyscale frames.
+    """
+    if hasattr(frames, 'shape') and hasattr(frames, '__getitem__'):
+        for chunk_start in range(0, frames.shape[0], chunk_size):
+            yield np.asarray(frames[chunk_start:chunk_start + chunk_size])
+        return
+    frame_ndim = None
+    for item in frames:
+        item = np.asarray(item)
+        if frame_ndim is None:
+            frame_ndim = 3 if item.ndim == 4 or (item.ndim == 3 and item.shape[-1] in (3, 4)) else 2
+        yield item if item.ndim == frame_ndim + 1 else item[np.newaxis]
+
+
+def save_to_multitiff(frames_stack: Any, output_path: str, metadata: Optional[Dict] = None,
+                      compression: Optional[str] = None, bigtiff: Optional[bool] = None,
+                      chunk_size: int = 64) -> bool:
     """
     Saves a stack of frames (T, H, W) or (T, H, W, C) as a multi-page TIFF.
 
+    Pages are appended as frames arrive, so a generator (e.g. `iter_colour_frames`) or a lazy stack
+    is written in constant memory. Uncompressed pages form one contiguous series that
+    `load_multitiff(..., lazy=True)` memory-maps. The frame count and frame rate are written into the ImageJ
+    description when the file is closed; dtypes ImageJ cannot open (anything but uint8, uint16 and
+    float32, or non-uint8 colour) get a tifffile shaped description with the same fields instead.
+
     Args:
-        frames_stack (np.ndarray): NumPy array of frames.
+        frames_stack (Any): A NumPy array, lazy stack (e.g. from `load_file(..., lazy=True)`), list
+                            of frames, or an iterator/generator of frames or (n, H, W[, C]) chunks.
         output_path (str): Path to save the TIFF file.
         metadata (Optional[Dict]): Metadata to embed (e.g., FPS for ImageJ compatibility).
+        compression (Optional[str]): Page compression understood by tifffile, e.g. 'zlib', 'lzw'
+                                     or 'zstd'. None writes uncompressed pages.
+        bigtiff (Optional[bool]): Write BigTIFF (needed past 4 GB, but not readable by every
+                                  ImageJ/Fiji workflow). None writes classic TIFF unless the
+                                  estimated size approaches 4 GB: the stack or list size, or for
+                                  iterators the first frame's size times `metadata['frame_count']`.
+                                  Pass True for longer iterators without a frame count.
+        chunk_size (int): Frames fetched from a stack per write call.
 
     Returns:
         bool: True if successful, False otherwise.
     """
-    if frames_stack is None or frames_stack.ndim < 3:
+    if frames_stack is None or (hasattr(frames_stack, 'ndim') and frames_stack.ndim < 3):
         logger.error("Invalid frame stack for TIFF saving. Must be at least 3D.")
         return False
     try:
@@ -227,14 +1103,63 @@ def save_to_multitiff(frames_stack: np.ndarray, output_path: str, metadata: Opti
             imagej_metadata['finterval'] = 1.0 / metadata['fps']
             imagej_metadata['fps'] = metadata['fps']
             imagej_metadata['unit'] = 'sec'
-        
+
         # Ensure output path ends with .tif or .tiff
         if not (output_path.lower().endswith(".tif") or output_path.lower().endswith(".tiff")):
             output_path += ".tif"
             logger.info(f"Appending .tif extension. Output path: {output_path}")
 
-        tifffile.imwrite(output_path, frames_stack, imagej=True, metadata=imagej_metadata)
-        logger.info(f"Successfully saved multi-page TIFF to {output_path}")
+        chunks = _iter_frame_chunks(frames_stack, chunk_size)
+        first_chunk = next(chunks, None)
+        if bigtiff is None:
+            if hasattr(frames_stack, 'shape'):
+                estimated_bytes = int(np.prod(frames_stack.shape)) * np.dtype(frames_stack.dtype).itemsize
+            elif isinstance(frames_stack, (list, tuple)):
+                estimated_bytes = sum(np.asarray(frame).nbytes for frame in frames_stack)
+            else:
+                # Iterators: frame size times the frame count reported by the loader, if known
+                expected_frames = (metadata or {}).get('frame_count') or 0
+                frame_bytes = first_chunk[0].nbytes if first_chunk is not None and len(first_chunk) else 0
+                estimated_bytes = frame_bytes * int(expected_frames)
+            bigtiff = estimated_bytes > _BIGTIFF_THRESHOLD
+
+        num_frames = 0
+        frame_shape = None
+        with tifffile.TiffWriter(output_path, bigtiff=bigtiff) as tif:
+            for chunk in itertools.chain([first_chunk] if first_chunk is not None else [], chunks):
+                if frame_shape is None:
+                    frame_shape, dtype = chunk.shape[1:], chunk.dtype
+                    is_colour = len(frame_shape) == 3
+                    photometric = 'rgb' if is_colour else 'minisblack'
+                    description = _DESCRIPTION_PLACEHOLDER
+                elif chunk.shape[1:] != frame_shape or chunk.dtype != dtype:
+                    raise ValueError(f"Frame {num_frames} has shape {chunk.shape[1:]} {chunk.dtype}, expected {frame_shape} {dtype}.")
+                else:
+                    description = None
+                if compression is None:
+                    # Uncompressed frames are appended to one contiguous series, so the export can be
+                    # memory-mapped when it is reopened lazily (see `_open_lazy_tiff`)
+                    for frame in chunk:
+                        tif.write(frame, photometric=photometric, contiguous=True,
+                                  description=description, metadata=None)
+                        description = None
+                else:
+                    tif.write(chunk, photometric=photometric, compression=compression,
+                              description=description, metadata=None)
+                num_frames += chunk.shape[0]
+
+            if num_frames == 0:
+                raise ValueError("No frames to save.")
+            shape = (num_frames,) + frame_shape
+            if dtype in _IMAGEJ_DTYPES and (not is_colour or (dtype == np.uint8 and frame_shape[-1] == 3)):
+                tif.overwrite_description(tifffile.imagej_description(
+                    shape, axes='TYXS' if is_colour else 'TYX', rgb=is_colour, **imagej_metadata))
+            else:
+                logger.info(f"ImageJ cannot open {dtype} {'colour ' if is_colour else ''}stacks; writing a shaped TIFF description instead.")
+                tif.overwrite_description(json.dumps({'shape': list(shape), 'axes': 'TYXS' if is_colour else 'TYX', **imagej_metadata}))
+
+        logger.info(f"Successfully saved {num_frames}-page TIFF to {output_path} "
+                    f"({'BigTIFF, ' if bigtiff else ''}compression: {compression or 'none'})")
         return True
     except Exception as e:
         logger.error(f"Error saving TIFF to {output_path}: {e}")
@@ -273,4 +1198,217 @@ def export_results_to_csv(file_path: str, headers: List[str], table_data: List[L
         return False
     except Exception as e:
         logger.error(f"An unexpected error occurred during results CSV export: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+EVENT_CSV_HEADERS = ["ROI ID", "Type", "Start (s)", "End (s)", "Duration (s)", "Events/s/µm²", "Rate SE",
+                     "Start Frame", "End Frame"]
+
+
+def export_events_to_csv(file_path: str, events: List[Any], roi_summary_stats: Dict[Any, Dict[str, float]],
+                         analysis_timestamp: str) -> bool:
+    """
+    Exports detected events straight from the analysis results to a CSV file, one row per event.
+
+    Rows are streamed to the file and numbers are written at full precision (no display
+    rounding). Each event property (e.g. `prominence`) gets its own column; events without that
+    property leave it empty.
+
+    Args:
+        file_path (str): The path to save the CSV file to.
+        events (List[Any]): `analysis_processor.Event` objects.
+        roi_summary_stats (Dict[Any, Dict[str, float]]): Per-ROI {'rate': ..., 'se': ...}, as
+                                                         computed by the analysis.
+        analysis_timestamp (str): The timestamp of when the analysis was run.
+
+    Returns:
+        bool: True if the export was successful, False otherwise.
+    """
+    try:
+        property_names = sorted({name for event in events for name in event.properties})
+        no_stats: Dict[str, float] = {}
+
+        def rows():
+            for event in events:
+                stats = roi_summary_stats.get(event.roi_id, no_stats)
+                yield ([event.roi_id, event.event_type, event.start_time, event.end_time, event.duration,
+                        stats.get('rate', ''), stats.get('se', ''), event.start_frame, event.end_frame] +
+                       [event.properties.get(name, '') for name in property_names])
+
+        with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow([f"Analysis Run At: {analysis_timestamp}"])
+            csv_writer.writerow(EVENT_CSV_HEADERS + property_names)
+            csv_writer.writerows(rows())
+
+        logger.info(f"Successfully exported {len(events)} events to {file_path}")
+        return True
+    except IOError as e:
+        logger.error(f"Failed to write to CSV file {file_path}: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during events CSV export: {e}")
+        return False
+
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def _property_column(values: List[Any]) -> np.ndarray:
+    """Numeric properties become float64 columns (NaN where missing), anything else a string column."""
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (int, float, np.integer, np.floating, bool, np.bool_)) for value in present):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(['' if value is None else str(value) for value in values], dtype=str)
+
+
+def export_results_to_npz(file_path: str, events: List[Any], roi_summary_stats: Dict[Any, Dict[str, float]],
+                          traces: Optional[Dict[Any, np.ndarray]] = None,
+                          params: Optional[Dict[str, Any]] = None,
+                          analysis_timestamp: Optional[str] = None,
+                          trace_statistics: Optional[Dict[Any, np.ndarray]] = None) -> bool:
+    """
+    Exports analysis results to a binary, columnar `.npz` file.
+
+    Every column is its own uncompressed `.npy` member, so `load_results_npz` can memory-map
+    columns instead of parsing text. Members:
+
+    * `events/<column>`: roi_id, event_type, start_time, end_time, duration, start_frame,
+      end_frame, and `events/prop/<name>` for each event property (NaN/'' where missing).
+    * `rois/roi_id`, `rois/rate`, `rois/se`: the per-ROI summary statistics.
+    * `traces/roi_id` and `traces/data`: the (R, T) intensity traces, if given.
+    * `trace_stats/roi_id` and `trace_stats/<statistic>`: one (R, T) array per field of the
+      per-ROI statistics (see `roi_handler.extract_intensity_statistics`), if given.
+    * `params_json`, `analysis_timestamp`, `format_version`: run parameters and provenance.
+
+    Args:
+        file_path (str): The path to save the `.npz` file to (extension added if missing).
+        events (List[Any]): `analysis_processor.Event` objects.
+        roi_summary_stats (Dict[Any, Dict[str, float]]): Per-ROI {'rate': ..., 'se': ...}.
+        traces (Optional[Dict[Any, np.ndarray]]): Per-ROI 1D intensity traces of equal length.
+        params (Optional[Dict[str, Any]]): JSON-serialisable run parameters (detection settings,
+                                           file metadata, ...).
+        analysis_timestamp (Optional[str]): The timestamp of when the analysis was run.
+        trace_statistics (Optional[Dict[Any, np.ndarray]]): Per-ROI (T,) structured arrays of
+                                                            intensity statistics, all of one dtype.
+
+    Returns:
+        bool: True if the export was successful, False otherwise.
+    """
+    if not file_path.lower().endswith(".npz"):
+        file_path += ".npz"
+        logger.info(f"Appending .npz extension. Output path: {file_path}")
+    try:
+        columns: Dict[str, np.ndarray] = {
+            "events/roi_id": np.array([event.roi_id for event in events], dtype=np.int64),
+            "events/event_type": np.array([event.event_type for event in events], dtype=str),
+            "events/start_time": np.array([event.start_time for event in events], dtype=np.float64),
+            "events/end_time": np.array([event.end_time for event in events], dtype=np.float64),
+            "events/duration": np.array([event.duration for event in events], dtype=np.float64),
+            "events/start_frame": np.array([event.start_frame for event in events], dtype=np.int64),
+            "events/end_frame": np.array([event.end_frame for event in events], dtype=np.int64),
+        }
+        for name in sorted({name for event in events for name in event.properties}):
+            columns[f"events/prop/{name}"] = _property_column([event.properties.get(name) for event in events])
+
+        roi_ids = sorted(roi_summary_stats)
+        columns["rois/roi_id"] = np.array(roi_ids, dtype=np.int64)
+        columns["rois/rate"] = np.array([roi_summary_stats[roi_id].get('rate', np.nan) for roi_id in roi_ids], dtype=np.float64)
+        columns["rois/se"] = np.array([roi_summary_stats[roi_id].get('se', np.nan) for roi_id in roi_ids], dtype=np.float64)
+
+        if traces:
+            trace_ids = sorted(traces)
+            if len({len(traces[roi_id]) for roi_id in trace_ids}) != 1:
+                logger.error("Intensity traces have different lengths and cannot be stored as one (R, T) array.")
+                return False
+            columns["traces/roi_id"] = np.array(trace_ids, dtype=np.int64)
+            columns["traces/data"] = np.stack([np.asarray(traces[roi_id], dtype=np.float64) for roi_id in trace_ids])
+
+        if trace_statistics:
+            stat_ids = sorted(trace_statistics)
+            stats = np.stack([trace_statistics[roi_id] for roi_id in stat_ids])
+            columns["trace_stats/roi_id"] = np.array(stat_ids, dtype=np.int64)
+            for name in stats.dtype.names:
+                columns[f"trace_stats/{name}"] = np.ascontiguousarray(stats[name], dtype=np.float64)
+
+        columns["params_json"] = np.array(json.dumps(
+            params or {}, default=lambda value: value.item() if isinstance(value, np.generic) else str(value)))
+        columns["analysis_timestamp"] = np.array(analysis_timestamp or "")
+        columns["format_version"] = np.array(RESULTS_FORMAT_VERSION)
+
+        np.savez(file_path, **columns) # Stored, not deflated: members stay memory-mappable
+        logger.info(f"Successfully exported {len(events)} events and {len(roi_ids)} ROI summaries to {file_path}")
+        return True
+    except IOError as e:
+        logger.error(f"Failed to write results file {file_path}: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during binary results export: {e}")
+        return False
+
+
+def _npz_member_as_memmap(file_path: str, info: zipfile.ZipInfo) -> Optional[np.ndarray]:
+    """Memory-maps an uncompressed `.npy` member of a zip in place; None if it cannot be mapped."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(file_path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+    if dtype.hasobject or int(np.prod(shape)) == 0:
+        return None
+    return np.memmap(file_path, dtype=dtype, mode='r', offset=data_offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def load_results_npz(file_path: str, mmap: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Loads a results file written by `export_results_to_npz`.
+
+    Args:
+        file_path (str): Path to the `.npz` file.
+        mmap (bool): Memory-map the column arrays (read-only) instead of reading them into memory.
+
+    Returns:
+        Optional[Dict[str, Any]]: {'events': {column: array}, 'event_properties': {name: array},
+            'roi_summary_stats': {'roi_id', 'rate', 'se' arrays}, 'traces': {'roi_id', 'data'} or
+            None, 'trace_statistics': {'roi_id', <statistic> arrays} or None, 'params': dict,
+            'analysis_timestamp': str}. Returns None if loading fails.
+    """
+    try:
+        columns: Dict[str, np.ndarray] = {}
+        with zipfile.ZipFile(file_path) as archive, np.load(file_path) as npz:
+            for info in archive.infolist():
+                name = info.filename[:-len('.npy')] if info.filename.endswith('.npy') else info.filename
+                array = _npz_member_as_memmap(file_path, info) if mmap else None
+                columns[name] = array if array is not None else npz[name]
+
+        version = int(columns.get("format_version", 0))
+        if version > RESULTS_FORMAT_VERSION:
+            logger.warning(f"{file_path} was written by a newer TransiScope (format {version}); reading what is known.")
+
+        results = {
+            "events": {name[len("events/"):]: array for name, array in columns.items()
+                       if name.startswith("events/") and not name.startswith("events/prop/")},
+            "event_properties": {name[len("events/prop/"):]: array for name, array in columns.items()
+                                 if name.startswith("events/prop/")},
+            "roi_summary_stats": {name[len("rois/"):]: array for name, array in columns.items() if name.startswith("rois/")},
+            "traces": ({"roi_id": columns["traces/roi_id"], "data": columns["traces/data"]}
+                       if "traces/data" in columns else None),
+            "trace_statistics": ({name[len("trace_stats/"):]: array for name, array in columns.items()
+                                  if name.startswith("trace_stats/")} or None),
+            "params": json.loads(str(columns["params_json"])) if "params_json" in columns else {},
+            "analysis_timestamp": str(columns.get("analysis_timestamp", "")),
+        }
+        logger.info(f"Loaded {len(results['events'].get('roi_id', []))} events from {file_path}")
+        return results
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while loading results {file_path}: {e}")
+        return None
@@ -0,0 +1,269 @@
+# TransiScope/motion_correction.py
+import numpy as np
+from typing import Any, Callable, Optional, Tuple
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def compute_reference(image_stack: Any, num_frames: int = 50, start: int = 0) -> Optional[np.ndarray]:
+    """
+    Averages a block of frames into a registration reference image.
+
+    Args:
+        image_stack (Any): The (T, H, W) greyscale stack (ndarray, memmap or lazy stack).
+        num_frames (int): Number of consecutive frames averaged.
+        start (int): First frame of the block.
+
+    Returns:
+        Optional[np.ndarray]: The float64 (H, W) reference, or None for an invalid stack.
+    """
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3 or len(image_stack) == 0:
+        logger.error("Motion correction needs a non-empty 3D (T, H, W) stack.")
+        return None
+    start = min(max(0, int(start)), len(image_stack) - 1)
+    block = np.asarray(image_stack[start:start + max(1, int(num_frames))], dtype=np.float64)
+    return block.mean(axis=0)
+
+
+def _subpixel_offset(before: np.ndarray, peak: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """Vertex of the parabola through three equally spaced samples, relative to the middle one."""
+    denominator = before - 2 * peak + after
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = np.where(denominator < 0, 0.5 * (before - after) / denominator, 0.0)
+    return np.clip(offset, -0.5, 0.5)
+
+
+def _apodize(frames: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """Removes each frame's mean and tapers it to zero at the borders (in place for float input)."""
+    frames -= frames.mean(axis=(-2, -1), keepdims=True)
+    frames *= window
+    return frames
+
+
+def _phase_correlation_shifts(frames: np.ndarray, reference_spectrum: np.ndarray,
+                              max_shift: Optional[int], subpixel: bool) -> np.ndarray:
+    """Displacements (dy, dx) of a (t, H, W) batch of apodized frames relative to the reference, by phase correlation."""
+    from scipy import fft
+
+    height, width = frames.shape[1:]
+    spectra = fft.rfft2(frames, axes=(1, 2), workers=1)
+    spectra *= reference_spectrum.conj()
+    spectra /= np.abs(spectra) + 1e-12 # Keep only the phase: a sharp peak at the displacement
+    correlation = fft.irfft2(spectra, s=(height, width), axes=(1, 2), workers=1)
+    del spectra
+
+    if max_shift is not None:
+        # Exclude displacements beyond max_shift (indices wrap around: negative shifts sit at the end)
+        dy = np.minimum(np.arange(height), height - np.arange(height))
+        dx = np.minimum(np.arange(width), width - np.arange(width))
+        correlation[:, (dy[:, None] > max_shift) | (dx[None, :] > max_shift)] = -np.inf
+
+    flat_peaks = correlation.reshape(len(frames), -1).argmax(axis=1)
+    peak_y, peak_x = np.divmod(flat_peaks, width)
+    shifts = np.column_stack((peak_y, peak_x)).astype(np.float64)
+    if subpixel:
+        frame_index = np.arange(len(frames))
+        peak = correlation[frame_index, peak_y, peak_x]
+        shifts[:, 0] += _subpixel_offset(correlation[frame_index, (peak_y - 1) % height, peak_x], peak,
+                                         correlation[frame_index, (peak_y + 1) % height, peak_x])
+        shifts[:, 1] += _subpixel_offset(correlation[frame_index, peak_y, (peak_x - 1) % width], peak,
+                                         correlation[frame_index, peak_y, (peak_x + 1) % width])
+    # Peaks past the middle are negative displacements
+    shifts[:, 0] = np.where(shifts[:, 0] > height / 2, shifts[:, 0] - height, shifts[:, 0])
+    shifts[:, 1] = np.where(shifts[:, 1] > width / 2, shifts[:, 1] - width, shifts[:, 1])
+    return shifts
+
+
+def estimate_shifts(
+    image_stack: Any,
+    reference: Optional[np.ndarray] = None,
+    max_shift: Optional[int] = None,
+    subpixel: bool = True,
+    chunk_size: int = 64,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, Any], bool]] = None
+) -> Optional[np.ndarray]:
+    """
+    Estimates the rigid displacement of every frame relative to a reference by FFT phase correlation.
+
+    The stack is processed in chunks of `chunk_size` frames: each chunk is read, tapered with a Hann
+    window (so the frame borders do not correlate as a spurious zero shift), transformed with one
+    batched 2D FFT and correlated with the reference spectrum. Frames are transformed in float32 (the
+    peak position needs no more precision). Chunks run on a small thread pool (the FFTs release the
+    GIL) and at most `max_workers + 1` are submitted at a time, so peak memory is a few chunks of
+    float32 frames and their spectra, however many cores the machine has.
+
+    Args:
+        image_stack (Any): The (T, H, W) greyscale stack (ndarray, memmap or lazy stack).
+        reference (Optional[np.ndarray]): (H, W) reference image (default: `compute_reference`).
+        max_shift (Optional[int]): Largest displacement searched, in pixels per axis (default: any).
+        subpixel (bool): Refine each peak with a parabolic fit.
+        chunk_size (int): Frames transformed per batch.
+        max_workers (Optional[int]): Thread pool size (default: min(4, CPU count)).
+        progress_callback (Optional[Callable[[int, int, Any], bool]]): Called as chunks complete with
+            (frames_done, total_frames, None); return False to cancel.
+
+    Returns:
+        Optional[np.ndarray]: (T, 2) float64 displacements (dy, dx): frame t shows the reference
+            moved by (dy, dx) pixels, so frame[y, x] ~ reference[y - dy, x - dx]. None if the
+            input is invalid or the estimation was cancelled.
+    """
+    from scipy import fft
+
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3 or len(image_stack) == 0:
+        logger.error("Motion correction needs a non-empty 3D (T, H, W) stack.")
+        return None
+    num_frames, height, width = image_stack.shape
+    if reference is None:
+        reference = compute_reference(image_stack)
+    if reference.shape != (height, width):
+        logger.error(f"Reference shape {reference.shape} does not match the frames {(height, width)}.")
+        return None
+    window = np.outer(np.hanning(height), np.hanning(width)).astype(np.float32)
+    reference_spectrum = fft.rfft2(_apodize(np.array(reference, dtype=np.float32), window), workers=1)
+
+    chunk_size = max(1, int(chunk_size))
+    max_workers = max(1, int(max_workers)) if max_workers is not None else min(4, os.cpu_count() or 1)
+    starts = iter(range(0, num_frames, chunk_size))
+
+    def process(t0: int) -> np.ndarray:
+        frames = _apodize(np.array(image_stack[t0:t0 + chunk_size], dtype=np.float32), window)
+        return _phase_correlation_shifts(frames, reference_spectrum, max_shift, subpixel)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Sliding window: one chunk queued behind the running ones keeps the pool busy
+            in_flight = deque((t0, executor.submit(process, t0)) for _, t0 in zip(range(max_workers + 1), starts))
+            chunk_shifts = []
+            while in_flight:
+                t0, future = in_flight.popleft()
+                chunk_shifts.append(future.result())
+                if progress_callback is not None and not progress_callback(min(t0 + chunk_size, num_frames), num_frames, None):
+                    for _, pending in in_flight:
+                        pending.cancel() # Chunks not started yet are skipped
+                    logger.info("Motion estimation cancelled.")
+                    return None
+                next_t0 = next(starts, None)
+                if next_t0 is not None:
+                    in_flight.append((next_t0, executor.submit(process, next_t0)))
+        shifts = np.concatenate(chunk_shifts)
+    except Exception as e:
+        logger.error(f"Error estimating motion shifts: {e}")
+        return None
+    largest = np.abs(shifts).max(axis=0)
+    logger.info(f"Estimated motion for {num_frames} frames (largest shift: {largest[0]:.1f} px in y, {largest[1]:.1f} px in x).")
+    return shifts
+
+
+def _axis_window(key: Any, size: int) -> Tuple[int, int, Any]:
+    """Bounding [lo, hi) of an index along one axis, and the key that selects it from that window."""
+    if isinstance(key, (int, np.integer)):
+        index = range(size)[key]
+        return index, index + 1, 0
+    if isinstance(key, slice):
+        selected = range(size)[key]
+        if len(selected) == 0:
+            return 0, 0, slice(0, 0)
+        lo, hi = min(selected[0], selected[-1]), max(selected[0], selected[-1]) + 1
+        return lo, hi, slice(selected[0] - lo, None, selected.step)
+    indices = np.arange(size)[np.asarray(key)]
+    if indices.size == 0:
+        return 0, 0, indices
+    lo = int(indices.min())
+    return lo, int(indices.max()) + 1, indices - lo
+
+
+class MotionCorrectedStack:
+    """
+    Read-only (T, H, W) view of a stack with each frame translated back by its estimated shift.
+
+    Frames are corrected on access, so the registered stack never exists as a second copy: napari
+    and the ROI trace functions read it like any other stack. Shifts are rounded to whole pixels
+    (no interpolation, so intensities are not altered); pixels moved in from outside the frame take
+    `fill_value`. Consecutive frames with the same shift are read from the source in one block.
+    """
+    def __init__(self, image_stack: Any, shifts: np.ndarray, fill_value: float = 0):
+        if getattr(image_stack, 'ndim', None) != 3:
+            raise ValueError("MotionCorrectedStack needs a 3D (T, H, W) stack.")
+        shifts = np.asarray(shifts)
+        if shifts.shape != (len(image_stack), 2):
+            raise ValueError(f"Expected ({len(image_stack)}, 2) shifts. Got {shifts.shape}.")
+        self.source = image_stack
+        self.shifts = shifts
+        self._integer_shifts = np.rint(shifts).astype(np.int64)
+        self.fill_value = fill_value
+        self.dtype = np.dtype(image_stack.dtype)
+        self.shape: Tuple[int, ...] = tuple(image_stack.shape)
+        self.ndim = 3
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+        t_key, y_key, x_key = key
+
+        frame_indices = np.arange(len(self))[t_key]
+        y0, y1, local_y = _axis_window(y_key, self.shape[1])
+        x0, x1, local_x = _axis_window(x_key, self.shape[2])
+        frame_indices_1d = np.atleast_1d(frame_indices)
+        block = np.full((frame_indices_1d.size, y1 - y0, x1 - x0), self.fill_value, dtype=self.dtype)
+
+        if frame_indices_1d.size and y1 > y0 and x1 > x0:
+            shifts = self._integer_shifts[frame_indices_1d]
+            # Runs of consecutive frames sharing a shift are copied together
+            run_breaks = np.flatnonzero((np.diff(frame_indices_1d) != 1) | np.any(np.diff(shifts, axis=0) != 0, axis=1)) + 1
+            for run_start, run_end in zip(np.r_[0, run_breaks], np.r_[run_breaks, frame_indices_1d.size]):
+                dy, dx = shifts[run_start]
+                # Output pixel (y, x) comes from source pixel (y + dy, x + dx)
+                src_y0, src_y1 = max(y0 + dy, 0), min(y1 + dy, self.shape[1])
+                src_x0, src_x1 = max(x0 + dx, 0), min(x1 + dx, self.shape[2])
+                if src_y1 <= src_y0 or src_x1 <= src_x0:
+                    continue
+                t0 = frame_indices_1d[run_start]
+                t1 = frame_indices_1d[run_end - 1] + 1
+                block[run_start:run_end,
+                      src_y0 - dy - y0:src_y1 - dy - y0,
+                      src_x0 - dx - x0:src_x1 - dx - x0] = self.source[t0:t1, src_y0:src_y1, src_x0:src_x1]
+
+        result = block[:, local_y, local_x]
+        return result[0] if np.ndim(frame_indices) == 0 else result
+
+    def __array__(self, dtype=None, copy=None):
+        stack = self[:]
+        return stack.astype(dtype, copy=False) if dtype is not None else stack
+
+
+def correct_motion(
+    image_stack: Any,
+    reference: Optional[np.ndarray] = None,
+    max_shift: Optional[int] = None,
+    chunk_size: int = 64,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, Any], bool]] = None
+) -> Optional[MotionCorrectedStack]:
+    """
+    Registers a stack rigidly: estimates per-frame shifts and wraps the stack to undo them lazily.
+
+    Args:
+        image_stack (Any): The (T, H, W) greyscale stack (ndarray, memmap or lazy stack).
+        reference, max_shift, chunk_size, max_workers, progress_callback: See `estimate_shifts`.
+
+    Returns:
+        Optional[MotionCorrectedStack]: The corrected view (its `shifts` hold the estimates), or None
+            if the shifts could not be estimated or the estimation was cancelled.
+    """
+    shifts = estimate_shifts(image_stack, reference, max_shift=max_shift, chunk_size=chunk_size,
+                             max_workers=max_workers, progress_callback=progress_callback)
+    if shifts is None:
+        return None
+    return MotionCorrectedStack(image_stack, shifts)
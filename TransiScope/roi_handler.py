@@ -1,15 +1,24 @@
 import numpy as np
 from shapely.geometry import Polygon
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Sequence
 import logging
 import csv
+import weakref
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+MaskBox = Tuple[Tuple[int, int, int, int], np.ndarray] # ((y0, y1, x0, x1), box-local bool mask)
+
+TRACE_STATISTICS = ('mean', 'std', 'min', 'max', 'sum', 'median') # Supported per-frame ROI statistics
+ROI_FILE_FORMAT_VERSION = 1
+ROI_CSV_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
 class ROI:
     """Represents a Region of Interest."""
-    def __init__(self, id: int, vertices: np.ndarray, image_shape: Tuple[int, int, int], shape_index: int):
+    def __init__(self, id: int, vertices: np.ndarray, image_shape: Tuple[int, int, int], shape_index: int,
+                 mask: Optional[MaskBox] = None):
         """
         Args:
             id (int): Unique identifier for the ROI.
@@ -18,6 +27,8 @@ class ROI:
                                    where D=2 for 2D shapes, and coordinates are (row, column).
             image_shape (Tuple[int, int, int]): Shape of the image stack (T, H, W).
             shape_index (int): The index of the shape in the napari Shapes layer.
+            mask (Optional[MaskBox]): Precomputed (bbox, local_mask), e.g. from `rasterize_polygons`
+                                      or a segmentation, used instead of rasterising `vertices`.
         """
         self.id = id
         self.creation_time = datetime.now()
@@ -25,18 +36,68 @@ class ROI:
         self.shape_index = shape_index
         self.image_height = image_shape[1]
         self.image_width = image_shape[2]
-        self.mask: Optional[np.ndarray] = None # (H, W) mask
+        # The mask is stored for the ROI's bounding box only: pixels local_mask[y, x] are
+        # frame pixels [bbox[0] + y, bbox[2] + x]. See `mask` for the full-frame version.
+        self.bbox: Tuple[int, int, int, int] = (0, 0, 0, 0) # (y0, y1, x0, x1), half-open
+        self.local_mask: Optional[np.ndarray] = None # (y1 - y0, x1 - x0) mask
         self._area_pixels: Optional[float] = None
         self._area_sq_um: Optional[float] = None
+        self._pixel_size_um: Optional[float] = None
         self.properties: Dict[str, Any] = {'name': f'ROI_{id}'} # For Napari properties
+        # Bumped whenever the mask changes; memoised traces are only valid for the version they
+        # were computed with and for the same stack object (held weakly).
+        self.mask_version = 0
+        self._trace_cache: Optional[Tuple[weakref.ref, int, np.ndarray]] = None
 
         if self.vertices.ndim != 2 or self.vertices.shape[1] != 2:
             raise ValueError(f"Vertices must be a N_points x 2 array. Got shape {self.vertices.shape}")
+        if mask is not None:
+            self.bbox = tuple(int(v) for v in mask[0])
+            self.local_mask = np.asarray(mask[1], dtype=bool)
+        else:
+            self._create_mask()
+        self._calculate_area_pixels()
+
+    def set_vertices(self, vertices: np.ndarray):
+        """
+        Replaces the ROI outline, re-rasterising its mask and invalidating its cached trace.
+
+        Args:
+            vertices (np.ndarray): New (N, 2) array of (y, x) coordinates.
+        """
+        vertices = np.array(vertices)
+        if vertices.ndim != 2 or vertices.shape[1] != 2:
+            raise ValueError(f"Vertices must be a N_points x 2 array. Got shape {vertices.shape}")
+        self.vertices = vertices
         self._create_mask()
         self._calculate_area_pixels()
+        if self._pixel_size_um is not None:
+            self.set_area_physical(self._pixel_size_um)
+        self.mask_version += 1
+        self._trace_cache = None
+
+    def clear_trace_cache(self):
+        self._trace_cache = None
+
+    def _cached_trace(self, image_stack: Any) -> Optional[np.ndarray]:
+        if self._trace_cache is None:
+            return None
+        stack_ref, mask_version, trace = self._trace_cache
+        if stack_ref() is image_stack and mask_version == self.mask_version:
+            return trace
+        return None
+
+    def _store_trace(self, image_stack: Any, trace: np.ndarray) -> np.ndarray:
+        """Memoises `trace` for this stack and mask version; returns it read-only."""
+        trace.setflags(write=False) # Shared by every caller, so it must not be modified in place
+        try:
+            self._trace_cache = (weakref.ref(image_stack), self.mask_version, trace)
+        except TypeError:
+            pass # Stacks that cannot be weakly referenced are not cached
+        return trace
 
     def _create_mask(self):
-        """Creates a binary mask from the ROI vertices."""
+        """Creates the bounding box and box-local binary mask from the ROI vertices."""
         from skimage.draw import polygon
         # Napari vertices are (row, col) which corresponds to (y, x)
         # Ensure vertices are within image bounds, skimage.draw.polygon needs this
@@ -45,8 +106,24 @@ class ROI:
         cols = np.clip(self.vertices[:, 1], 0, self.image_width - 1)
         
         rr, cc = polygon(rows, cols, shape=(self.image_height, self.image_width))
-        self.mask = np.zeros((self.image_height, self.image_width), dtype=bool)
-        self.mask[rr, cc] = True
+        if rr.size == 0:
+            self.bbox = (0, 0, 0, 0)
+            self.local_mask = np.zeros((0, 0), dtype=bool)
+            return
+        y0, x0 = int(rr.min()), int(cc.min())
+        self.bbox = (y0, int(rr.max()) + 1, x0, int(cc.max()) + 1)
+        self.local_mask = np.zeros((self.bbox[1] - y0, self.bbox[3] - x0), dtype=bool)
+        self.local_mask[rr - y0, cc - x0] = True
+
+    @property
+    def mask(self) -> Optional[np.ndarray]:
+        """The full-frame (H, W) mask, built on access. Prefer `bbox` and `local_mask`."""
+        if self.local_mask is None:
+            return None
+        y0, y1, x0, x1 = self.bbox
+        full_mask = np.zeros((self.image_height, self.image_width), dtype=bool)
+        full_mask[y0:y1, x0:x1] = self.local_mask
+        return full_mask
 
     def _calculate_area_pixels(self):
         """Calculates the area of the ROI in pixels using Shapely or mask sum."""
@@ -59,15 +136,15 @@ class ROI:
             # Shapely expects (x, y) order, Napari provides (row, col) which is (y,x)
             # So we might need to flip if using Shapely directly on raw vertices
             # However, using the mask is more straightforward here.
-            if self.mask is not None:
-                 self._area_pixels = np.sum(self.mask)
+            if self.local_mask is not None:
+                 self._area_pixels = np.sum(self.local_mask)
             else: # Fallback if mask creation failed
                 poly = Polygon(self.vertices[:, ::-1]) # Flip to (x,y) for shapely
                 self._area_pixels = poly.area
         except Exception as e:
             logger.error(f"Error calculating area for ROI {self.id} with Shapely: {e}. Falling back to mask sum.")
-            if self.mask is not None:
-                 self._area_pixels = np.sum(self.mask)
+            if self.local_mask is not None:
+                 self._area_pixels = np.sum(self.local_mask)
             else:
                 self._area_pixels = 0.0
                 logger.error(f"Could not calculate area for ROI {self.id} as mask is also None.")
@@ -84,6 +161,7 @@ class ROI:
         Args:
             pixel_size_um (float): The size of one pixel in micrometers (assuming square pixels).
         """
+        self._pixel_size_um = pixel_size_um
         if self._area_pixels is not None and pixel_size_um > 0:
             self._area_sq_um = self._area_pixels * (pixel_size_um ** 2)
         else:
@@ -96,47 +174,525 @@ class ROI:
     def area_sq_um(self) -> Optional[float]:
         return self._area_sq_um
 
-    def get_mean_intensity_trace(self, image_stack: np.ndarray) -> Optional[np.ndarray]:
+    def get_mean_intensity_trace(self, image_stack: np.ndarray, chunk_size: int = 256) -> Optional[np.ndarray]:
         """
         Calculates the mean intensity within the ROI for each frame in the stack.
 
+        Only the ROI's bounding-box slab `[t, y0:y1, x0:x1]` is read from the stack, `chunk_size`
+        frames at a time, so memmapped and lazy stacks are streamed rather than loaded whole.
+        Integer data is summed in 64-bit integers, which is exact for uint16 frames of any size.
+
+        The trace is memoised for this stack object and mask: asking again for the same stack
+        returns the cached (read-only) array until `set_vertices` changes the ROI or another
+        stack is passed.
+
         Args:
-            image_stack (np.ndarray): The image stack (T, H, W), expected to be greyscale.
+            image_stack (np.ndarray): The image stack (T, H, W), expected to be greyscale. May be
+                                      an ndarray, memmap or lazy stack.
+            chunk_size (int): Frames read and reduced per step.
 
         Returns:
-            Optional[np.ndarray]: A 1D array of mean intensities over time. None if ROI or stack is invalid.
+            Optional[np.ndarray]: A 1D read-only array of mean intensities over time. None if ROI or
+                                  stack is invalid.
         """
-        if self.mask is None or image_stack is None:
+        cached = self._cached_trace(image_stack)
+        if cached is not None:
+            return cached
+        if self.local_mask is None or image_stack is None:
             logger.warning(f"Cannot get intensity trace for ROI {self.id}: Mask or image_stack is None.")
             return None
         if image_stack.ndim != 3:
             logger.error(f"Image stack must be 3D (T, H, W). Got {image_stack.ndim}D.")
             return None
-        if image_stack.shape[1:] != self.mask.shape:
-            logger.error(f"Image stack dimensions {image_stack.shape[1:]} mismatch ROI mask {self.mask.shape}.")
+        if tuple(image_stack.shape[1:]) != (self.image_height, self.image_width):
+            logger.error(f"Image stack dimensions {image_stack.shape[1:]} mismatch ROI mask {(self.image_height, self.image_width)}.")
             return None
 
         try:
             num_frames = image_stack.shape[0]
             mean_intensities = np.zeros(num_frames)
-            masked_area_sum = np.sum(self.mask)
+            masked_area_sum = np.sum(self.local_mask)
             if masked_area_sum == 0:
                 logger.warning(f"ROI {self.id} has zero area in mask. Intensity trace will be all zeros.")
-                return mean_intensities
+                return self._store_trace(image_stack, mean_intensities)
 
-            for t in range(num_frames):
-                mean_intensities[t] = np.sum(image_stack[t][self.mask]) / masked_area_sum
-            return mean_intensities
+            y0, y1, x0, x1 = self.bbox
+            dtype = np.dtype(image_stack.dtype)
+            if dtype.kind == 'u':
+                accumulator = np.uint64
+            elif dtype.kind in 'ib':
+                accumulator = np.int64
+            else:
+                accumulator = np.float64
+            chunk_size = max(1, int(chunk_size))
+            for t0 in range(0, num_frames, chunk_size):
+                t1 = min(t0 + chunk_size, num_frames)
+                slab = np.asarray(image_stack[t0:t1, y0:y1, x0:x1])
+                mean_intensities[t0:t1] = slab[:, self.local_mask].sum(axis=1, dtype=accumulator)
+            mean_intensities /= masked_area_sum
+            return self._store_trace(image_stack, mean_intensities)
         except Exception as e:
             logger.error(f"Error calculating mean intensity trace for ROI {self.id}: {e}")
             return None
 
+    def get_intensity_statistics(self, image_stack: Any, statistics: Sequence[str] = TRACE_STATISTICS,
+                                 chunk_size: int = 256) -> Optional[np.ndarray]:
+        """
+        Calculates several per-frame intensity statistics of this ROI in one pass over the stack.
+
+        Args:
+            image_stack (Any): The image stack (T, H, W).
+            statistics (Sequence[str]): Any of `TRACE_STATISTICS`.
+            chunk_size (int): Frames read and reduced per step.
+
+        Returns:
+            Optional[np.ndarray]: A (T,) structured array with one float64 field per statistic
+                                  (see `extract_intensity_statistics`). None if the input is invalid.
+        """
+        result = extract_intensity_statistics([self], image_stack, statistics, chunk_size)
+        return result[0] if result is not None else None
+
+
+def _roi_band_pixels(rois: List[ROI], width: int) -> Optional[Tuple[int, int, List[np.ndarray]]]:
+    """
+    Locates the ROIs' pixels within the band of image rows they cover.
+
+    Only this band [y0, y1) needs to be read from the stack. Returns (y0, y1, pixels), where
+    pixels[i] are the flat indices of rois[i]'s mask pixels in a (y1 - y0) x width band (empty for
+    ROIs with an empty mask), or None if every mask is empty.
+    """
+    non_empty = [roi for roi in rois if roi.local_mask.any()]
+    if not non_empty:
+        return None
+    y0 = min(roi.bbox[0] for roi in non_empty)
+    y1 = max(roi.bbox[1] for roi in non_empty)
+    roi_pixels = []
+    for roi in rois:
+        local_y, local_x = np.nonzero(roi.local_mask)
+        if local_y.size == 0:
+            logger.warning(f"ROI {roi.id} has zero area in mask. Intensity trace will be all zeros.")
+        roi_pixels.append((local_y + roi.bbox[0] - y0) * width + (local_x + roi.bbox[2]))
+    return y0, y1, roi_pixels
+
+
+def extract_mean_intensity_traces(rois: List[ROI], image_stack: Any, chunk_size: int = 64) -> Optional[np.ndarray]:
+    """
+    Calculates the mean intensity trace of every ROI in a single pass over the stack.
+
+    The ROIs' box-local masks are combined into a sparse (R, P) weight matrix over the P pixels of
+    the image rows any ROI touches, each row holding 1/area on that ROI's pixels. Each chunk of frames is
+    then reduced with one sparse product, so the stack is read once however many ROIs there are,
+    and the cost grows with the total ROI area rather than with R x H x W.
+
+    Args:
+        rois (List[ROI]): ROIs to extract; all must match the stack's frame size.
+        image_stack (Any): The (T, H, W) greyscale stack. May be an ndarray, memmap or lazy stack;
+                           it is read `chunk_size` frames at a time.
+        chunk_size (int): Frames read and reduced per step.
+
+    Traces memoised on the ROIs (see `ROI.get_mean_intensity_trace`) are reused; only ROIs without
+    a valid cached trace for this stack are extracted, and their traces are cached in turn.
+
+    Returns:
+        Optional[np.ndarray]: An (R, T) float64 array, row i being the trace of rois[i]. ROIs with
+            an empty mask get an all-zero trace. None if the stack or ROIs are invalid.
+    """
+    from scipy import sparse
+
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3:
+        logger.error(f"Image stack must be 3D (T, H, W). Got {getattr(image_stack, 'ndim', None)}D.")
+        return None
+    num_frames, height, width = image_stack.shape
+    traces = np.zeros((len(rois), num_frames))
+    if not rois:
+        return traces
+    for roi in rois:
+        if roi.local_mask is None or (roi.image_height, roi.image_width) != (height, width):
+            logger.error(f"Image stack dimensions {(height, width)} mismatch ROI {roi.id} mask "
+                         f"{(roi.image_height, roi.image_width)}.")
+            return None
+
+    pending = []
+    for i, roi in enumerate(rois):
+        cached = roi._cached_trace(image_stack)
+        if cached is not None:
+            traces[i] = cached
+        else:
+            pending.append(i)
+    if not pending:
+        return traces
+    all_rois, rois = rois, [rois[i] for i in pending]
+
+    try:
+        band = _roi_band_pixels(rois, width)
+        if band is None:
+            logger.warning("All ROIs have zero area in mask. Intensity traces will be all zeros.")
+            for roi in rois:
+                roi._store_trace(image_stack, np.zeros(num_frames))
+            return traces
+        y0, y1, roi_pixels = band
+
+        areas = np.array([pixels.size for pixels in roi_pixels])
+        weights = np.repeat(1.0 / np.maximum(areas, 1), areas)
+        weight_matrix = sparse.csr_matrix(
+            (weights, (np.repeat(np.arange(len(rois)), areas), np.concatenate(roi_pixels))),
+            shape=(len(rois), (y1 - y0) * width))
+
+        extracted = np.zeros((len(rois), num_frames))
+        chunk_size = max(1, int(chunk_size))
+        for t0 in range(0, num_frames, chunk_size):
+            t1 = min(t0 + chunk_size, num_frames)
+            chunk = np.asarray(image_stack[t0:t1, y0:y1], dtype=np.float64).reshape(t1 - t0, -1)
+            extracted[:, t0:t1] = weight_matrix @ chunk.T
+        for i, roi, trace in zip(pending, rois, extracted):
+            traces[i] = roi._store_trace(image_stack, trace.copy())
+        return traces
+    except Exception as e:
+        logger.error(f"Error calculating mean intensity traces for {len(all_rois)} ROIs: {e}")
+        return None
+
+def extract_intensity_statistics(rois: List[ROI], image_stack: Any, statistics: Sequence[str] = TRACE_STATISTICS,
+                                 chunk_size: int = 64) -> Optional[np.ndarray]:
+    """
+    Calculates several per-frame intensity statistics of every ROI in a single pass over the stack.
+
+    Each chunk of frames is read once (only the band of rows the ROIs cover) and every requested
+    statistic is accumulated from it: sums with sparse products as in
+    `extract_mean_intensity_traces`, and the standard deviation from the squared deviations about
+    each frame's ROI mean (a centred second pass over the chunk, which stays accurate on bright,
+    low-variance traces); minima, maxima and medians from one (frames, ROIs, area) gather per
+    group of equally sized ROIs.
+
+    Args:
+        rois (List[ROI]): ROIs to extract; all must match the stack's frame size.
+        image_stack (Any): The (T, H, W) greyscale stack (ndarray, memmap or lazy stack).
+        statistics (Sequence[str]): Any of `TRACE_STATISTICS`: 'mean', 'std' (population),
+                                    'min', 'max', 'sum' (integrated intensity) and 'median'.
+        chunk_size (int): Frames read and reduced per step. Std, min, max and median hold a
+                          chunk_size x (total ROI area) copy of the pixels.
+
+    Returns:
+        Optional[np.ndarray]: An (R, T) structured array with one float64 field per statistic, in
+            the order requested, so `result['median'][i]` is the median trace of rois[i]. ROIs
+            with an empty mask get all-zero statistics. None if the input is invalid.
+    """
+    from scipy import sparse
+
+    statistics = list(dict.fromkeys(statistics))
+    unknown = [name for name in statistics if name not in TRACE_STATISTICS]
+    if unknown or not statistics:
+        logger.error(f"Unknown or no ROI statistics {unknown}. Choose from {TRACE_STATISTICS}.")
+        return None
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3:
+        logger.error(f"Image stack must be 3D (T, H, W). Got {getattr(image_stack, 'ndim', None)}D.")
+        return None
+    num_frames, height, width = image_stack.shape
+    result = np.zeros((len(rois), num_frames), dtype=[(name, np.float64) for name in statistics])
+    if not rois:
+        return result
+    for roi in rois:
+        if roi.local_mask is None or (roi.image_height, roi.image_width) != (height, width):
+            logger.error(f"Image stack dimensions {(height, width)} mismatch ROI {roi.id} mask "
+                         f"{(roi.image_height, roi.image_width)}.")
+            return None
+
+    try:
+        band = _roi_band_pixels(rois, width)
+        if band is None:
+            logger.warning("All ROIs have zero area in mask. Intensity statistics will be all zeros.")
+            return result
+        y0, y1, roi_pixels = band
+        # Only pixels inside some ROI are converted and reduced; index them compactly
+        used_pixels = np.unique(np.concatenate(roi_pixels))
+        roi_pixels = [np.searchsorted(used_pixels, pixels) for pixels in roi_pixels]
+        areas = np.array([pixels.size for pixels in roi_pixels])
+        filled = np.flatnonzero(areas) # ROIs with pixels; the others keep zeros
+
+        need_sum = any(name in statistics for name in ('mean', 'std', 'sum'))
+        need_order = any(name in statistics for name in ('min', 'max', 'median'))
+        if need_sum:
+            entry_rois = np.repeat(np.arange(len(rois)), areas) # One entry per (ROI, pixel) pair
+            entry_pixels = np.concatenate(roi_pixels)
+            sum_matrix = sparse.csr_matrix((np.ones(entry_pixels.size), (entry_rois, entry_pixels)),
+                                           shape=(len(rois), used_pixels.size))
+            sums = np.zeros((len(rois), num_frames))
+            safe_areas = np.maximum(areas, 1)[:, None]
+            if 'std' in statistics:
+                entry_matrix = sparse.csr_matrix(
+                    (np.ones(entry_pixels.size), (entry_rois, np.arange(entry_pixels.size))),
+                    shape=(len(rois), entry_pixels.size))
+                squared_deviations = np.zeros((len(rois), num_frames))
+        if need_order:
+            # ROIs of equal area (e.g. a grid) share one (ROIs, area) pixel index matrix
+            order_groups = []
+            for area in np.unique(areas[filled]):
+                members = filled[areas[filled] == area]
+                order_groups.append((members, np.stack([roi_pixels[i] for i in members])))
+
+        chunk_size = max(1, int(chunk_size))
+        for t0 in range(0, num_frames, chunk_size):
+            t1 = min(t0 + chunk_size, num_frames)
+            chunk = np.asarray(image_stack[t0:t1, y0:y1]).reshape(t1 - t0, -1)[:, used_pixels].astype(np.float64)
+            if need_sum:
+                sums[:, t0:t1] = sum_matrix @ chunk.T
+                if 'std' in statistics:
+                    # Deviations about each frame's ROI mean, not E[x^2] - E[x]^2, which cancels
+                    deviations = chunk[:, entry_pixels] - (sums[:, t0:t1] / safe_areas)[entry_rois].T
+                    squared_deviations[:, t0:t1] = entry_matrix @ (deviations ** 2).T
+                    del deviations
+            if need_order:
+                for members, pixel_matrix in order_groups:
+                    values = chunk[:, pixel_matrix] # (frames, ROIs, area)
+                    if 'min' in statistics:
+                        result['min'][members, t0:t1] = values.min(axis=2).T
+                    if 'max' in statistics:
+                        result['max'][members, t0:t1] = values.max(axis=2).T
+                    if 'median' in statistics:
+                        result['median'][members, t0:t1] = np.median(values, axis=2).T
+
+        if need_sum:
+            if 'sum' in statistics:
+                result['sum'] = sums
+            if 'mean' in statistics:
+                result['mean'] = sums / safe_areas
+            if 'std' in statistics:
+                result['std'] = np.sqrt(np.maximum(squared_deviations / safe_areas, 0.0))
+        return result
+    except Exception as e:
+        logger.error(f"Error calculating intensity statistics for {len(rois)} ROIs: {e}")
+        return None
+
+
+def _tight_mask_box(y0: int, x0: int, mask: np.ndarray) -> MaskBox:
+    """Shrinks a box-local mask to the rows and columns it actually covers."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return (0, 0, 0, 0), np.zeros((0, 0), dtype=bool)
+    cols = np.flatnonzero(mask.any(axis=0))
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return (y0 + r0, y0 + r1, x0 + c0, x0 + c1), mask[r0:r1, c0:c1]
+
+
+def rasterize_polygons(polygons: List[np.ndarray], image_shape: Tuple[int, int],
+                       max_batch_pixels: int = 2 ** 22) -> List[MaskBox]:
+    """
+    Rasterises many (N, 2) (y, x) polygons at once.
+
+    Produces the same pixels as `ROI`'s per-polygon `skimage.draw.polygon` path (vertices clipped
+    to the image; pixels inside, on an edge or on a vertex), but tests every pixel of every polygon's
+    bounding box against one edge index at a time, vectorised across all polygons. Thousands of
+    ROIs therefore cost a few NumPy passes instead of thousands of separate calls.
+
+    Args:
+        polygons (List[np.ndarray]): Vertex arrays in napari (row, column) order.
+        image_shape (Tuple[int, int]): (H, W) of the frames.
+        max_batch_pixels (int): Bounding-box pixels tested per batch, bounding scratch memory.
+
+    Returns:
+        List[MaskBox]: (bbox, local_mask) per polygon, as stored on `ROI`; the bbox is tight
+            ((0, 0, 0, 0) with an empty mask if no pixel is covered).
+    """
+    height, width = image_shape
+    if not polygons:
+        return []
+    results: List[Optional[MaskBox]] = [None] * len(polygons)
+    counts = np.array([len(p) for p in polygons])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    vertices = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons])
+    all_y = np.clip(vertices[:, 0], 0, height - 1)
+    all_x = np.clip(vertices[:, 1], 0, width - 1)
+    y0 = np.floor(np.minimum.reduceat(all_y, starts)).astype(np.int64)
+    x0 = np.floor(np.minimum.reduceat(all_x, starts)).astype(np.int64)
+    box_h = np.ceil(np.maximum.reduceat(all_y, starts)).astype(np.int64) - y0 + 1
+    box_w = np.ceil(np.maximum.reduceat(all_x, starts)).astype(np.int64) - x0 + 1
+    box_pixels = box_h * box_w
+
+    # Pad every polygon to the same vertex count by repeating its last vertex; the extra
+    # zero-length edges never change a crossing parity.
+    vertex_index = starts[:, None] + np.minimum(np.arange(counts.max()), counts[:, None] - 1)
+    vertex_y, vertex_x = all_y[vertex_index], all_x[vertex_index]
+    max_vertices = vertex_index.shape[1]
+
+    batch_start = 0
+    while batch_start < len(polygons):
+        batch_end = batch_start + 1
+        batch_pixels = box_pixels[batch_start]
+        while batch_end < len(polygons) and batch_pixels + box_pixels[batch_end] <= max_batch_pixels:
+            batch_pixels += box_pixels[batch_end]
+            batch_end += 1
+        ids = np.arange(batch_start, batch_end)
+        offsets = np.concatenate(([0], np.cumsum(box_pixels[ids])))
+        owner = np.repeat(ids, box_pixels[ids])
+        local = np.arange(offsets[-1]) - np.repeat(offsets[:-1], box_pixels[ids])
+        py = (y0[owner] + local // box_w[owner]).astype(np.float64)
+        px = (x0[owner] + local % box_w[owner]).astype(np.float64)
+
+        # Crossing-parity test of rays towards -x and +x, as in skimage's point_in_polygon: a pixel
+        # crossed an odd number of times in both directions is inside, in one direction only
+        # it lies on an edge; both count as covered, as do vertices.
+        right_cross = np.zeros(py.size, dtype=bool)
+        left_cross = np.zeros(py.size, dtype=bool)
+        on_vertex = np.zeros(py.size, dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(max_vertices):
+                xi, yi = vertex_x[owner, i] - px, vertex_y[owner, i] - py
+                xj, yj = vertex_x[owner, i - 1] - px, vertex_y[owner, i - 1] - py
+                on_vertex |= (xi == 0) & (yi == 0)
+                x_cross = (xi * yj - xj * yi) / (yj - yi)
+                right_cross ^= ((yi > 0) != (yj > 0)) & (x_cross > 0)
+                left_cross ^= ((yi < 0) != (yj < 0)) & (x_cross < 0)
+        covered = on_vertex | right_cross | left_cross
+        for k, i in enumerate(ids):
+            box_mask = covered[offsets[k]:offsets[k + 1]].reshape(box_h[i], box_w[i])
+            results[i] = _tight_mask_box(int(y0[i]), int(x0[i]), box_mask)
+        batch_start = batch_end
+    return results
+
+
+def grid_roi_vertices(image_shape: Tuple[int, int], tile_size: int, gap: int = 0) -> List[np.ndarray]:
+    """
+    Tiles the frame with square ROIs.
+
+    Args:
+        image_shape (Tuple[int, int]): (H, W) of the frames.
+        tile_size (int): Tile side in pixels. Partial tiles at the right/bottom edges are dropped.
+        gap (int): Pixels left between neighbouring tiles.
+
+    Returns:
+        List[np.ndarray]: (4, 2) rectangle vertices per tile, in napari (row, column) order. Each
+            covers exactly `tile_size` x `tile_size` pixels.
+    """
+    height, width = image_shape
+    pitch = tile_size + gap
+    tops = np.arange(0, height - tile_size + 1, pitch)
+    lefts = np.arange(0, width - tile_size + 1, pitch)
+    last = tile_size - 1 # Boundary pixels are inside, so corners sit on the outermost pixel centres
+    return [np.array([[y, x], [y, x + last], [y + last, x + last], [y + last, x]], dtype=np.float64)
+            for y in tops for x in lefts]
+
+
+def compute_projection(image_stack: Any, method: str = 'std', chunk_size: int = 256) -> Optional[np.ndarray]:
+    """
+    Collapses a (T, H, W) stack into a (H, W) image for ROI segmentation, streaming it in chunks.
+
+    Args:
+        image_stack (Any): The greyscale stack (ndarray, memmap or lazy stack).
+        method (str): 'max' (brightest value), 'std' (temporal standard deviation, highlights
+                      active cells) or 'correlation' (mean temporal correlation of each pixel
+                      with its 4 neighbours, highlights coherent active regions).
+        chunk_size (int): Frames read per step.
+
+    Returns:
+        Optional[np.ndarray]: The float64 projection, or None for an invalid stack or method.
+    """
+    if image_stack is None or getattr(image_stack, 'ndim', None) != 3:
+        logger.error("Projection needs a 3D (T, H, W) stack.")
+        return None
+    if method not in ('max', 'std', 'correlation'):
+        logger.error(f"Unknown projection method '{method}'. Use 'max', 'std' or 'correlation'.")
+        return None
+    num_frames, height, width = image_stack.shape
+    total = np.zeros((height, width))
+    total_sq = np.zeros((height, width))
+    maximum = np.full((height, width), -np.inf)
+    right_products = np.zeros((height, width - 1))
+    down_products = np.zeros((height - 1, width))
+    for t0 in range(0, num_frames, max(1, int(chunk_size))):
+        chunk = np.asarray(image_stack[t0:t0 + chunk_size], dtype=np.float64)
+        if method == 'max':
+            np.maximum(maximum, chunk.max(axis=0), out=maximum)
+            continue
+        total += chunk.sum(axis=0)
+        total_sq += np.einsum('tyx,tyx->yx', chunk, chunk)
+        if method == 'correlation':
+            right_products += np.einsum('tyx,tyx->yx', chunk[:, :, :-1], chunk[:, :, 1:])
+            down_products += np.einsum('tyx,tyx->yx', chunk[:, :-1], chunk[:, 1:])
+    if method == 'max':
+        return maximum
+
+    mean = total / num_frames
+    std = np.sqrt(np.maximum(total_sq / num_frames - mean ** 2, 0.0))
+    if method == 'std':
+        return std
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        right = (right_products / num_frames - mean[:, :-1] * mean[:, 1:]) / (std[:, :-1] * std[:, 1:])
+        down = (down_products / num_frames - mean[:-1] * mean[1:]) / (std[:-1] * std[1:])
+    right, down = np.nan_to_num(right), np.nan_to_num(down) # Flat pixels correlate with nothing
+    correlation_sum = np.zeros((height, width))
+    neighbours = np.zeros((height, width))
+    correlation_sum[:, :-1] += right
+    correlation_sum[:, 1:] += right
+    correlation_sum[:-1] += down
+    correlation_sum[1:] += down
+    neighbours[:, :-1] += 1
+    neighbours[:, 1:] += 1
+    neighbours[:-1] += 1
+    neighbours[1:] += 1
+    return correlation_sum / np.maximum(neighbours, 1)
+
+
+def segment_blob_rois(projection: np.ndarray, threshold: Optional[float] = None, smooth_sigma: float = 1.0,
+                      min_area: int = 10, max_area: Optional[int] = None,
+                      tolerance: float = 0.5) -> Tuple[List[np.ndarray], List[MaskBox]]:
+    """
+    Segments bright blobs in a projection image into ROIs.
+
+    The projection is smoothed, thresholded (Otsu if no threshold is given) and split into
+    connected components. Each component's mask is taken straight from the label image, so no
+    polygon is rasterised; its outline (simplified to within `tolerance` pixels) provides the
+    Shapes layer vertices.
+
+    Args:
+        projection (np.ndarray): (H, W) image, e.g. from `compute_projection`.
+        threshold (Optional[float]): Intensity threshold on the smoothed projection.
+        smooth_sigma (float): Gaussian smoothing before thresholding (0 disables it).
+        min_area (int): Smallest component kept, in pixels.
+        max_area (Optional[int]): Largest component kept, in pixels.
+        tolerance (float): Outline simplification tolerance in pixels.
+
+    Returns:
+        Tuple[List[np.ndarray], List[MaskBox]]: Outline vertices and (bbox, local_mask) per blob,
+            for `ROIManager.add_rois`.
+    """
+    from scipy import ndimage
+    from skimage.filters import threshold_otsu
+    from skimage.measure import find_contours, approximate_polygon
+
+    image = np.asarray(projection, dtype=np.float64)
+    if smooth_sigma > 0:
+        image = ndimage.gaussian_filter(image, smooth_sigma)
+    if threshold is None:
+        threshold = threshold_otsu(image) if np.ptp(image) > 0 else np.inf
+    labels, num_labels = ndimage.label(image > threshold)
+    areas = np.bincount(labels.ravel(), minlength=num_labels + 1)
+
+    vertices_list: List[np.ndarray] = []
+    masks: List[MaskBox] = []
+    for label, box in enumerate(ndimage.find_objects(labels), start=1):
+        if box is None or areas[label] < min_area or (max_area is not None and areas[label] > max_area):
+            continue
+        local_mask = labels[box] == label
+        y0, x0 = box[0].start, box[1].start
+        # Pad so the outline closes around blobs touching the box edge
+        contours = find_contours(np.pad(local_mask, 1).astype(np.float64), 0.5)
+        outline = max(contours, key=len) - 1 + (y0, x0)
+        outline = approximate_polygon(outline, tolerance)
+        if len(outline) > 3 and np.array_equal(outline[0], outline[-1]):
+            outline = outline[:-1] # find_contours repeats the first point
+        vertices_list.append(outline)
+        masks.append(((y0, box[0].stop, x0, box[1].stop), local_mask))
+    logger.info(f"Segmented {len(masks)} blob ROIs ({num_labels} components at threshold {threshold:.3g}).")
+    return vertices_list, masks
+
+
 # Example of how you might manage multiple ROIs
 class ROIManager:
     def __init__(self, image_shape_thw: Tuple[int,int,int]):
         self.rois: Dict[int, ROI] = {}
         self.next_roi_id = 1
         self.image_shape_thw = image_shape_thw # T, H, W
+        self._by_shape_index: Dict[int, ROI] = {} # Inverse of ROI.shape_index
 
     def export_rois_to_csv(self, file_path: str) -> bool:
         """
@@ -161,7 +717,7 @@ class ROIManager:
 
                 # Write data
                 for roi_id, roi in sorted(self.rois.items()):
-                    timestamp_str = roi.creation_time.strftime("%Y-%m-%d %H:%M:%S")
+                    timestamp_str = roi.creation_time.strftime(ROI_CSV_TIMESTAMP_FORMAT)
                     for vertex_idx, vertex in enumerate(roi.vertices):
                         row = [
                             roi.id,
@@ -181,10 +737,160 @@ class ROIManager:
             logger.error(f"An unexpected error occurred during CSV export: {e}")
             return False
 
+    def import_rois_from_csv(self, file_path: str, first_shape_index: Optional[int] = None) -> Optional[List[ROI]]:
+        """
+        Adds the ROIs stored in a CSV written by `export_rois_to_csv`.
+
+        All polygons are rasterised in one batch and added with `add_rois`. The imported ROIs get
+        new IDs, in the order of their IDs in the file, and keep their creation timestamps.
+
+        Args:
+            file_path (str): Path to the CSV file.
+            first_shape_index (Optional[int]): Shapes layer index of the first imported ROI; the
+                                               rest follow consecutively (default: after the
+                                               current highest index).
+
+        Returns:
+            Optional[List[ROI]]: The imported ROIs, or None if the file cannot be read.
+        """
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+                csv_reader = csv.reader(csvfile)
+                header = next(csv_reader, None)
+                required = ['roi_id', 'creation_timestamp', 'vertex_index', 'axis-0 (y)', 'axis-1 (x)']
+                if header is None or any(name not in header for name in required):
+                    logger.error(f"{file_path} is not a TransiScope ROI file (expected columns {required}).")
+                    return None
+                columns = [header.index(name) for name in required]
+                rows = [[row[i] for i in columns] for row in csv_reader if row]
+        except (IOError, IndexError) as e:
+            logger.error(f"Failed to read ROI CSV file {file_path}: {e}")
+            return None
+        if not rows:
+            logger.warning(f"No ROIs found in {file_path}.")
+            return []
+
+        try:
+            roi_ids, timestamps, vertex_indices, ys, xs = zip(*rows)
+            roi_ids = np.array(roi_ids, dtype=np.int64)
+            vertex_indices = np.array(vertex_indices, dtype=np.int64)
+            vertices = np.column_stack((np.array(ys, dtype=np.float64), np.array(xs, dtype=np.float64)))
+        except ValueError as e:
+            logger.error(f"Invalid value in ROI CSV file {file_path}: {e}")
+            return None
+        order = np.lexsort((vertex_indices, roi_ids))
+        _, starts = np.unique(roi_ids[order], return_index=True)
+        vertices_list = np.split(vertices[order], starts[1:])
+        creation_times = [self._parse_timestamp(timestamps[order[start]]) for start in starts]
+        return self._add_imported_rois(vertices_list, creation_times, None, first_shape_index, file_path)
+
+    def export_rois_to_npz(self, file_path: str) -> bool:
+        """
+        Exports all ROIs (vertices and rasterised masks) to a binary `.npz` file.
+
+        Members: `roi_id`, `creation_time`, `vertex_counts` and the concatenated `vertices`;
+        `image_shape`, `mask_bbox` and the bit-packed box-local masks `mask_bits`, so an import
+        into a recording of the same frame size needs no rasterisation; `format_version`.
+
+        Args:
+            file_path (str): The path to save the `.npz` file to (extension added if missing).
+
+        Returns:
+            bool: True if export was successful, False otherwise.
+        """
+        if not self.rois:
+            logger.warning("No ROIs to export.")
+            return False
+        if not file_path.lower().endswith(".npz"):
+            file_path += ".npz"
+            logger.info(f"Appending .npz extension. Output path: {file_path}")
+        rois = [roi for _, roi in sorted(self.rois.items())]
+        try:
+            np.savez(
+                file_path,
+                roi_id=np.array([roi.id for roi in rois], dtype=np.int64),
+                creation_time=np.array([roi.creation_time.isoformat() for roi in rois], dtype=str),
+                vertex_counts=np.array([len(roi.vertices) for roi in rois], dtype=np.int64),
+                vertices=np.concatenate([np.asarray(roi.vertices, dtype=np.float64) for roi in rois]),
+                image_shape=np.array(self.image_shape_thw[1:3], dtype=np.int64),
+                mask_bbox=np.array([roi.bbox for roi in rois], dtype=np.int64),
+                mask_bits=np.packbits(np.concatenate([roi.local_mask.ravel() for roi in rois])),
+                format_version=np.array(ROI_FILE_FORMAT_VERSION),
+            )
+            logger.info(f"Successfully exported {len(rois)} ROIs to {file_path}")
+            return True
+        except IOError as e:
+            logger.error(f"Failed to write ROI file {file_path}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during binary ROI export: {e}")
+            return False
+
+    def import_rois_from_npz(self, file_path: str, first_shape_index: Optional[int] = None) -> Optional[List[ROI]]:
+        """
+        Adds the ROIs stored in a `.npz` file written by `export_rois_to_npz`.
+
+        The stored masks are used as they are if the file was written for frames of the same
+        size; otherwise the polygons are rasterised for this image in one batch.
+
+        Args:
+            file_path (str): Path to the `.npz` file.
+            first_shape_index (Optional[int]): As for `import_rois_from_csv`.
+
+        Returns:
+            Optional[List[ROI]]: The imported ROIs, or None if the file cannot be read.
+        """
+        try:
+            with np.load(file_path) as npz:
+                version = int(npz["format_version"])
+                if version > ROI_FILE_FORMAT_VERSION:
+                    logger.warning(f"{file_path} was written by a newer TransiScope (format {version}); reading what is known.")
+                vertex_counts = npz["vertex_counts"]
+                vertices = npz["vertices"]
+                creation_times = [self._parse_timestamp(value) for value in npz["creation_time"]]
+                image_shape = tuple(int(v) for v in npz["image_shape"])
+                mask_bbox = npz["mask_bbox"]
+                mask_bits = npz["mask_bits"]
+        except (IOError, KeyError, ValueError) as e:
+            logger.error(f"Failed to read ROI file {file_path}: {e}")
+            return None
+
+        vertices_list = np.split(vertices, np.cumsum(vertex_counts)[:-1])
+        masks = None
+        if image_shape == tuple(self.image_shape_thw[1:3]):
+            box_sizes = (mask_bbox[:, 1] - mask_bbox[:, 0]) * (mask_bbox[:, 3] - mask_bbox[:, 2])
+            flat_masks = np.unpackbits(mask_bits, count=int(box_sizes.sum())).astype(bool)
+            masks = [(tuple(bbox), flat.reshape(bbox[1] - bbox[0], bbox[3] - bbox[2]))
+                     for bbox, flat in zip(mask_bbox, np.split(flat_masks, np.cumsum(box_sizes)[:-1]))]
+        else:
+            logger.info(f"ROIs in {file_path} were drawn on {image_shape[0]}x{image_shape[1]} frames; rasterising them again.")
+        return self._add_imported_rois(vertices_list, creation_times, masks, first_shape_index, file_path)
+
+    @staticmethod
+    def _parse_timestamp(value: str) -> datetime:
+        for parse in (datetime.fromisoformat, lambda text: datetime.strptime(text, ROI_CSV_TIMESTAMP_FORMAT)):
+            try:
+                return parse(str(value))
+            except ValueError:
+                continue
+        return datetime.now()
+
+    def _add_imported_rois(self, vertices_list: List[np.ndarray], creation_times: List[datetime],
+                           masks: Optional[List[MaskBox]], first_shape_index: Optional[int],
+                           file_path: str) -> List[ROI]:
+        if first_shape_index is None:
+            first_shape_index = max(self._by_shape_index, default=-1) + 1
+        shape_indices = list(range(first_shape_index, first_shape_index + len(vertices_list)))
+        rois = self.add_rois(vertices_list, shape_indices=shape_indices, masks=masks,
+                             creation_times=creation_times)
+        logger.info(f"Imported {len(rois)} ROIs from {file_path}")
+        return rois
+
     def add_roi(self, vertices: np.ndarray, shape_index: int) -> Optional[ROI]:
         try:
             roi = ROI(self.next_roi_id, vertices, self.image_shape_thw, shape_index)
             self.rois[self.next_roi_id] = roi
+            self._by_shape_index[shape_index] = roi
             self.next_roi_id += 1
             logger.info(f"Added ROI {roi.id} (Shape index: {shape_index}) with {len(vertices)} vertices.")
             return roi
@@ -195,19 +901,145 @@ class ROIManager:
             logger.error(f"Unexpected error adding ROI: {e}")
             return None
 
+    def add_rois(self, vertices_list: List[np.ndarray], shape_indices: Optional[List[int]] = None,
+                 masks: Optional[List[MaskBox]] = None,
+                 creation_times: Optional[List[datetime]] = None) -> List[ROI]:
+        """
+        Adds many ROIs at once, rasterising them in one batch with `rasterize_polygons`.
+
+        Args:
+            vertices_list (List[np.ndarray]): (N, 2) vertex arrays.
+            shape_indices (Optional[List[int]]): Shapes layer index of each ROI (default: numbered
+                                                 on from the current highest index).
+            masks (Optional[List[MaskBox]]): Precomputed (bbox, local_mask) per ROI, e.g. from
+                                             `segment_blob_rois`; skips rasterisation.
+            creation_times (Optional[List[datetime]]): Creation timestamps to keep, e.g. on import.
+
+        Returns:
+            List[ROI]: The ROIs created (invalid vertex arrays are logged and skipped).
+        """
+        if shape_indices is None:
+            first_index = max(self._by_shape_index, default=-1) + 1
+            shape_indices = list(range(first_index, first_index + len(vertices_list)))
+        vertices_list = [np.asarray(vertices, dtype=np.float64) for vertices in vertices_list]
+        if masks is None:
+            valid = [i for i, vertices in enumerate(vertices_list)
+                     if vertices.ndim == 2 and vertices.shape[1] == 2 and len(vertices) > 0]
+            rasterized = rasterize_polygons([vertices_list[i] for i in valid], tuple(self.image_shape_thw[1:3]))
+            masks = [None] * len(vertices_list)
+            for i, mask in zip(valid, rasterized):
+                masks[i] = mask
+        if creation_times is None:
+            creation_times = [None] * len(vertices_list)
+        added = []
+        for vertices, shape_index, mask, creation_time in zip(vertices_list, shape_indices, masks, creation_times):
+            if mask is None:
+                logger.error(f"Failed to add ROI: Vertices must be a N_points x 2 array. Got shape {vertices.shape}")
+                continue
+            try:
+                roi = ROI(self.next_roi_id, vertices, self.image_shape_thw, shape_index, mask=mask)
+            except ValueError as ve:
+                logger.error(f"Failed to add ROI: {ve}")
+                continue
+            if creation_time is not None:
+                roi.creation_time = creation_time
+            self.rois[roi.id] = roi
+            self._by_shape_index[shape_index] = roi
+            self.next_roi_id += 1
+            added.append(roi)
+        logger.info(f"Added {len(added)} ROIs.")
+        return added
+
     def get_roi_by_shape_index(self, shape_index: int) -> Optional[ROI]:
         """Finds an ROI by its corresponding napari shape index."""
-        for roi in self.rois.values():
-            if roi.shape_index == shape_index:
-                return roi
-        return None
+        return self._by_shape_index.get(shape_index)
+
+    @staticmethod
+    def _vertex_key(vertices: np.ndarray) -> bytes:
+        return np.ascontiguousarray(vertices, dtype=np.float64).tobytes()
+
+    def sync_shapes(self, shapes_data: List[np.ndarray]) -> Tuple[List[ROI], List[ROI], List[ROI]]:
+        """
+        Brings the ROIs in line with the current napari Shapes layer data.
+
+        Shapes are matched to ROIs in three passes: same index and same vertices (unchanged);
+        same vertices at a new index (shifted by a deletion); then an unmatched ROI whose index
+        is still free takes the shape now at that index (an in-place vertex edit). Leftover shapes
+        become new ROIs and leftover ROIs are removed. Only added and edited ROIs are rasterised.
+
+        Args:
+            shapes_data (List[np.ndarray]): The layer's `data`, one (N, 2) vertex array per shape.
+
+        Returns:
+            Tuple[List[ROI], List[ROI], List[ROI]]: The added, changed (re-rasterised) and
+                removed ROIs. ROIs whose shape only moved index are updated silently.
+        """
+        unmatched_shapes = []
+        unmatched_rois = dict(self._by_shape_index) # shape_index -> ROI
+        new_map: Dict[int, ROI] = {}
+        for index, vertices in enumerate(shapes_data):
+            roi = unmatched_rois.get(index)
+            if roi is not None and np.array_equal(roi.vertices, vertices):
+                new_map[index] = unmatched_rois.pop(index)
+            else:
+                unmatched_shapes.append(index)
+
+        if unmatched_shapes and unmatched_rois:
+            by_key: Dict[bytes, List[ROI]] = {}
+            for roi in unmatched_rois.values():
+                by_key.setdefault(self._vertex_key(roi.vertices), []).append(roi)
+            still_unmatched = []
+            for index in unmatched_shapes:
+                candidates = by_key.get(self._vertex_key(shapes_data[index]))
+                if candidates:
+                    roi = candidates.pop(0)
+                    del unmatched_rois[roi.shape_index]
+                    roi.shape_index = index
+                    new_map[index] = roi
+                else:
+                    still_unmatched.append(index)
+            unmatched_shapes = still_unmatched
+
+        changed: List[ROI] = []
+        added_indices = []
+        for index in unmatched_shapes:
+            roi = unmatched_rois.pop(index, None)
+            if roi is None:
+                added_indices.append(index)
+                continue
+            try:
+                roi.set_vertices(shapes_data[index])
+            except ValueError as ve:
+                logger.error(f"Failed to update ROI {roi.id}: {ve}")
+                unmatched_rois[index] = roi # Drop it with the removed ROIs below
+                added_indices.append(index)
+                continue
+            new_map[index] = roi
+            changed.append(roi)
+
+        removed = list(unmatched_rois.values())
+        for roi in removed:
+            del self.rois[roi.id]
+        self._by_shape_index = new_map
+
+        added = []
+        for index in added_indices:
+            roi = self.add_roi(shapes_data[index], index)
+            if roi is not None:
+                added.append(roi)
+
+        if changed or removed:
+            logger.info(f"Synced ROIs with shapes: {len(added)} added, {len(changed)} changed, {len(removed)} removed.")
+        return added, changed, removed
 
     def get_roi(self, roi_id: int) -> Optional[ROI]:
         return self.rois.get(roi_id)
 
     def remove_roi(self, roi_id: int):
         if roi_id in self.rois:
-            del self.rois[roi_id]
+            roi = self.rois.pop(roi_id)
+            if self._by_shape_index.get(roi.shape_index) is roi:
+                del self._by_shape_index[roi.shape_index]
             logger.info(f"Removed ROI {roi_id}.")
         else:
             logger.warning(f"ROI {roi_id} not found for removal.")
@@ -215,6 +1047,12 @@ class ROIManager:
     def get_all_rois(self) -> List[ROI]:
         return list(self.rois.values())
 
+    def clear(self):
+        """Removes every ROI and restarts ROI numbering at 1."""
+        self.rois = {}
+        self._by_shape_index = {}
+        self.next_roi_id = 1
+
     def update_image_shape(self, new_image_shape_thw: Tuple[int,int,int]):
         self.image_shape_thw = new_image_shape_thw
         # Potentially invalidate or update existing ROIs if dimensions change drastically
@@ -0,0 +1,78 @@
+"""
+Throughput benchmark: page-by-page TIFF decoding vs. io_operations.load_multitiff.
+
+Writes a synthetic multi-page TIFF for each available compression, then compares the old
+single-core `page.asarray()` loop with load_multitiff at several worker counts.
+
+Usage:
+    python benchmarks/bench_tiff_decode.py [--frames 2000] [--size 512] [--repeats 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import tifffile
+
+from TransiScope import io_operations
+
+
+def page_loop(file_path):
+    """The original load_multitiff decode loop: one page at a time into a list."""
+    with tifffile.TiffFile(file_path) as tif:
+        return [page.asarray() for page in tif.pages]
+
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_stack(frames, size):
+    # Smooth blobs plus noise compresses like real fluorescence data, unlike pure noise.
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[:size, :size]
+    base = 2000 * np.exp(-((yy - size / 2) ** 2 + (xx - size / 2) ** 2) / (2 * (size / 6) ** 2))
+    stack = np.empty((frames, size, size), dtype=np.uint16)
+    for t in range(frames):
+        stack[t] = base + rng.poisson(100, (size, size))
+    return stack
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    stack = make_stack(args.frames, args.size)
+    megabytes = stack.nbytes / 1e6
+    worker_counts = [1, 2, 4, os.cpu_count() or 1]
+    print(f"Stack: {stack.shape} {stack.dtype} ({megabytes:.0f} MB decoded)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compression in (None, "zlib", "lzw", "zstd"):
+            file_path = os.path.join(tmp_dir, f"bench_{compression or 'raw'}.tif")
+            try:
+                tifffile.imwrite(file_path, stack, compression=compression)
+                tifffile.imread(file_path, key=0) # Check the codec can also decode
+            except Exception as e:
+                print(f"\n{compression}: skipped ({e})")
+                continue
+
+            print(f"\n{compression or 'uncompressed'} ({os.path.getsize(file_path) / 1e6:.0f} MB on disk)")
+            baseline = best_time(lambda: page_loop(file_path), args.repeats)
+            print(f"  page loop            {megabytes / baseline:8.1f} MB/s")
+            for workers in sorted(set(worker_counts)):
+                elapsed = best_time(lambda: io_operations.load_multitiff(file_path, max_workers=workers), args.repeats)
+                print(f"  load_multitiff x{workers:<3} {megabytes / elapsed:8.1f} MB/s  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# TransiScope/tests/test_analysis_processor.py
+import unittest
+import numpy as np
+from TransiScope import analysis_processor
+
+
+class TestAnalysisProcessor(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.fps = 10.0
+        self.stack = rng.poisson(50, (300, 12, 17)).astype(np.uint16) # T, H, W
+        for t in range(0, 300, 23): # Periodic transients in the top rows
+            self.stack[t:t + 3, :6] += 40
+        self.stack[:, 0, 0] = 7 # Constant pixel
+        self.stack[100:110, 1, 1] = 200 # Plateau
+
+    def _per_pixel_counts(self, detector, **params):
+        counts = np.zeros(self.stack.shape[1:], dtype=int)
+        for y, x in np.ndindex(*counts.shape):
+            counts[y, x] = len(detector(self.stack[:, y, x].astype(float), self.fps, 0, **params))
+        return counts
+
+    def test_pixelwise_matches_trace_detectors(self):
+        cases = [
+            ('threshold', analysis_processor.detect_events_threshold, {'threshold_value': 60.0}),
+            ('threshold', analysis_processor.detect_events_threshold, {'use_otsu': True}),
+            ('threshold', analysis_processor.detect_events_threshold, {'use_otsu': True, 'min_duration_frames': 3}),
+            ('dog', analysis_processor.detect_events_dog, {'sigma1': 1.0, 'sigma2': 3.0}),
+            ('dog', analysis_processor.detect_events_dog, {'sigma1': 1.0, 'sigma2': 3.0, 'min_prominence': 5.0}),
+        ]
+        for method, detector, params in cases:
+            expected = self._per_pixel_counts(detector, **params)
+            self.assertGreater(expected.sum(), 0)
+            # From one block for the whole frame down to partial rows
+            for max_chunk_bytes in (2 ** 30, 300 * 8 * 4 * 40, 300 * 8 * 4 * 5):
+                maps = analysis_processor.detect_events_pixelwise(
+                    self.stack, self.fps, method=method, max_chunk_bytes=max_chunk_bytes, **params)
+                self.assertTrue(np.array_equal(maps['event_count'], expected), msg=(method, params, max_chunk_bytes))
+                self.assertTrue(np.allclose(maps['event_rate'], expected / (300 / self.fps)))
+                self.assertEqual(maps['event_count'][0, 0], 0)
+
+    def test_pixelwise_reads_lazy_stacks_in_row_bands(self):
+        expected = self._per_pixel_counts(analysis_processor.detect_events_threshold, threshold_value=60.0)
+        reads = []
+
+        class CountingStack: # Stands in for a lazy stack: every read decodes all T frames
+            ndim, shape, dtype = self.stack.ndim, self.stack.shape, self.stack.dtype
+
+            def __getitem__(_, key):
+                reads.append(key)
+                return self.stack[key]
+
+        band_bytes = 300 * 17 * 2 # One row of the uint16 source
+        # The whole stack fits in half the budget: one read, split into many small blocks
+        for max_chunk_bytes, expected_reads in ((2 * 12 * band_bytes, 1), (2 * 5 * band_bytes, 3)):
+            reads.clear()
+            maps = analysis_processor.detect_events_pixelwise(CountingStack(), self.fps, threshold_value=60.0,
+                                                              max_chunk_bytes=max_chunk_bytes)
+            self.assertTrue(np.array_equal(maps['event_count'], expected), msg=max_chunk_bytes)
+            self.assertEqual(len(reads), expected_reads)
+        # Chunked stacks are read in whole storage chunks
+        CountingStack.chunks = (64, 4, 17)
+        reads.clear()
+        maps = analysis_processor.detect_events_pixelwise(CountingStack(), self.fps, threshold_value=60.0,
+                                                          max_chunk_bytes=2 * 5 * band_bytes)
+        self.assertTrue(np.array_equal(maps['event_count'], expected))
+        self.assertEqual([key[1] for key in reads], [slice(0, 4), slice(4, 8), slice(8, 12)])
+
+    def test_pixelwise_dff_matches_normalised_traces(self):
+        dff_params = {'window_frames': 51, 'method': 'percentile', 'percentile': 10.0}
+        expected = np.zeros(self.stack.shape[1:], dtype=int)
+        for y, x in np.ndindex(*expected.shape):
+            dff = analysis_processor.compute_dff(self.stack[:, y, x].astype(float), **dff_params)
+            expected[y, x] = len(analysis_processor.detect_events_threshold(dff, self.fps, 0, threshold_value=0.4))
+        self.assertGreater(expected.sum(), 0)
+        for max_chunk_bytes in (2 ** 30, 300 * 8 * 6 * 5):
+            maps = analysis_processor.detect_events_pixelwise(self.stack, self.fps, threshold_value=0.4,
+                                                              dff_params=dff_params, max_chunk_bytes=max_chunk_bytes)
+            self.assertTrue(np.array_equal(maps['event_count'], expected))
+
+    def test_pixelwise_invalid_input(self):
+        self.assertIsNone(analysis_processor.detect_events_pixelwise(self.stack[0], self.fps))
+        self.assertIsNone(analysis_processor.detect_events_pixelwise(self.stack, 0, threshold_value=1.0))
+        with self.assertRaises(ValueError):
+            analysis_processor.detect_events_pixelwise(self.stack, self.fps, method='threshold')
+        with self.assertRaises(ValueError):
+            analysis_processor.detect_events_pixelwise(self.stack, self.fps, method='dog', sigma1=3.0, sigma2=1.0)
+        with self.assertRaises(ValueError):
+            analysis_processor.detect_events_pixelwise(self.stack, self.fps, method='median')
+        # Progress is reported per block; returning False cancels
+        reports = []
+        maps = analysis_processor.detect_events_pixelwise(
+            self.stack, self.fps, threshold_value=60.0, max_chunk_bytes=300 * 8 * 4 * 40,
+            progress_callback=lambda done, total, _: reports.append((done, total)) or len(reports) < 2)
+        self.assertIsNone(maps)
+        self.assertEqual(reports, [(34, 204), (68, 204)])
+        maps = analysis_processor.detect_events_pixelwise(self.stack[:4], self.fps, method='dog', sigma1=1.0, sigma2=3.0)
+        self.assertFalse(maps['event_count'].any()) # Too short for the DoG kernels
+
+    def test_compute_baseline_matches_per_trace_filters(self):
+        from scipy.ndimage import percentile_filter, minimum_filter1d, maximum_filter1d, gaussian_filter1d
+        traces = np.random.default_rng(1).normal(100, 5, (6, 400))
+        for window in (1, 16, 101, 399):
+            baseline = analysis_processor.compute_baseline(traces, window, 'percentile', percentile=8.0)
+            expected = np.stack([percentile_filter(trace, 8.0, size=window) for trace in traces])
+            self.assertTrue(np.array_equal(baseline, expected), msg=window)
+        minimum = analysis_processor.compute_baseline(traces, 31, 'minimum')
+        self.assertTrue(np.array_equal(minimum, np.stack([minimum_filter1d(trace, 31) for trace in traces])))
+        maximin = analysis_processor.compute_baseline(traces, 31, 'maximin', smooth_sigma=2.0)
+        expected = [maximum_filter1d(minimum_filter1d(gaussian_filter1d(trace, 2.0), 31), 31) for trace in traces]
+        self.assertTrue(np.allclose(maximin, np.stack(expected)))
+        # A single trace keeps its shape
+        single = analysis_processor.compute_baseline(traces[2], 101)
+        self.assertEqual(single.shape, (400,))
+        self.assertTrue(np.array_equal(single, percentile_filter(traces[2], 8.0, size=101)))
+
+    def test_compute_dff_removes_drift(self):
+        frames = np.arange(2000)
+        rng = np.random.default_rng(2)
+        transients = np.zeros(2000)
+        for start in range(100, 2000, 250):
+            transients[start:start + 10] = 0.5
+        # Photobleaching: on the raw trace a fixed threshold reports the bright start as one long "event"
+        baseline = 1000 * np.exp(-frames / 2000)
+        traces = np.stack([baseline * (1 + transients), 2 * baseline]) + rng.normal(0, 2, (2, 2000))
+        raw_events = analysis_processor.detect_events_threshold(traces[0], self.fps, 1, threshold_value=800)
+        self.assertGreater(raw_events[0].end_frame - raw_events[0].start_frame, 300)
+
+        for method in analysis_processor.BASELINE_METHODS:
+            dff = analysis_processor.compute_dff(traces, 200, method=method, percentile=10.0, smooth_sigma=1.0)
+            self.assertEqual(dff.shape, traces.shape)
+            events = analysis_processor.detect_events_threshold(dff[0], self.fps, 1, threshold_value=0.25,
+                                                                min_duration_frames=3)
+            self.assertEqual(len(events), 8, msg=method)
+            # Without transients ΔF/F stays near 0; the low-percentile/minimum baselines trail the
+            # decay within a window by a few percent
+            self.assertLess(np.abs(np.median(dff[1])), 0.06, msg=method)
+
+    def test_compute_dff_invalid_input(self):
+        traces = np.ones((2, 50))
+        with self.assertRaises(ValueError):
+            analysis_processor.compute_dff(traces, 10, method='mean')
+        with self.assertRaises(ValueError):
+            analysis_processor.compute_dff(traces, 0)
+        with self.assertRaises(ValueError):
+            analysis_processor.compute_dff(traces, 10, percentile=101)
+        traces[1] = 0 # No positive baseline: ΔF/F is 0 rather than inf/NaN
+        dff = analysis_processor.compute_dff(traces, 10)
+        self.assertTrue(np.array_equal(dff, np.zeros((2, 50))))
+
+
+if __name__ == '__main__':
+    unittest.main()
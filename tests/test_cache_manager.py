@@ -0,0 +1,95 @@
+# TransiScope/tests/test_cache_manager.py
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from TransiScope import cache_manager
+
+
+class TestCacheManager(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="transiscope_cache_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+    def test_chunked_stack_round_trip(self):
+        stack = np.random.randint(0, 65535, (45, 70, 90), dtype=np.uint16)
+        entry_dir = os.path.join(self.cache_dir, "entry")
+        self.assertTrue(cache_manager.write_chunked_stack(stack, entry_dir, chunks=(8, 32, 40)))
+
+        chunked = cache_manager.ChunkedStack(entry_dir)
+        self.assertEqual(chunked.shape, stack.shape)
+        self.assertEqual(chunked.dtype, stack.dtype)
+        # Time slices, ROI-style slabs crossing chunk borders, steps, fancy and empty indices
+        for key in (np.s_[3], np.s_[-1], np.s_[:, 31:33, 39:41], np.s_[5:30:3, 10:50, ::7],
+                    np.s_[..., 5], np.s_[[1, 40, 3]], np.s_[::-2, 3], np.s_[10:5]):
+            self.assertTrue(np.array_equal(chunked[key], stack[key]), msg=str(key))
+        # Reversed slices on several axes, mixed with integer arrays and integers
+        for key in (np.s_[::-1, ::-1], np.s_[[1, 3], ::-1], np.s_[40:2:-3, ::-5, 60:10:-7],
+                    np.s_[[4, 2], [60, 10]], np.s_[[4, 2], ::-1, [60, 10]], np.s_[::-1, 7, [3, 0, 80]]):
+            self.assertTrue(np.array_equal(chunked[key], stack[key]), msg=str(key))
+        self.assertTrue(np.array_equal(np.asarray(chunked), stack))
+
+    def test_incomplete_entry_is_a_miss(self):
+        entry_dir = os.path.join(self.cache_dir, "partial")
+        os.makedirs(entry_dir)
+        cache = cache_manager.StackCache(self.cache_dir)
+        self.assertEqual(cache.open("partial"), (None, None))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.entries(), [])
+        self.assertFalse(cache_manager.write_chunked_stack(np.zeros((4, 4)), entry_dir))
+
+    def test_stack_cache_lru_eviction(self):
+        stack = np.random.randint(0, 65535, (16, 32, 32), dtype=np.uint16) # Incompressible
+        cache = cache_manager.StackCache(self.cache_dir, max_bytes=10 ** 9)
+        for key in ("a", "b", "c"):
+            self.assertTrue(cache.store(key, stack, {"file_path": key}))
+        entry_bytes = cache.entries()[0]["nbytes"]
+        self.assertEqual(cache.total_bytes(), 3 * entry_bytes)
+
+        # Make "a" the most recently used; "b" is then the LRU entry
+        for offset, key in enumerate(("b", "c", "a")):
+            manifest = os.path.join(self.cache_dir, key, cache_manager.MANIFEST_NAME)
+            os.utime(manifest, (1000 + offset, 1000 + offset))
+        opened, metadata = cache.open("a")
+        self.assertTrue(np.array_equal(opened[:], stack))
+        self.assertEqual(metadata, {"file_path": "a"})
+        self.assertEqual(cache.hits, 1)
+
+        freed = cache.prune(max_bytes=2 * entry_bytes)
+        self.assertEqual(freed, entry_bytes)
+        self.assertEqual(sorted(entry["key"] for entry in cache.entries()), ["a", "c"])
+
+        # A store over budget keeps the new entry and evicts older ones (none is open any more)
+        del opened
+        cache.max_bytes = entry_bytes
+        self.assertTrue(cache.store("d", stack, {}))
+        self.assertEqual([entry["key"] for entry in cache.entries()], ["d"])
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.startswith(".")], [])
+
+        remaining = cache.total_bytes()
+        self.assertEqual(cache.clear(), remaining)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_open_entries_are_not_evicted(self):
+        stack = np.random.randint(0, 65535, (16, 32, 32), dtype=np.uint16)
+        cache = cache_manager.StackCache(self.cache_dir, max_bytes=10 ** 9)
+        self.assertTrue(cache.store("a", stack, {}))
+        opened, _ = cache.open("a") # E.g. the stack shown in the viewer
+        entry_bytes = cache.total_bytes()
+
+        # Storing past the cap evicts around the open entry
+        cache.max_bytes = entry_bytes
+        for key in ("b", "c"):
+            self.assertTrue(cache.store(key, stack, {}))
+        self.assertEqual(sorted(entry["key"] for entry in cache.entries()), ["a", "c"])
+        self.assertTrue(np.array_equal(opened[:, 5:20, 30], stack[:, 5:20, 30])) # Chunks are still readable
+
+        # Once released, it is evicted like any other entry
+        del opened
+        self.assertEqual(cache.prune(), entry_bytes)
+        self.assertEqual([entry["key"] for entry in cache.entries()], ["c"])
@@ -1,8 +1,10 @@
 # TransiScope/tests/test_io_operations.py
 import unittest
 import os
+import shutil
 import numpy as np
 from TransiScope import io_operations # Adjusted import
+from TransiScope import cache_manager
 # You'll need a sample .avi file for testing. Place it in e.g., tests/data/
 # For now, many tests will be placeholders or require mocking.
 
@@ -80,6 +82,28 @@ class TestIOOperations(unittest.TestCase):
 
         self.assertIsNone(io_operations.convert_to_greyscale_stack([]))
 
+    def test_convert_to_greyscale_stack_chunked_into_buffer(self):
+        import cv2
+        colour_stack = np.random.randint(0, 256, (37, 12, 10, 3), dtype=np.uint8)
+        expected = np.array([cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in colour_stack])
+
+        # Stacked input, several chunks across the thread pool
+        grey_stack = io_operations.convert_to_greyscale_stack(colour_stack, chunk_size=8, max_workers=3)
+        self.assertTrue(np.array_equal(grey_stack, expected))
+
+        # Memory-mapped input written out-of-core into a caller-supplied memmap
+        source_path = os.path.join(self.test_output_dir, "colour.npy")
+        out_path = os.path.join(self.test_output_dir, "grey.npy")
+        np.save(source_path, colour_stack)
+        source = np.load(source_path, mmap_mode='r')
+        out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.uint8, shape=(37, 12, 10))
+        result = io_operations.convert_to_greyscale_stack(source, out=out, chunk_size=5)
+        self.assertIs(result, out)
+        self.assertTrue(np.array_equal(out, expected))
+        del source, out, result
+
+        self.assertIsNone(io_operations.convert_to_greyscale_stack(colour_stack, out=np.empty((2, 12, 10), np.uint8)))
+
 
     def test_save_to_multitiff(self):
         frames_stack = np.random.randint(0, 255, (5, 20, 20), dtype=np.uint8) # T, H, W
@@ -107,6 +131,365 @@ class TestIOOperations(unittest.TestCase):
         
         self.assertFalse(io_operations.save_to_multitiff(None, "dummy.tif"))
 
+    def test_save_to_multitiff_streaming(self):
+        import tifffile
+        frames_stack = np.random.randint(0, 65535, (7, 16, 18), dtype=np.uint16)
+        output_path = os.path.join(self.test_output_dir, "streamed.tif")
+
+        # A generator of single frames and 2-frame chunks, compressed, as BigTIFF on request
+        def frame_source():
+            yield frames_stack[0]
+            for t in range(1, 7, 2):
+                yield frames_stack[t:t + 2]
+        self.assertTrue(io_operations.save_to_multitiff(frame_source(), output_path, {"fps": 4.0}, compression='zlib',
+                                                        bigtiff=True))
+        with tifffile.TiffFile(output_path) as tif:
+            self.assertTrue(tif.is_bigtiff)
+            self.assertEqual(tif.imagej_metadata['images'], 7)
+            self.assertAlmostEqual(tif.imagej_metadata['finterval'], 0.25)
+            self.assertTrue(np.array_equal(tif.asarray(), frames_stack))
+            self.assertNotEqual(tif.pages[0].compression, 1)
+        loaded, metadata = io_operations.load_multitiff(output_path)
+        self.assertEqual(metadata['fps'], 4.0)
+
+        # Without bigtiff, iterators switch to BigTIFF only when frame size x frame_count nears the limit
+        from unittest import mock
+        with mock.patch.object(io_operations, '_BIGTIFF_THRESHOLD', 7 * frames_stack[0].nbytes - 1):
+            for frame_count, expect_bigtiff in ((7, True), (6, False), (None, False)):
+                self.assertTrue(io_operations.save_to_multitiff(frame_source(), output_path,
+                                                                {"fps": 4.0, "frame_count": frame_count}))
+                with tifffile.TiffFile(output_path) as tif:
+                    self.assertEqual(tif.is_bigtiff, expect_bigtiff, msg=frame_count)
+
+        # AVI -> TIFF in constant memory, straight from the colour frame iterator
+        avi_path = self._write_test_avi("streamed.avi", 5)
+        colour_path = os.path.join(self.test_output_dir, "streamed_colour.tif")
+        self.assertTrue(io_operations.save_to_multitiff(io_operations.iter_colour_frames(avi_path), colour_path, {"fps": 5.0}))
+        with tifffile.TiffFile(colour_path) as tif:
+            self.assertFalse(tif.is_bigtiff) # Small streamed exports stay classic TIFF
+            self.assertEqual(tif.series[0].shape, (5, 24, 32, 3))
+            self.assertTrue(np.array_equal(tif.asarray(), np.stack(list(io_operations.iter_colour_frames(avi_path)))))
+
+        # dtypes ImageJ cannot open keep their frame rate in a shaped description
+        float_stack = np.random.rand(6, 8, 9)
+        self.assertTrue(io_operations.save_to_multitiff(float_stack, output_path, {"fps": 2.0}, chunk_size=4))
+        loaded, metadata = io_operations.load_multitiff(output_path)
+        self.assertTrue(np.array_equal(loaded, float_stack))
+        self.assertEqual(metadata['fps'], 2.0)
+
+        # Uncompressed exports are one contiguous series: reopened lazily they are memory-mapped
+        for source, expected in ((frame_source(), frames_stack), (float_stack, float_stack)):
+            self.assertTrue(io_operations.save_to_multitiff(source, output_path, {"fps": 4.0}, chunk_size=4))
+            lazy_stack, metadata = io_operations.load_multitiff(output_path, lazy=True)
+            self.assertIsInstance(lazy_stack, np.memmap)
+            self.assertTrue(np.array_equal(lazy_stack, expected))
+            self.assertEqual(metadata['fps'], 4.0)
+            del lazy_stack
+
+        self.assertFalse(io_operations.save_to_multitiff(iter([frames_stack[0], float_stack[0]]), output_path))
+        self.assertFalse(io_operations.save_to_multitiff(iter([]), output_path))
+
+    def test_load_file_progress_and_cancel(self):
+        import tifffile
+        avi_path = self._write_test_avi("progress.avi", 70)
+        reports = []
+        def record(done, total, partial):
+            reports.append((done, total, partial.shape))
+            return True
+        stack, _ = io_operations.load_file(avi_path, greyscale=True, progress_callback=record)
+        self.assertEqual([done for done, _, _ in reports], [32, 64, 70])
+        self.assertEqual(reports[0][2], (32, 24, 32)) # Preview of the frames decoded so far
+        self.assertEqual(reports[-1][:2], (70, 70))
+
+        # Returning False cancels the load
+        self.assertEqual(io_operations.load_file(avi_path, greyscale=True, progress_callback=lambda *args: False), (None, None))
+
+        # Colour TIFF loaded as greyscale: decoding and conversion are the two halves of the load
+        colour_stack = np.random.randint(0, 255, (70, 10, 12, 3), dtype=np.uint8)
+        tiff_path = os.path.join(self.test_output_dir, "progress.tif")
+        tifffile.imwrite(tiff_path, colour_stack, photometric='rgb')
+        reports.clear()
+        stack, _ = io_operations.load_file(tiff_path, greyscale=True, progress_callback=record)
+        self.assertEqual(stack.shape, (70, 10, 12))
+        self.assertEqual([(done, total) for done, total, _ in reports], [(64, 140), (70, 140), (140, 140)])
+        self.assertEqual(reports[0][2], (64, 10, 12, 3))
+        self.assertEqual(io_operations.load_multitiff(tiff_path, progress_callback=lambda *args: False), (None, None))
+
+    def test_probe_file_and_directory(self):
+        import tifffile
+        probe_dir = os.path.join(self.test_output_dir, "probe")
+        os.makedirs(probe_dir, exist_ok=True)
+        try:
+            imagej_path = os.path.join(probe_dir, "imagej.tif")
+            io_operations.save_to_multitiff(np.zeros((6, 9, 11), dtype=np.uint16), imagej_path, {"fps": 8.0})
+            plain_path = os.path.join(probe_dir, "plain.tiff")
+            tifffile.imwrite(plain_path, np.zeros((5, 9, 11, 3), dtype=np.uint8), photometric='rgb')
+            avi_path = self._write_test_avi(os.path.join("probe", "clip.avi"), 7)
+            with open(os.path.join(probe_dir, "notes.txt"), 'w') as f:
+                f.write("not a recording")
+            with open(os.path.join(probe_dir, "broken.tif"), 'w') as f:
+                f.write("not a tiff")
+
+            keys = ("fps", "frame_count", "height", "width", "original_format")
+            for path in (imagej_path, avi_path):
+                probed = io_operations.probe_file(path)
+                _, loaded = io_operations.load_file(path, greyscale=True)
+                self.assertEqual({k: probed[k] for k in keys}, {k: loaded[k] for k in keys}, msg=path)
+            self.assertEqual(io_operations.probe_file(imagej_path)["dtype"], "uint16")
+            plain = io_operations.probe_file(plain_path, fps=12.0)
+            self.assertEqual((plain["frame_count"], plain["channels"], plain["fps"]), (5, 3, 12.0))
+            self.assertIsNone(io_operations.probe_file(os.path.join(probe_dir, "notes.txt")))
+
+            catalogue = io_operations.probe_directory(probe_dir, max_workers=2)
+            self.assertEqual(list(catalogue), sorted([avi_path, imagej_path, plain_path]))
+        finally:
+            shutil.rmtree(probe_dir, ignore_errors=True)
+
+    def test_iter_load_files_prefetch(self):
+        import time
+        from unittest import mock
+        paths = []
+        for i in range(4):
+            path = os.path.join(self.test_output_dir, f"batch_{i}.tif")
+            io_operations.save_to_multitiff(np.full((5, 8, 8), i, dtype=np.uint8), path)
+            paths.append(path)
+        paths.insert(2, os.path.join(self.test_output_dir, "missing.tif"))
+
+        results = list(io_operations.iter_load_files(paths, prefetch=2, greyscale=True))
+        self.assertEqual([path for path, _, _ in results], paths)
+        self.assertIsNone(results[2][1]) # A failed file does not stop the batch
+        self.assertTrue(all((results[i][1] == value).all() for i, value in ((0, 0), (1, 1), (3, 2), (4, 3))))
+
+        # With a 1-byte cap only one file is decoded ahead, whatever the prefetch depth
+        with mock.patch.object(io_operations, 'load_file', wraps=io_operations.load_file) as load_file:
+            batch = io_operations.iter_load_files(paths[:2] + paths[3:], prefetch=3, max_prefetch_bytes=1)
+            next(batch)
+            time.sleep(0.2)
+            self.assertEqual(load_file.call_count, 2)
+            batch.close() # Stops the background thread
+            self.assertEqual(load_file.call_count, 2)
+
+    def test_export_events_to_csv(self):
+        import csv
+        from TransiScope.analysis_processor import Event
+        events = [Event(0.1 / 3, 1.0, 1, 30, "dog", 1, {"prominence": 12.345678901}),
+                  Event(2.0, 2.5, 60, 75, "threshold", 2, {"threshold_value": np.float64(101.25)})]
+        stats = {1: {'rate': 1.2345678e-5, 'se': 3e-6}}
+        output_path = os.path.join(self.test_output_dir, "events.csv")
+        self.assertTrue(io_operations.export_events_to_csv(output_path, events, stats, "2024-01-01 12:00:00"))
+
+        with open(output_path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["Analysis Run At: 2024-01-01 12:00:00"])
+        self.assertEqual(rows[1], io_operations.EVENT_CSV_HEADERS + ["prominence", "threshold_value"])
+        self.assertEqual(float(rows[2][2]), 0.1 / 3) # Full precision round trip
+        self.assertEqual(rows[2][5:7], ["1.2345678e-05", "3e-06"])
+        self.assertEqual(rows[2][9:], ["12.345678901", ""])
+        self.assertEqual(rows[3][5:], ["", "", "60", "75", "", "101.25"]) # No stats for ROI 2
+
+    def test_export_results_to_npz(self):
+        from TransiScope.analysis_processor import Event
+        events = [Event(0.5, 1.0, 5, 10, "dog", 1, {"prominence": 3.5}),
+                  Event(2.0, 2.5, 20, 25, "threshold", 2, {"threshold_value": 101.25, "note": "otsu"})]
+        stats = {1: {'rate': 1e-5, 'se': 2e-6}, 2: {'rate': 0.0, 'se': 0.0}}
+        traces = {2: np.linspace(0, 1, 30), 1: np.arange(30.0)}
+        params = {"fps": np.float64(10.0), "dog_sigmas": (1.0, 2.0)}
+        output_path = os.path.join(self.test_output_dir, "results")
+        self.assertTrue(io_operations.export_results_to_npz(output_path, events, stats, traces, params, "2024-01-01 12:00:00"))
+
+        results = io_operations.load_results_npz(output_path + ".npz")
+        self.assertIsInstance(results["events"]["start_time"], np.memmap)
+        self.assertEqual(results["events"]["event_type"].tolist(), ["dog", "threshold"])
+        self.assertEqual(results["events"]["end_frame"].tolist(), [10, 25])
+        self.assertTrue(np.array_equal(results["event_properties"]["prominence"], [3.5, np.nan], equal_nan=True))
+        self.assertEqual(results["event_properties"]["note"].tolist(), ["", "otsu"])
+        self.assertEqual(results["roi_summary_stats"]["rate"].tolist(), [1e-5, 0.0])
+        self.assertEqual(results["traces"]["roi_id"].tolist(), [1, 2])
+        self.assertTrue(np.array_equal(results["traces"]["data"][1], traces[2]))
+        self.assertEqual(results["params"], {"fps": 10.0, "dog_sigmas": [1.0, 2.0]})
+        self.assertEqual(results["analysis_timestamp"], "2024-01-01 12:00:00")
+
+        in_memory = io_operations.load_results_npz(output_path + ".npz", mmap=False)
+        self.assertNotIsInstance(in_memory["events"]["start_time"], np.memmap)
+        self.assertTrue(np.array_equal(in_memory["traces"]["data"], results["traces"]["data"]))
+
+        self.assertIsNone(results["trace_statistics"])
+
+        trace_statistics = {}
+        for roi_id in (2, 1):
+            trace_statistics[roi_id] = np.zeros(30, dtype=[('mean', np.float64), ('median', np.float64)])
+            trace_statistics[roi_id]['median'] = np.arange(30.0) * roi_id
+        self.assertTrue(io_operations.export_results_to_npz(output_path, events, stats, traces, params,
+                                                            trace_statistics=trace_statistics))
+        loaded_statistics = io_operations.load_results_npz(output_path + ".npz")["trace_statistics"]
+        self.assertEqual(loaded_statistics["roi_id"].tolist(), [1, 2])
+        self.assertEqual(sorted(loaded_statistics), ["mean", "median", "roi_id"])
+        self.assertTrue(np.array_equal(loaded_statistics["median"][1], np.arange(30.0) * 2))
+
+        # No events: the columns are empty rather than missing
+        self.assertTrue(io_operations.export_results_to_npz(output_path + ".npz", [], {}))
+        self.assertEqual(len(io_operations.load_results_npz(output_path + ".npz")["events"]["roi_id"]), 0)
+
+    def test_load_multitiff_lazy(self):
+        import tifffile
+        frames_stack = np.random.randint(0, 255, (6, 12, 16), dtype=np.uint8)
+        plain_path = os.path.join(self.test_output_dir, "lazy_plain.tif")
+        compressed_path = os.path.join(self.test_output_dir, "lazy_zlib.tif")
+        tifffile.imwrite(plain_path, frames_stack, imagej=True, metadata={'finterval': 0.1})
+        tifffile.imwrite(compressed_path, frames_stack, compression='zlib')
+
+        stack, metadata = io_operations.load_multitiff(plain_path, lazy=True)
+        self.assertIsInstance(stack, np.memmap) # Uncompressed files are memory-mapped
+        self.assertEqual(stack.shape, (6, 12, 16))
+        self.assertAlmostEqual(metadata['fps'], 10.0)
+        self.assertTrue(np.array_equal(stack[2:5, 3:7, 4:9], frames_stack[2:5, 3:7, 4:9]))
+        del stack
+
+        stack, metadata = io_operations.load_multitiff(compressed_path, lazy=True)
+        self.assertIsInstance(stack, io_operations.LazyTiffStack)
+        self.assertEqual(stack.shape, (6, 12, 16))
+        self.assertEqual(metadata['frame_count'], 6)
+        self.assertTrue(np.array_equal(stack[-1], frames_stack[-1]))
+        self.assertTrue(np.array_equal(stack[1:4, 3:7, 4:9], frames_stack[1:4, 3:7, 4:9]))
+        self.assertTrue(np.array_equal(np.asarray(stack), frames_stack))
+        # Greyscale lazy stacks pass through conversion without being read
+        self.assertIs(io_operations.convert_to_greyscale_stack(stack), stack)
+        stack.close()
+
+        # Pages stored as separate series: the first series is a single page, so nothing is mapped
+        series_path = os.path.join(self.test_output_dir, "lazy_series.tif")
+        with tifffile.TiffWriter(series_path) as writer:
+            for frame in frames_stack:
+                writer.write(frame, contiguous=False)
+        stack, metadata = io_operations.load_multitiff(series_path, lazy=True)
+        self.assertIsInstance(stack, io_operations.LazyTiffStack)
+        self.assertEqual(stack.shape, (6, 12, 16))
+        self.assertTrue(np.array_equal(stack[::2, 2:9], frames_stack[::2, 2:9]))
+        stack.close()
+
+    def test_load_multitiff_parallel_compressed(self):
+        import tifffile
+        frames_stack = np.random.randint(0, 4096, (9, 16, 20), dtype=np.uint16)
+        compressed_path = os.path.join(self.test_output_dir, "parallel_zlib.tif")
+        tifffile.imwrite(compressed_path, frames_stack, compression='zlib')
+
+        for workers in (1, 3):
+            frames, metadata = io_operations.load_multitiff(compressed_path, max_workers=workers)
+            self.assertIsInstance(frames, np.ndarray)
+            self.assertTrue(frames.flags.c_contiguous)
+            self.assertTrue(np.array_equal(frames, frames_stack))
+            self.assertEqual(metadata['frame_count'], 9)
+
+    def _write_test_avi(self, file_name, num_frames=7, height=24, width=32, fps=5):
+        import cv2
+        path = os.path.join(self.test_output_dir, file_name)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+        if not writer.isOpened():
+            self.skipTest("OpenCV cannot write MJPG AVI files in this environment.")
+        rng = np.random.default_rng(0)
+        for _ in range(num_frames):
+            writer.write(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+        writer.release()
+        return path
+
+    def test_load_avi_greyscale_streaming(self):
+        import cv2
+        avi_path = self._write_test_avi("stream.avi")
+        colour_frames, _ = io_operations.load_avi(avi_path)
+        grey_stack, metadata = io_operations.load_avi(avi_path, greyscale=True)
+        self.assertIsInstance(grey_stack, np.ndarray)
+        self.assertEqual(grey_stack.shape, (7, 24, 32))
+        self.assertEqual(metadata['frame_count'], 7)
+        self.assertTrue(np.array_equal(grey_stack, io_operations.convert_to_greyscale_stack(colour_frames)))
+
+        # An under-reported frame count grows the buffer instead of dropping frames
+        cap = cv2.VideoCapture(avi_path)
+        grown_stack = io_operations._decode_avi_to_greyscale(cap, expected_frames=2)
+        cap.release()
+        self.assertTrue(np.array_equal(grown_stack, grey_stack))
+
+    def test_load_file_greyscale_and_colour_reopen(self):
+        avi_path = self._write_test_avi("greyscale_only.avi", num_frames=4)
+        grey_stack, metadata = io_operations.load_file(avi_path, greyscale=True)
+        self.assertEqual(grey_stack.shape, (4, 24, 32))
+        self.assertEqual(metadata['original_format'], "AVI")
+
+        colour_frames = list(io_operations.iter_colour_frames(avi_path))
+        self.assertEqual(len(colour_frames), 4)
+        self.assertEqual(colour_frames[0].shape, (24, 32, 3))
+        self.assertTrue(np.array_equal(io_operations.convert_to_greyscale_stack(colour_frames), grey_stack))
+
+    def test_load_file_frame_range_and_crop(self):
+        import tifffile
+        frames_stack = np.random.randint(0, 255, (20, 30, 40), dtype=np.uint8)
+        plain_path = os.path.join(self.test_output_dir, "subset_plain.tif")
+        compressed_path = os.path.join(self.test_output_dir, "subset_zlib.tif")
+        tifffile.imwrite(plain_path, frames_stack, imagej=True, metadata={'finterval': 0.1})
+        tifffile.imwrite(compressed_path, frames_stack, compression='zlib')
+        expected = frames_stack[3:17:4, 5:25, 10:30]
+
+        for path in (plain_path, compressed_path):
+            for lazy in (False, True):
+                stack, metadata = io_operations.load_file(path, lazy=lazy, start=3, stop=17, step=4, crop=(5, 25, 10, 30))
+                self.assertTrue(np.array_equal(np.asarray(stack), expected))
+                self.assertEqual((metadata['frame_count'], metadata['height'], metadata['width']), (4, 20, 20))
+                self.assertEqual(metadata['source_frame_count'], 20)
+                self.assertEqual(metadata['crop'], (5, 25, 10, 30))
+                if hasattr(stack, 'close'):
+                    stack.close()
+        self.assertAlmostEqual(metadata['fps'], metadata['source_fps'] / 4)
+
+        avi_path = self._write_test_avi("subset.avi", num_frames=12)
+        full_stack, _ = io_operations.load_avi(avi_path, greyscale=True)
+        grey_stack, metadata = io_operations.load_avi(avi_path, greyscale=True, start=2, stop=11, step=3, crop=(4, 20, 5, 30))
+        self.assertTrue(np.array_equal(grey_stack, full_stack[2:11:3, 4:20, 5:30]))
+        self.assertAlmostEqual(metadata['fps'], 5 / 3)
+        colour_frames, _ = io_operations.load_avi(avi_path, start=2, stop=11, step=3, crop=(4, 20, 5, 30))
+        self.assertEqual(len(colour_frames), 3)
+        self.assertEqual(colour_frames[0].shape, (16, 25, 3))
+
+        self.assertEqual(io_operations.load_avi(avi_path, step=0), (None, None))
+        self.assertEqual(io_operations.load_multitiff(plain_path, crop=(50, 60, 0, 10)), (None, None))
+
+        # Negative start/stop count from the end, as in a slice
+        for lazy in (False, True):
+            stack, metadata = io_operations.load_multitiff(plain_path, lazy=lazy, start=-8, stop=-1, step=2)
+            self.assertTrue(np.array_equal(np.asarray(stack), frames_stack[-8:-1:2]), msg=lazy)
+            self.assertEqual(metadata['frame_count'], 4)
+            self.assertEqual(metadata['frame_range'][0], 12)
+            if hasattr(stack, 'close'):
+                stack.close()
+            stack, _ = io_operations.load_multitiff(plain_path, lazy=lazy, stop=-1)
+            self.assertTrue(np.array_equal(np.asarray(stack), frames_stack[:-1]), msg=lazy)
+            if hasattr(stack, 'close'):
+                stack.close()
+        grey_stack, metadata = io_operations.load_avi(avi_path, greyscale=True, start=-5, stop=-1)
+        self.assertTrue(np.array_equal(grey_stack, full_stack[-5:-1]))
+        self.assertEqual(metadata['frame_range'][0], 7)
+        self.assertEqual(len(io_operations.load_avi(avi_path, stop=-2)[0]), 10)
+
+    def test_load_file_decode_cache(self):
+        import tifffile
+        frames_stack = np.random.randint(0, 255, (10, 30, 40), dtype=np.uint8)
+        tiff_path = os.path.join(self.test_output_dir, "cached.tif")
+        tifffile.imwrite(tiff_path, frames_stack, imagej=True, metadata={'finterval': 0.1})
+        cache_dir = os.path.join(self.test_output_dir, "decode_cache")
+
+        try:
+            first_stack, first_metadata = io_operations.load_file(tiff_path, greyscale=True, cache_dir=cache_dir, crop=(2, 20, 0, 30))
+            self.assertIsInstance(first_stack, np.ndarray) # Miss: decoded normally, then cached
+            cached_stack, cached_metadata = io_operations.load_file(tiff_path, greyscale=True, cache_dir=cache_dir, crop=(2, 20, 0, 30))
+            self.assertIsInstance(cached_stack, cache_manager.ChunkedStack)
+            self.assertEqual(cached_metadata, first_metadata)
+            self.assertTrue(np.array_equal(cached_stack[:], frames_stack[:, 2:20, 0:30]))
+
+            # Different load options are a different entry
+            other_stack, _ = io_operations.load_file(tiff_path, greyscale=True, cache_dir=cache_dir)
+            self.assertIsInstance(other_stack, np.ndarray)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
 
 # Add similar placeholder test files:
 # tests/test_analysis_processor.py
@@ -0,0 +1,106 @@
+# TransiScope/tests/test_motion_correction.py
+import time
+import unittest
+import numpy as np
+from scipy.ndimage import gaussian_filter
+from TransiScope import motion_correction, roi_handler
+
+
+class TestMotionCorrection(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # A textured scene larger than the field of view, cropped at a drifting offset per frame
+        scene = gaussian_filter(rng.normal(0, 1, (96, 112)), 2.0) * 400 + 1000
+        self.margin = 8
+        self.shifts = np.zeros((40, 2), dtype=int)
+        self.shifts[10:] = (3, -2)
+        self.shifts[25:] = (-5, 4)
+        self.shifts[33] = (1, 6)
+        m = self.margin
+        self.stack = np.stack([
+            scene[m - dy:m - dy + 80, m - dx:m - dx + 96] for dy, dx in self.shifts
+        ]).astype(np.uint16) # Frame t shows the scene moved by +shifts[t]
+        self.reference = self.stack[0].astype(float)
+
+    def test_estimate_shifts_recovers_drift(self):
+        for chunk_size, max_workers in ((64, None), (7, 3), (1, 1)):
+            shifts = motion_correction.estimate_shifts(self.stack, self.reference, chunk_size=chunk_size,
+                                                       max_workers=max_workers)
+            self.assertEqual(shifts.shape, (40, 2))
+            self.assertTrue(np.allclose(shifts, self.shifts, atol=0.25), msg=(chunk_size, max_workers))
+        # Progress is reported per chunk, in order; returning False cancels
+        reports = []
+        self.assertIsNone(motion_correction.estimate_shifts(
+            self.stack, self.reference, chunk_size=16, max_workers=2,
+            progress_callback=lambda done, total, _: reports.append((done, total)) or done < 32))
+        self.assertEqual(reports, [(16, 40), (32, 40)])
+        # Only a sliding window of chunks is read ahead of the one being collected
+        reads = []
+
+        class CountingStack:
+            ndim, shape = self.stack.ndim, self.stack.shape
+
+            def __len__(_):
+                return len(self.stack)
+
+            def __getitem__(_, key):
+                reads.append(key)
+                if key.start == 0:
+                    time.sleep(0.2) # The other worker would read ahead meanwhile if nothing held it back
+                return self.stack[key]
+
+        reads_at_cancel = []
+        motion_correction.estimate_shifts(CountingStack(), self.reference, chunk_size=1, max_workers=2,
+                                          progress_callback=lambda *_: reads_at_cancel.append(len(reads)) and False)
+        self.assertLessEqual(reads_at_cancel[0], 3)
+        # Shifts beyond max_shift are not searched
+        limited = motion_correction.estimate_shifts(self.stack, self.reference, max_shift=4, subpixel=False)
+        self.assertTrue(np.all(np.abs(limited) <= 4))
+        self.assertTrue(np.array_equal(limited[:25], self.shifts[:25]))
+
+    def test_corrected_stack_matches_shifted_frames(self):
+        corrected = motion_correction.MotionCorrectedStack(self.stack, self.shifts)
+        self.assertEqual(corrected.shape, self.stack.shape)
+        self.assertEqual(corrected.dtype, self.stack.dtype)
+        expected = np.zeros_like(self.stack)
+        for t, (dy, dx) in enumerate(self.shifts):
+            shifted = np.roll(self.stack[t], (-dy, -dx), axis=(0, 1))
+            valid = np.zeros(self.stack.shape[1:], dtype=bool)
+            valid[max(0, -dy):80 - max(0, dy), max(0, -dx):96 - max(0, dx)] = True
+            expected[t][valid] = shifted[valid]
+        full = np.asarray(corrected)
+        self.assertTrue(np.array_equal(full, expected))
+        # Every frame is aligned with the reference wherever the scene was in view
+        m = self.margin
+        self.assertTrue(np.all(full[:, m:-m, m:-m] == self.stack[0, m:-m, m:-m]))
+        # Indexing matches numpy on the materialised stack
+        keys = [5, -1, slice(8, 30), slice(None, None, 3), slice(30, 5, -4), [3, 3, 27, 12],
+                (slice(9, 28), 40), (slice(None), slice(2, 70, 5), slice(90, 3, -7)), (33, ..., 0),
+                (np.array([0, 26, 39]), slice(75, 80), 50), (slice(None), [4, 0, 79])]
+        for key in keys:
+            self.assertTrue(np.array_equal(corrected[key], expected[key]), msg=key)
+
+    def test_trace_extraction_through_corrected_stack(self):
+        corrected = motion_correction.correct_motion(self.stack, self.reference, chunk_size=16)
+        self.assertIsInstance(corrected, motion_correction.MotionCorrectedStack)
+        self.assertTrue(np.allclose(corrected.shifts, self.shifts, atol=0.25))
+        roi = roi_handler.ROI(1, np.array([[20, 30], [20, 50], [40, 50], [40, 30]]), self.stack.shape, 0)
+        raw = roi_handler.extract_mean_intensity_traces([roi], self.stack)[0]
+        registered = roi_handler.extract_mean_intensity_traces([roi], corrected, chunk_size=8)[0]
+        # The scene under the ROI is static once registered; the raw trace follows the drift
+        self.assertTrue(np.allclose(registered, registered[0]))
+        self.assertGreater(np.ptp(raw), 1.0)
+
+    def test_invalid_input(self):
+        self.assertIsNone(motion_correction.estimate_shifts(self.stack[0]))
+        self.assertIsNone(motion_correction.estimate_shifts(self.stack, np.zeros((10, 10))))
+        self.assertIsNone(motion_correction.correct_motion(None))
+        with self.assertRaises(ValueError):
+            motion_correction.MotionCorrectedStack(self.stack[0], np.zeros((80, 2)))
+        with self.assertRaises(ValueError):
+            motion_correction.MotionCorrectedStack(self.stack, np.zeros((3, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
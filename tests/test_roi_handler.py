@@ -0,0 +1,265 @@
+# TransiScope/tests/test_roi_handler.py
+import unittest
+import os
+import tempfile
+import numpy as np
+from TransiScope import roi_handler
+
+
+class TestROIHandler(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.stack = rng.integers(0, 65535, (50, 40, 60), dtype=np.uint16) # T, H, W
+        self.manager = roi_handler.ROIManager(self.stack.shape)
+        self.manager.add_roi(np.array([[5, 5], [5, 20], [15, 20], [15, 5]]), 0) # Rectangle
+        self.manager.add_roi(np.array([[10, 30], [30, 55], [35, 35]]), 1) # Triangle
+        self.manager.add_roi(np.array([[20, 10], [20, 12], [22, 12], [22, 10]]), 2) # Small square
+
+
+    def test_bbox_local_mask(self):
+        from skimage.draw import polygon
+        roi = self.manager.get_roi(3)
+        self.assertEqual(roi.bbox, (20, 23, 10, 13))
+        self.assertEqual(roi.local_mask.shape, (3, 3))
+        self.assertEqual(roi.area_pixels, 9)
+
+        for roi in self.manager.get_all_rois():
+            expected = np.zeros((40, 60), dtype=bool)
+            expected[polygon(roi.vertices[:, 0], roi.vertices[:, 1], shape=(40, 60))] = True
+            self.assertTrue(np.array_equal(roi.mask, expected), msg=roi.id)
+            self.assertEqual(roi.area_pixels, expected.sum())
+
+        degenerate = roi_handler.ROI(9, np.array([[5.2, 5.2], [5.2, 5.4], [5.4, 5.3]]), self.stack.shape, 9)
+        self.assertEqual(degenerate.area_pixels, 0)
+        self.assertFalse(degenerate.mask.any())
+        self.assertFalse(degenerate.get_mean_intensity_trace(self.stack).any())
+
+    def test_get_mean_intensity_trace_chunked(self):
+        roi = self.manager.get_roi(2)
+        mask = roi.mask
+        expected = np.array([frame[mask].astype(np.float64).sum() / mask.sum() for frame in self.stack])
+        for chunk_size in (1, 7, 50, 1000):
+            roi.clear_trace_cache()
+            self.assertTrue(np.array_equal(roi.get_mean_intensity_trace(self.stack, chunk_size=chunk_size), expected))
+
+        # Sums stay exact where float32 or uint16 accumulation would not be
+        saturated = np.full((3, 40, 60), 65535, dtype=np.uint16)
+        self.assertTrue(np.all(roi.get_mean_intensity_trace(saturated) == 65535.0))
+        self.assertIsNone(roi.get_mean_intensity_trace(self.stack[0]))
+
+    def test_extract_mean_intensity_traces_matches_per_roi(self):
+        rois = self.manager.get_all_rois()
+        traces = roi_handler.extract_mean_intensity_traces(rois, self.stack, chunk_size=16)
+        self.assertEqual(traces.shape, (3, 50))
+        for roi, trace in zip(rois, traces):
+            roi.clear_trace_cache()
+            np.testing.assert_allclose(trace, roi.get_mean_intensity_trace(self.stack), rtol=1e-12)
+
+        # Works on a memmap and on an empty ROI list
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            memmapped = np.lib.format.open_memmap(os.path.join(tmp_dir, "stack.npy"), mode='w+',
+                                                  dtype=np.uint16, shape=self.stack.shape)
+            memmapped[:] = self.stack
+            np.testing.assert_allclose(roi_handler.extract_mean_intensity_traces(rois, memmapped), traces)
+            del memmapped
+        self.assertEqual(roi_handler.extract_mean_intensity_traces([], self.stack).shape, (0, 50))
+
+    def test_trace_memoisation(self):
+        roi = self.manager.get_roi(1)
+        trace = roi.get_mean_intensity_trace(self.stack)
+        self.assertIs(roi.get_mean_intensity_trace(self.stack), trace)
+        self.assertFalse(trace.flags.writeable)
+
+        # Another stack object, even with equal contents, is a cache miss
+        other_stack = self.stack.copy()
+        other_trace = roi.get_mean_intensity_trace(other_stack)
+        self.assertIsNot(other_trace, trace)
+        self.assertTrue(np.array_equal(other_trace, trace))
+
+        # Editing the vertices invalidates the cached trace
+        roi.set_area_physical(0.5)
+        version = roi.mask_version
+        roi.set_vertices(np.array([[0, 0], [0, 9], [9, 9], [9, 0]]))
+        self.assertEqual(roi.mask_version, version + 1)
+        self.assertEqual((roi.area_pixels, roi.area_sq_um), (100, 25.0))
+        edited = roi.get_mean_intensity_trace(other_stack)
+        self.assertTrue(np.array_equal(edited, self.stack[:, :10, :10].reshape(50, -1).mean(axis=1)))
+
+        # The multi-ROI engine reuses cached traces and caches the ones it extracts
+        rois = self.manager.get_all_rois()
+        traces = roi_handler.extract_mean_intensity_traces(rois, other_stack)
+        self.assertTrue(np.array_equal(traces[0], edited))
+        self.assertIs(rois[1].get_mean_intensity_trace(other_stack), rois[1]._cached_trace(other_stack))
+        np.testing.assert_allclose(rois[1].get_mean_intensity_trace(other_stack), traces[1])
+
+    def test_sync_shapes(self):
+        shapes = [roi.vertices.astype(float) for roi in self.manager.get_all_rois()]
+        self.assertEqual(self.manager.sync_shapes(shapes), ([], [], []))
+
+        # Add one shape, edit another in place
+        new_shape = np.array([[30.0, 40.0], [30.0, 50.0], [38.0, 50.0], [38.0, 40.0]])
+        edited = np.array([[0.0, 0.0], [0.0, 9.0], [9.0, 9.0], [9.0, 0.0]])
+        triangle = self.manager.get_roi(2)
+        old_version = triangle.mask_version
+        added, changed, removed = self.manager.sync_shapes([shapes[0], edited, shapes[2], new_shape])
+        self.assertEqual([roi.id for roi in added], [4])
+        self.assertEqual(changed, [triangle])
+        self.assertEqual(removed, [])
+        self.assertEqual(triangle.mask_version, old_version + 1)
+        self.assertEqual(triangle.area_pixels, 100)
+        self.assertIs(self.manager.get_roi_by_shape_index(3), added[0])
+
+        # Delete the first shape: the others shift down an index without being re-rasterised
+        added, changed, removed = self.manager.sync_shapes([edited, shapes[2], new_shape])
+        self.assertEqual(([roi.id for roi in removed], added, changed), ([1], [], []))
+        self.assertEqual([self.manager.get_roi_by_shape_index(i).id for i in range(3)], [2, 3, 4])
+        self.assertEqual(triangle.mask_version, old_version + 1)
+        self.assertEqual(sorted(self.manager.rois), [2, 3, 4])
+
+        self.manager.remove_roi(3)
+        self.assertIsNone(self.manager.get_roi_by_shape_index(1))
+        self.manager.clear()
+        self.assertEqual((self.manager.rois, self.manager.next_roi_id), ({}, 1))
+
+    def test_rasterize_polygons_matches_skimage(self):
+        rng = np.random.default_rng(1)
+        polygons = [rng.integers(-5, 65, (rng.integers(3, 9), 2)).astype(float) for _ in range(100)]
+        polygons += [rng.uniform(-5, 65, (rng.integers(3, 9), 2)) for _ in range(100)]
+        # A small batch budget exercises the batching as well
+        masks = roi_handler.rasterize_polygons(polygons, (40, 60), max_batch_pixels=3000)
+        self.assertEqual(len(masks), len(polygons))
+        for vertices, mask in zip(polygons, masks):
+            expected = roi_handler.ROI(1, vertices, self.stack.shape, 0)
+            batched = roi_handler.ROI(1, vertices, self.stack.shape, 0, mask=mask)
+            self.assertEqual(batched.bbox, expected.bbox)
+            self.assertTrue(np.array_equal(batched.mask, expected.mask))
+        self.assertEqual(roi_handler.rasterize_polygons([], (40, 60)), [])
+
+    def test_add_rois_grid(self):
+        vertices_list = roi_handler.grid_roi_vertices((40, 60), 8, gap=2)
+        self.assertEqual(len(vertices_list), 4 * 6)
+        manager = roi_handler.ROIManager(self.stack.shape)
+        rois = manager.add_rois(vertices_list + [np.array([1, 2, 3])])
+        self.assertEqual(len(rois), 24) # The malformed vertex array is skipped
+        self.assertEqual([roi.shape_index for roi in rois], list(range(24)))
+        self.assertTrue(all(roi.area_pixels == 64 for roi in rois))
+        self.assertEqual(rois[7].bbox, (10, 18, 10, 18))
+        self.assertIs(manager.get_roi_by_shape_index(23), rois[-1])
+        self.assertEqual(len(manager.add_rois(vertices_list[:2])), 2)
+        self.assertEqual(manager.get_all_rois()[-1].shape_index, 25)
+
+    def test_segment_blob_rois(self):
+        yy, xx = np.mgrid[:40, :60]
+        blobs = [(10, 12, 3), (25, 40, 5)]
+        stack = np.random.default_rng(2).normal(100, 1, (30, 40, 60))
+        for t in range(0, 30, 3): # Blobs flicker together, so they stand out in every projection
+            for cy, cx, radius in blobs:
+                stack[t][(yy - cy) ** 2 + (xx - cx) ** 2 <= radius ** 2] += 50
+
+        for method in ('max', 'std', 'correlation'):
+            projection = roi_handler.compute_projection(stack, method=method, chunk_size=7)
+            self.assertEqual(projection.shape, (40, 60))
+            vertices_list, masks = roi_handler.segment_blob_rois(projection, min_area=10)
+            self.assertEqual(len(vertices_list), 2, msg=method)
+            rois = roi_handler.ROIManager(stack.shape).add_rois(vertices_list, masks=masks)
+            for roi, (cy, cx, radius) in zip(sorted(rois, key=lambda r: r.bbox[0]), blobs):
+                self.assertTrue(roi.mask[cy, cx], msg=method)
+                self.assertGreater(roi.area_pixels, 0.5 * np.pi * radius ** 2)
+                self.assertLess(roi.area_pixels, 2 * np.pi * radius ** 2)
+                # The outline drawn in napari covers the segmented mask
+                outline = roi_handler.ROI(1, roi.vertices, stack.shape, 0).mask
+                self.assertGreater((outline & roi.mask).sum(), 0.9 * roi.area_pixels)
+
+        self.assertTrue(np.allclose(roi_handler.compute_projection(stack, 'std'), stack.std(axis=0)))
+        self.assertTrue(np.array_equal(roi_handler.compute_projection(stack, 'max'), stack.max(axis=0)))
+        self.assertIsNone(roi_handler.compute_projection(stack, 'median'))
+        self.assertIsNone(roi_handler.compute_projection(stack[0], 'max'))
+
+    def test_csv_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "rois.csv")
+            self.assertTrue(self.manager.export_rois_to_csv(file_path))
+            manager = roi_handler.ROIManager(self.stack.shape)
+            manager.add_roi(np.array([[0, 0], [0, 3], [3, 3]]), 0)
+            rois = manager.import_rois_from_csv(file_path)
+            self.assertEqual([roi.id for roi in rois], [2, 3, 4])
+            self.assertEqual([roi.shape_index for roi in rois], [1, 2, 3])
+            for original, imported in zip(self.manager.get_all_rois(), rois):
+                self.assertTrue(np.array_equal(imported.vertices, original.vertices))
+                self.assertTrue(np.array_equal(imported.mask, original.mask))
+                self.assertEqual(imported.creation_time, original.creation_time.replace(microsecond=0))
+
+            bad_path = os.path.join(tmp_dir, "bad.csv")
+            with open(bad_path, 'w') as f:
+                f.write("a,b\n1,2\n")
+            self.assertIsNone(manager.import_rois_from_csv(bad_path))
+            self.assertIsNone(manager.import_rois_from_csv(os.path.join(tmp_dir, "missing.csv")))
+
+    def test_npz_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "rois")
+            self.assertTrue(self.manager.export_rois_to_npz(file_path))
+            self.assertFalse(roi_handler.ROIManager(self.stack.shape).export_rois_to_npz(file_path))
+            # Same frame size: the stored masks are reused; another size: rasterised again
+            for shape in (self.stack.shape, (50, 30, 25)):
+                manager = roi_handler.ROIManager(shape)
+                rois = manager.import_rois_from_npz(file_path + ".npz", first_shape_index=5)
+                self.assertEqual([roi.shape_index for roi in rois], [5, 6, 7])
+                for original, imported in zip(self.manager.get_all_rois(), rois):
+                    self.assertTrue(np.array_equal(imported.vertices, original.vertices))
+                    self.assertEqual(imported.creation_time, original.creation_time)
+                    expected = roi_handler.ROI(1, original.vertices, shape, 0)
+                    self.assertEqual(imported.bbox, expected.bbox)
+                    self.assertTrue(np.array_equal(imported.mask, expected.mask))
+            self.assertIsNone(manager.import_rois_from_npz(os.path.join(tmp_dir, "missing.npz")))
+
+    def test_extract_intensity_statistics(self):
+        rois = self.manager.get_all_rois()
+        rois.append(roi_handler.ROI(9, np.array([[5.2, 5.2], [5.2, 5.4], [5.4, 5.3]]), self.stack.shape, 9)) # Empty
+        rois.append(roi_handler.ROI(10, np.array([[0, 0], [0, 1], [1, 1], [1, 0]]), self.stack.shape, 10)) # Even area
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stack_memmap = np.lib.format.open_memmap(os.path.join(tmp_dir, "stack.npy"), mode='w+',
+                                                     dtype=self.stack.dtype, shape=self.stack.shape)
+            stack_memmap[:] = self.stack
+            for stack in (self.stack, stack_memmap):
+                result = roi_handler.extract_intensity_statistics(rois, stack, chunk_size=7)
+                self.assertEqual(result.shape, (len(rois), 50))
+                self.assertEqual(result.dtype.names, roi_handler.TRACE_STATISTICS)
+                for i, roi in enumerate(rois):
+                    if roi.area_pixels == 0:
+                        self.assertFalse(any(result[name][i].any() for name in result.dtype.names))
+                        continue
+                    pixels = self.stack[:, roi.mask].astype(np.float64)
+                    self.assertTrue(np.allclose(result['mean'][i], pixels.mean(axis=1)))
+                    self.assertTrue(np.allclose(result['std'][i], pixels.std(axis=1)))
+                    self.assertTrue(np.array_equal(result['min'][i], pixels.min(axis=1)))
+                    self.assertTrue(np.array_equal(result['max'][i], pixels.max(axis=1)))
+                    self.assertTrue(np.array_equal(result['sum'][i], pixels.sum(axis=1)))
+                    self.assertTrue(np.array_equal(result['median'][i], np.median(pixels, axis=1)))
+            del stack_memmap
+
+        subset = roi_handler.extract_intensity_statistics(rois, self.stack, ('median', 'max', 'median'))
+        self.assertEqual(subset.dtype.names, ('median', 'max'))
+        self.assertTrue(np.array_equal(subset['median'], result['median']))
+        single = rois[0].get_intensity_statistics(self.stack, ('sum',))
+        self.assertTrue(np.array_equal(single['sum'], result['sum'][0]))
+        self.assertIsNone(roi_handler.extract_intensity_statistics(rois, self.stack, ('mode',)))
+
+        # Bright, low-variance pixels: E[x^2] - E[x]^2 would cancel to noise (or a negative variance)
+        bright = 1e8 + np.random.default_rng(3).normal(0, 0.01, self.stack.shape)
+        bright[:, :10] = 1e8 # Constant ROI: exactly 0, never NaN
+        std = roi_handler.extract_intensity_statistics(rois, bright, ('std',))['std']
+        for i, roi in enumerate(rois):
+            if roi.area_pixels:
+                self.assertTrue(np.allclose(std[i], bright[:, roi.mask].std(axis=1), rtol=1e-6, atol=1e-12))
+        self.assertIsNone(roi_handler.extract_intensity_statistics(rois, self.stack[:, :30]))
+
+    def test_extract_mean_intensity_traces_invalid_input(self):
+        rois = self.manager.get_all_rois()
+        self.assertIsNone(roi_handler.extract_mean_intensity_traces(rois, self.stack[0]))
+        self.assertIsNone(roi_handler.extract_mean_intensity_traces(rois, self.stack[:, :30]))
+
+
+if __name__ == '__main__':
+    unittest.main()